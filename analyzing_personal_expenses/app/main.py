@@ -2,80 +2,90 @@ import streamlit as st
 import pandas as pd
 import sys
 import os
-import decimal
+from functools import partial
 
 # Add the parent directory to the system path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from frontend.ui.data_visualization import DataVisualization
 from backend.database.db_operations import DatabaseOperations
-from utils.static_expense_data import MONTHS, MESSAGES
+from utils.static_expense_data import MONTHS, YEARS, MESSAGES
 import frontend.ui.sidebar as sidebar
 from scripts.static_data import CHART_TYPES
-from backend.data_cleaner import DataCleaner
+from backend.data_cleaner import clean_expense_summary
 from frontend.ui.expense_summary_insights import ExpenseSummaryInsights
-from frontend.ui.data_insights import get_insights
+from frontend.ui.data_insights import get_insights_from_totals
 from frontend.ui.payment_mode_chart import PaymentModeChart
 from frontend.ui.headings import Heading
 from frontend.ui.bar_chart import plot_bar_chart,plot_bar_chart_payment
 from frontend.ui.payment_insights import PaymentModesInsights
 from frontend.ui.get_payment_mode_insights import get_payment_mode_insights
+from frontend.ui.expense_browser import display_expense_browser
+
+
+def top_10_totals(category_totals):
+    """Top 10 positive category totals as a (category_name, total_amount) table."""
+    top_10_df = category_totals.rename('total_amount').reset_index()
+    top_10_df = top_10_df[top_10_df['total_amount'] > 0]
+    top_10_df = top_10_df.sort_values(by='total_amount', ascending=False).head(10)
+    top_10_df['total_amount'] = top_10_df['total_amount'].round(2)
+    return top_10_df
 
 
 def main():
     """Main function to run the Expense Tracker Streamlit App."""
     st.set_page_config(layout="wide")
 
+    # Initialize DatabaseOperations instance
+    db_ops = DatabaseOperations()
+    try:
+        display_dashboard(db_ops)
+    finally:
+        # Rendered last, so the timings include every query of this run
+        sidebar.display_query_diagnostics(db_ops)
+
+
+def display_dashboard(db_ops):
+    """Render the sidebar filters and the dashboard for the selected user and period."""
     # Initialize default variables
     insights = {}
     top_10_df = pd.DataFrame()
 
-    # Initialize DatabaseOperations instance
-    db_ops = DatabaseOperations()
     users = db_ops.fetch_users()
 
     # Sidebar: User and Filter Selections
-    user_id, visualization_type, chart_type, selected_month, selected_year, detailed_view_category = sidebar.display_sidebar(users)
+    user_id, visualization_type, chart_type, selected_month, selected_year, show_detailed_view = sidebar.display_filters(users)
+    show_transactions = sidebar.toggle_transactions_view()
+
+    # Aggregate in SQL: one row per (category, subcategory, payment mode) instead of one per expense.
+    # The detailed view's category lookup is independent, so both run at once on pooled connections.
+    queries = {
+        'summary': partial(db_ops.fetch_expense_summary, user_id=user_id,
+                           selected_year=selected_year, selected_month=selected_month),
+    }
+    if show_detailed_view:
+        queries['categories'] = partial(sidebar.fetch_category_options, db_ops, user_id, selected_year, selected_month)
+    results = db_ops.run_concurrently(queries)
+
+    detailed_view_category = sidebar.select_category_option(results['categories']) if show_detailed_view else None
 
-    # Fetch User Data for the year
     dv = DataVisualization(user_id=user_id)
-    df = dv.get_user_expenses(user_id=user_id, selected_year=selected_year, selected_month=selected_month)
+    summary_df = results['summary']
 
-    if df.empty:
+    if summary_df.empty:
         st.warning(MESSAGES["no_user_data"])
         return
 
-    df['expense_date'] = pd.to_datetime(df['expense_date'], errors='coerce')
-    df['expense_year'] = df['expense_date'].dt.year
-    df['expense_month'] = df['expense_date'].dt.strftime('%B')
-
-    # Fetch categories and subcategories dynamically
-    categories_df = db_ops.fetch_categories(user_id=user_id, selected_year=selected_year, selected_month=selected_month)
-    subcategories_df = db_ops.fetch_subcategories(user_id=user_id, selected_year=selected_year, selected_month=selected_month)
-    payment_mode_df=db_ops.fetch_payment_mode_counts(user_id=user_id, selected_year=selected_year, selected_month=selected_month)
-
-    # Data Cleaning
-    cleaner = DataCleaner(df, categories_df, subcategories_df)
-    try:
-        cleaned_df = cleaner.clean_data()
-    except KeyError as e:
-        st.error(f"Data Cleaning Error: {e}")
-        st.stop()
-
-    # Ensure 'amount_paid' column is of type float before aggregation
-    cleaned_df['amount_paid'] = cleaned_df['amount_paid'].apply(lambda x: float(x) if isinstance(x, (int, float, decimal.Decimal)) else x)
+    # Data Cleaning (same rules as DataCleaner, applied to the aggregated rows)
+    cleaned_summary_df = db_ops.memory_report.record('cleaned summary', clean_expense_summary(summary_df))
+    category_totals = db_ops.memory_report.record('category totals', dv.get_category_totals(cleaned_summary_df))
 
     # Monthly Visualization
     if visualization_type == "Monthly":
-        selected_year = selected_year or st.selectbox("Select Year", sorted(df['expense_year'].unique()), key="year")
+        selected_year = selected_year or st.selectbox("Select Year", YEARS, key="year")
         selected_month = selected_month or st.selectbox("Select Month", MONTHS, key="month")
 
-        filtered_df = cleaned_df[
-            (cleaned_df['expense_month'] == selected_month) &
-            (cleaned_df['expense_year'] == int(selected_year))
-        ]
-
-        if filtered_df.empty:
+        if category_totals.empty:
             st.warning(MESSAGES["no_month_data"].format(month=selected_month, year=selected_year))
         else:
             heading = Heading(f"📊 Monthly Expenses Overview for {selected_month} {selected_year}")
@@ -85,30 +95,22 @@ def main():
 
             with col1:
                 st.markdown("#### 💰 Top 10 Spending Categories")
-                top_10_df = (
-                    filtered_df.groupby('category_name', as_index=False)
-                    .agg(total_amount=('amount_paid', 'sum'))
-                )
-                top_10_df = top_10_df[top_10_df['total_amount'] > 0]
-                top_10_df = top_10_df.sort_values(by='total_amount', ascending=False).head(10)
-                top_10_df['total_amount'] = top_10_df['total_amount'].round(2)
+                top_10_df = top_10_totals(category_totals)
                 st.dataframe(top_10_df)
 
             with col2:
                 if chart_type in CHART_TYPES:
-                    filtered_chart_df = filtered_df[filtered_df['amount_paid'] > 0]
-                    dv.display_monthly_expenses(filtered_chart_df, selected_year, selected_month, chart_type)
+                    dv.display_monthly_totals(category_totals[category_totals > 0], selected_year, selected_month, chart_type)
                 else:
                     st.warning(f"Invalid chart type selected: {chart_type}")
 
-            insights = get_insights(filtered_df)
+            insights = get_insights_from_totals(category_totals)
 
     # Yearly Visualization
     elif visualization_type == "Yearly":
-        selected_year = selected_year or st.selectbox("Select Year", sorted(df['expense_year'].unique()), key="year")
-        filtered_df = cleaned_df[cleaned_df['expense_year'] == int(selected_year)]
+        selected_year = selected_year or st.selectbox("Select Year", YEARS, key="year")
 
-        if filtered_df.empty:
+        if category_totals.empty:
             st.warning(MESSAGES["no_year_data"].format(year=selected_year))
         else:
             heading = Heading(f"📊 Yearly Expenses Overview for {selected_year}")
@@ -118,23 +120,16 @@ def main():
 
             with col1:
                 st.markdown("#### 💰 Top 10 Yearly Expenses")
-                yearly_expenses_df = (
-                    filtered_df.groupby('category_name', as_index=False)
-                    .agg(total_amount=('amount_paid', 'sum'))
-                )
-                yearly_expenses_df = yearly_expenses_df[yearly_expenses_df['total_amount'] > 0]
-                yearly_expenses_df = yearly_expenses_df.sort_values(by='total_amount', ascending=False).head(10)
-                yearly_expenses_df['total_amount'] = yearly_expenses_df['total_amount'].round(2)
+                yearly_expenses_df = top_10_totals(category_totals)
                 st.dataframe(yearly_expenses_df)
 
             with col2:
                 if chart_type in CHART_TYPES:
-                    filtered_chart_df = filtered_df[filtered_df['amount_paid'] > 0]
-                    dv.display_yearly_expenses(filtered_chart_df, selected_year, chart_type)
+                    dv.display_yearly_totals(category_totals[category_totals > 0], selected_year, chart_type)
                 else:
                     st.warning(f"Invalid chart type selected: {chart_type}")
 
-            insights = get_insights(filtered_df)
+            insights = get_insights_from_totals(category_totals)
 
 
 
@@ -149,12 +144,8 @@ def main():
         heading = Heading("📂 Subcategory Expense Breakdown")
         heading.display_centered()
 
-        subcategory_df = dv.get_user_expenses_by_subcategory(
-            cleaned_df,
-            selected_year=selected_year,
-            selected_month=selected_month,
-            category=detailed_view_category
-        )
+        subcategory_df = db_ops.memory_report.record(
+            'subcategory totals', dv.get_subcategory_totals(cleaned_summary_df, category=detailed_view_category))
 
         if subcategory_df.empty:
             st.warning(f"No data available for subcategory expenses under '{detailed_view_category}'.")
@@ -196,12 +187,8 @@ def main():
                 
                 st.markdown(f"##### 📊 Payment Modes Category for category-{detailed_view_category}")
 
-                payment_mode_count_df = dv.get_payment_mode_count(
-                    payment_mode_df,
-                    selected_year=selected_year,
-                    selected_month=selected_month,
-                    category=detailed_view_category
-                )
+                payment_mode_count_df = db_ops.memory_report.record(
+                    'payment mode totals', dv.get_payment_mode_totals(summary_df, category=detailed_view_category))
                 if payment_mode_count_df.empty:
                     st.warning("No data available for payment modes.")
                 else:
@@ -242,6 +229,11 @@ def main():
                             "Top 10 Payment Modes Chart"
                         )
 
+    # Individual transactions, paged by keyset
+    if show_transactions:
+        st.markdown("---")
+        display_expense_browser(db_ops, user_id, selected_year, selected_month)
+
 
    
                      
@@ -2,22 +2,28 @@ import pandas as pd
 
 class DataCleaner:
     def __init__(self, df, categories_df, subcategories_df):
-        self.df = df.copy()  # Avoid modifying the original DataFrame
-        self.categories_df = categories_df.copy()
-        self.subcategories_df = subcategories_df.copy()
+        # Shallow copy: columns are replaced rather than written in place, so the caller's frame is
+        # not modified and its data is not duplicated. The lookup frames are only read.
+        self.df = df.copy(deep=False)
+        self.categories_df = categories_df
+        self.subcategories_df = subcategories_df
 
         # Opt-in to Pandas' future behavior
         pd.set_option('future.no_silent_downcasting', True)
 
     def fill_missing_subcategory_name(self):
         """Fills missing 'subcategory_name' with the mode (most frequent value) of the respective category."""
-        self.df['subcategory_name'] = self.df.groupby('category_name')['subcategory_name'].transform(
+        subcategories = self.df['subcategory_name']
+        if isinstance(subcategories.dtype, pd.CategoricalDtype) and 'Miscellaneous' not in subcategories.cat.categories:
+            # Compact fact frames (fact_frame.compact_fact_frame) only accept known categories
+            self.df['subcategory_name'] = subcategories.cat.add_categories('Miscellaneous')
+        self.df['subcategory_name'] = self.df.groupby('category_name', observed=True)['subcategory_name'].transform(
             lambda x: x.fillna(x.mode()[0] if not x.mode().empty else 'Miscellaneous')
         )
 
     def fill_missing_amount_paid(self):
         """Fills missing 'amount_paid' with the mean of the respective subcategory."""
-        self.df['amount_paid'] = self.df.groupby('subcategory_name')['amount_paid'].transform(
+        self.df['amount_paid'] = self.df.groupby('subcategory_name', observed=True)['amount_paid'].transform(
             lambda x: x.astype(float).fillna(x.mean() if not x.isna().all() else 0)
         )
 
@@ -58,3 +64,60 @@ class DataCleaner:
         self.fill_missing_subcategory_id()
         
         return self.df
+
+
+def clean_expense_summary(summary_df):
+    """
+    Apply the DataCleaner.clean_data rules to pre-aggregated expense rows, so the page never
+    has to pull individual expenses to get cleaned totals.
+
+    `summary_df` holds one row per (category, subcategory[, payment mode]) with expense_count,
+    amount_count and total_amount (see DatabaseOperations.fetch_expense_summary). Returns one row
+    per (category, subcategory_name) with the cleaned expense_count and total_amount:
+    - rows missing both subcategory and amount are dropped,
+    - missing subcategories take the category's most frequent subcategory ('Miscellaneous' if none),
+    - missing amounts take the mean amount of their subcategory (0 if it has no amounts).
+    """
+    columns = ['category_id', 'category_name', 'subcategory_name', 'expense_count', 'total_amount',
+               'min_amount', 'max_amount']
+    if summary_df.empty:
+        return pd.DataFrame(columns=columns)
+
+    df = summary_df.copy()
+    df['total_amount'] = df['total_amount'].astype(float).fillna(0)
+    df = df.groupby(['category_id', 'category_name', 'subcategory_name'], dropna=False, as_index=False).agg(
+        expense_count=('expense_count', 'sum'),
+        amount_count=('amount_count', 'sum'),
+        total_amount=('total_amount', 'sum'),
+        min_amount=('min_amount', 'min'),
+        max_amount=('max_amount', 'max'),
+    )
+
+    # Drop rows where both subcategory and amount are missing
+    missing_subcategory = df['subcategory_name'].isna()
+    df.loc[missing_subcategory, 'expense_count'] = df.loc[missing_subcategory, 'amount_count']
+    df = df[df['expense_count'] > 0]
+
+    # Mode of the known subcategories per category (ties resolve to the first name, like Series.mode)
+    known = df[df['subcategory_name'].notna()].sort_values(
+        ['category_name', 'expense_count', 'subcategory_name'], ascending=[True, False, True]
+    )
+    category_modes = known.drop_duplicates('category_name').set_index('category_name')['subcategory_name']
+    missing_subcategory = df['subcategory_name'].isna()
+    df.loc[missing_subcategory, 'subcategory_name'] = (
+        df.loc[missing_subcategory, 'category_name'].map(category_modes).fillna('Miscellaneous')
+    )
+    df = df.groupby(['category_id', 'category_name', 'subcategory_name'], as_index=False).agg(
+        expense_count=('expense_count', 'sum'),
+        amount_count=('amount_count', 'sum'),
+        total_amount=('total_amount', 'sum'),
+        min_amount=('min_amount', 'min'),
+        max_amount=('max_amount', 'max'),
+    )
+
+    # Fill missing amounts with the subcategory mean (computed across categories, as clean_data does)
+    sums = df.groupby('subcategory_name')[['total_amount', 'amount_count']].transform('sum')
+    means = (sums['total_amount'] / sums['amount_count'].where(sums['amount_count'] > 0)).fillna(0)
+    df['total_amount'] = df['total_amount'] + (df['expense_count'] - df['amount_count']) * means
+
+    return df[columns].reset_index(drop=True)
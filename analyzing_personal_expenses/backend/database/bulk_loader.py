@@ -0,0 +1,293 @@
+import csv
+import decimal
+import hashlib
+import os
+import tempfile
+import time
+import logging
+from itertools import islice
+import mysql.connector
+from dotenv import load_dotenv
+from backend.database.queries import COUNT_DEFERRABLE_TRACKING_TRIGGERS_QUERY
+from backend.database.schema import DEFERRED_CHANGE_TRACKING_VARIABLE
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement (or per LOAD DATA file), and rows per transaction, overridable from .env
+BULK_BATCH_SIZE = int(os.getenv('DB_BULK_BATCH_SIZE', 1000))
+BULK_TRANSACTION_ROWS = int(os.getenv('DB_BULK_TRANSACTION_ROWS', 50000))
+
+# 'executemany': batched INSERTs; 'infile': LOAD DATA LOCAL INFILE from a temporary CSV file (MySQL only)
+LOAD_METHODS = ('executemany', 'infile')
+
+# Columns of the rows handed to BulkExpenseLoader.load(), in order
+EXPENSE_LOAD_COLUMNS = ('user_id', 'category_id', 'subcategory_id', 'amount_paid', 'expense_date',
+                        'payment_mode_id', 'creation_date', 'source_ref')
+
+# An expense's content fingerprint is a hash of these (scripts/migrate.py, migration 7)
+FINGERPRINT_COLUMNS = ('user_id', 'expense_date', 'amount_paid', 'category_id', 'subcategory_id',
+                       'payment_mode_id', 'source_ref')
+
+# A row whose fingerprint is already stored is skipped, or overwrites the stored row's other columns
+DUPLICATE_MODES = ('skip', 'update')
+
+
+def expense_fingerprint(user_id, expense_date, amount_paid, category_id, subcategory_id, payment_mode_id,
+                        source_ref=None):
+    """
+    SHA-256 (hex) of an expense's content and source reference. Values are normalised first, so
+    12.5 and Decimal('12.50'), or a date and its ISO string, give the same fingerprint.
+    """
+    amount = '' if amount_paid is None else str(
+        decimal.Decimal(str(amount_paid)).quantize(decimal.Decimal('0.01'), rounding=decimal.ROUND_HALF_UP))
+    values = (user_id, str(expense_date)[:10], amount, category_id, subcategory_id, payment_mode_id, source_ref)
+    return hashlib.sha256('\x1f'.join('' if value is None else str(value) for value in values).encode()).hexdigest()
+
+
+def load_expense_lookups(db_ops):
+    """
+    The ids a generated or imported expense may reference, read once from the dimension registry:
+    {'user_ids': [...], 'category_ids': [...], 'payment_mode_ids': [...],
+     'subcategories': {category_id: [subcategory_id, ...]}, 'category_names': {category_id: name}}.
+    Categories without subcategories map to [].
+    """
+    tables = db_ops.dimensions.tables(db_ops)
+    category_names = tables['category']['category_name']
+    subcategories = {int(category_id): [] for category_id in tables['category'].index}
+    for subcategory_id, category_id in tables['subcategory']['category_id'].items():
+        subcategories.setdefault(int(category_id), []).append(int(subcategory_id))
+    return {
+        'user_ids': [int(user_id) for user_id in tables['user'].index],
+        'category_ids': list(subcategories),
+        'payment_mode_ids': [int(payment_mode_id) for payment_mode_id in tables['payment_mode'].index],
+        'subcategories': subcategories,
+        'category_names': {int(category_id): name for category_id, name in category_names.items()},
+    }
+
+
+def _insert_sql(backend, columns, on_duplicate):
+    # mysql.connector rewrites an executemany() of this INSERT into one multi-row INSERT per call
+    sql = f"INSERT INTO expenses ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    if 'fingerprint' not in columns:
+        return sql
+    # Duplicates are resolved by the unique fingerprint index, for the whole batch in one statement
+    updated = [] if on_duplicate == 'skip' else [
+        column for column in columns if column not in FINGERPRINT_COLUMNS + ('fingerprint',)]
+    if backend == 'sqlite':
+        # The conflict target names the unique index exactly (migration 8)
+        if not updated:
+            return sql + " ON CONFLICT (fingerprint, expense_date) DO NOTHING"
+        return sql + " ON CONFLICT (fingerprint, expense_date) DO UPDATE SET " + ", ".join(
+            f"{column} = excluded.{column}" for column in updated)
+    # Not INSERT IGNORE, which would also turn foreign-key and data errors into warnings
+    assignments = ", ".join(f"{column} = VALUES({column})" for column in updated) or "fingerprint = fingerprint"
+    return sql + f" ON DUPLICATE KEY UPDATE {assignments}"
+
+
+# The one LOAD DATA warning that means "already stored": a duplicate fingerprint
+ER_DUP_ENTRY = 1062
+
+
+def _load_infile_sql(columns):
+    # Only skipping is offered: REPLACE would delete and re-insert a duplicate, under a new expense_id.
+    # IGNORE (implied by LOCAL anyway) also demotes foreign-key and data errors to warnings, so
+    # BulkExpenseLoader._check_warnings raises on any warning but a duplicate.
+    duplicates = 'IGNORE ' if 'fingerprint' in columns else ''
+    return (f"LOAD DATA LOCAL INFILE %s {duplicates}INTO TABLE expenses "
+            "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' "
+            f"({', '.join(columns)})")
+
+
+class BulkExpenseLoader:
+    """
+    Writes expense rows in batches instead of one INSERT per row. Each batch of `batch_size` rows is
+    one executemany() (a single multi-row INSERT on MySQL) or, with method='infile', one LOAD DATA
+    LOCAL INFILE of a temporary CSV file. The open transaction is committed every `transaction_rows`
+    rows and at the end; if a batch fails, the uncommitted rows are rolled back and the error re-raised.
+
+    Every row gets its expense_fingerprint(), and the database's unique index on it decides per batch
+    which rows are new: with on_duplicate='skip' a stored duplicate is left as it is, with 'update' its
+    columns outside the fingerprint (e.g. creation_date) are overwritten in place (executemany only).
+    Loading the same rows twice stores them once. Before migration 7 there is no fingerprint column and
+    rows are simply inserted.
+
+    With defer_change_tracking (MySQL, migration 9), the per-row data-version and change-log triggers on
+    expenses are suspended for the load's connection. Each batch's rows are then found by fingerprint
+    and logged in expense_changes, and the 'expenses' data version is bumped once right before each
+    commit. Concurrent loaders therefore hold that shared row only while committing.
+    """
+
+    def __init__(self, db_ops, batch_size=BULK_BATCH_SIZE, transaction_rows=BULK_TRANSACTION_ROWS,
+                 method='executemany', columns=EXPENSE_LOAD_COLUMNS, on_duplicate='skip',
+                 defer_change_tracking=False):
+        if method not in LOAD_METHODS:
+            raise ValueError(f"Unknown load method: {method} (expected one of {', '.join(LOAD_METHODS)})")
+        if on_duplicate not in DUPLICATE_MODES:
+            raise ValueError(f"Unknown on_duplicate: {on_duplicate} (expected one of {', '.join(DUPLICATE_MODES)})")
+        if method == 'infile' and on_duplicate == 'update':
+            raise ValueError("on_duplicate='update' needs method='executemany': LOAD DATA can only replace "
+                             "a stored duplicate by deleting it, which gives it a new expense_id")
+        if method == 'infile' and db_ops.backend != 'mysql':
+            raise ValueError("LOAD DATA LOCAL INFILE needs the MySQL backend")
+        if batch_size < 1 or transaction_rows < 1:
+            raise ValueError("batch_size and transaction_rows must be positive")
+        self.db_ops = db_ops
+        self.batch_size = batch_size
+        self.transaction_rows = transaction_rows
+        self.method = method
+        self.columns = tuple(columns)
+        self.on_duplicate = on_duplicate
+        self.fingerprinted = db_ops.column_exists('expenses', 'fingerprint')
+        if not self.fingerprinted:
+            logger.warning("expenses has no fingerprint column (scripts/migrate.py, migration 7); "
+                           "rows are inserted without duplicate detection")
+        self.defer_change_tracking = (defer_change_tracking and self.fingerprinted
+                                      and self._change_tracking_deferrable())
+
+    def _change_tracking_deferrable(self):
+        """Whether the insert triggers on expenses can be suspended per connection (MySQL, migration 9)."""
+        if self.db_ops.backend != 'mysql':
+            return False
+        with self.db_ops.get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(COUNT_DEFERRABLE_TRACKING_TRIGGERS_QUERY, (f"%{DEFERRED_CHANGE_TRACKING_VARIABLE}%",))
+                return cursor.fetchone()[0] == 2
+
+    def _prepare(self, rows):
+        """Columns and rows to write: with a fingerprint, or without source_ref before migration 7."""
+        if self.fingerprinted:
+            positions = [self.columns.index(column) if column in self.columns else None
+                         for column in FINGERPRINT_COLUMNS]
+            return self.columns + ('fingerprint',), (
+                tuple(row) + (expense_fingerprint(*(None if i is None else row[i] for i in positions)),)
+                for row in rows)
+        if 'source_ref' in self.columns:
+            kept = [i for i, column in enumerate(self.columns) if column != 'source_ref']
+            return tuple(self.columns[i] for i in kept), (tuple(row[i] for i in kept) for row in rows)
+        return self.columns, rows
+
+    def _connect(self):
+        if self.method == 'infile':
+            # Pooled connections do not allow local files, so the load gets a connection of its own.
+            # Every warning of a batch must be listed for _check_warnings (the default keeps 1024)
+            conn = mysql.connector.connect(**self.db_ops.db_config, allow_local_infile=True)
+            with conn.cursor() as cursor:
+                cursor.execute("SET SESSION max_error_count = 65535")
+            return conn
+        if self.defer_change_tracking and self.db_ops.backend == 'mysql':
+            # Nor should the suspended triggers outlive the load on a pooled connection
+            return mysql.connector.connect(**self.db_ops.db_config)
+        return self.db_ops.get_db_connection()
+
+    @staticmethod
+    def _track_batch(cursor, fingerprints):
+        """Log the expenses stored (or updated) under `fingerprints` in expense_changes."""
+        cursor.execute(f"SELECT expense_id FROM expenses WHERE fingerprint IN ({', '.join(['%s'] * len(fingerprints))})",
+                       fingerprints)
+        changed = cursor.fetchall()
+        if changed:
+            cursor.executemany("INSERT INTO expense_changes (expense_id) VALUES (%s)", changed)
+
+    def load(self, rows, progress=None):
+        """
+        Insert `rows` (an iterable of tuples in `columns` order; generators are consumed one batch at a
+        time) and return {'rows', 'duplicates', 'batches', 'commits', 'seconds', 'rows_per_second', 'method'}.
+        `progress`, if given, is called with the running totals after every commit. With on_duplicate='skip',
+        'duplicates' counts the rows that were already stored (with 'update' it is None: MySQL does not
+        report updated and unchanged duplicates apart).
+        """
+        columns, rows = self._prepare(iter(rows))
+        skipping = self.fingerprinted and self.on_duplicate == 'skip'
+        stats = {'rows': 0, 'duplicates': 0 if skipping else None, 'batches': 0, 'commits': 0, 'seconds': 0.0,
+                 'rows_per_second': 0.0, 'method': self.method}
+        if self.method == 'infile':
+            sql = _load_infile_sql(columns)
+        else:
+            sql = _insert_sql(self.db_ops.backend, columns, self.on_duplicate)
+        started = time.perf_counter()
+        uncommitted = 0
+
+        def commit(cursor):
+            nonlocal uncommitted
+            if self.defer_change_tracking:
+                cursor.execute("UPDATE data_versions SET version = version + 1 WHERE table_name = 'expenses'")
+            conn.commit()
+            stats['commits'] += 1
+            stats['seconds'] = time.perf_counter() - started
+            stats['rows_per_second'] = stats['rows'] / stats['seconds'] if stats['seconds'] else 0.0
+            uncommitted = 0
+            if progress is not None:
+                progress(dict(stats))
+
+        conn = self._connect()
+        try:
+            with conn.cursor() as cursor:
+                if self.defer_change_tracking and self.db_ops.backend == 'mysql':
+                    cursor.execute(f"SET {DEFERRED_CHANGE_TRACKING_VARIABLE} = 'deferred'")
+                while True:
+                    batch = list(islice(rows, self.batch_size))
+                    if not batch:
+                        break
+                    with self.db_ops.query_stats.timer(sql, method='bulk_load_expenses') as timer:
+                        if self.method == 'infile':
+                            self._load_file(cursor, sql, batch)
+                        else:
+                            cursor.executemany(sql, batch)
+                        timer.done(len(batch))
+                    if skipping:
+                        stats['duplicates'] += len(batch) - cursor.rowcount
+                    if self.defer_change_tracking:
+                        self._track_batch(cursor, [row[-1] for row in batch])
+                    stats['rows'] += len(batch)
+                    stats['batches'] += 1
+                    uncommitted += len(batch)
+                    if uncommitted >= self.transaction_rows:
+                        commit(cursor)
+                if uncommitted:
+                    commit(cursor)
+        except Exception:
+            conn.rollback()
+            logger.error(f"Bulk load failed after {stats['rows']} rows; "
+                         f"{uncommitted} uncommitted rows rolled back")
+            raise
+        finally:
+            conn.close()
+
+        stats['seconds'] = time.perf_counter() - started
+        stats['rows_per_second'] = stats['rows'] / stats['seconds'] if stats['seconds'] else 0.0
+        logger.info(f"Bulk loaded {stats['rows']} expenses in {stats['seconds']:.2f}s "
+                    f"({stats['rows_per_second']:.0f} rows/s, {stats['batches']} batches, {stats['commits']} commits)")
+        return stats
+
+    def _load_file(self, cursor, sql, batch):
+        # \N is LOAD DATA's NULL
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False) as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerows(['\\N' if value is None else value for value in row] for row in batch)
+        try:
+            cursor.execute(sql, (f.name,))
+        finally:
+            os.remove(f.name)
+        self._check_warnings(cursor)
+
+    @staticmethod
+    def _check_warnings(cursor):
+        """
+        Raise if the last LOAD DATA warned about anything but a duplicate fingerprint: with LOCAL, a row
+        with an unknown category or payment mode is skipped and a truncated value stored, with a warning.
+        """
+        cursor.execute("SHOW COUNT(*) WARNINGS")
+        total = cursor.fetchone()[0]
+        if not total:
+            return
+        cursor.execute("SHOW WARNINGS")
+        warnings = cursor.fetchall()
+        problems = [(code, message) for _, code, message in warnings if code != ER_DUP_ENTRY]
+        if len(warnings) < total:
+            problems.append((None, f"{total - len(warnings)} further warnings beyond max_error_count"))
+        if problems:
+            code, message = problems[0]
+            raise mysql.connector.errors.DatabaseError(
+                msg=f"LOAD DATA rejected or altered rows ({len(problems)} warnings): {message}", errno=code)
@@ -0,0 +1,276 @@
+import os
+import queue
+import threading
+import time
+import logging
+from collections import OrderedDict
+import mysql.connector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Pool settings, overridable from .env
+DEFAULT_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DEFAULT_CHECKOUT_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
+DEFAULT_HEALTH_CHECK_INTERVAL = float(os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', 30))
+# Server-side prepared statements kept open per connection (MySQL caps them server-wide)
+MAX_PREPARED_STATEMENTS = int(os.getenv('DB_MAX_PREPARED_STATEMENTS', 32))
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes free within the checkout timeout."""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a pooled connection.
+    Calling close() (or leaving a `with` block) hands the connection back to the pool.
+    """
+
+    def __init__(self, pool, raw_connection):
+        self._pool = pool
+        self._raw = raw_connection
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise AttributeError(f"Connection already returned to the pool (accessing '{name}').")
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def prepared_cursor(self, query):
+        """Return a server-side prepared cursor for `query`, cached for the life of this connection."""
+        if self._raw is None:
+            raise AttributeError("Connection already returned to the pool.")
+        return self._pool._prepared_cursor(self._raw, query)
+
+    def close(self):
+        """Return the connection to the pool instead of closing it."""
+        if self._raw is not None:
+            self._pool._release(self._raw)
+            self._raw = None
+
+    def discard(self):
+        """Close the connection for good (e.g. unread rows left on the wire) and free its pool slot."""
+        if self._raw is not None:
+            self._pool._discard(self._raw)
+            self._raw = None
+
+
+class ConnectionPool:
+    """
+    Fixed-size, thread-safe connection pool.
+    Connections are opened lazily up to `size`, checked for liveness when they have been
+    idle longer than `health_check_interval`, and checkouts block for at most `timeout` seconds.
+    """
+
+    def __init__(self, connection_factory, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_CHECKOUT_TIMEOUT,
+                 health_check_interval=DEFAULT_HEALTH_CHECK_INTERVAL):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self.connection_factory = connection_factory
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+
+        self._idle = queue.LifoQueue()  # (connection, last_used) pairs; LIFO keeps hot connections hot
+        self._lock = threading.Lock()
+        # Notified whenever a connection is returned or a slot freed, waking checkouts blocked on a full pool
+        self._available = threading.Condition(self._lock)
+        self._open_connections = 0
+        self._statements = {}  # id(connection) -> OrderedDict(query -> prepared cursor)
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_seconds': 0.0,
+            'timeouts': 0,
+            'connections_created': 0,
+            'connections_discarded': 0,
+            'health_checks': 0,
+            'statements_prepared': 0,
+            'statement_cache_hits': 0,
+        }
+
+    def get_connection(self, timeout=None):
+        """Check out a healthy connection, waiting up to `timeout` seconds if the pool is exhausted."""
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            self._stats['checkouts'] += 1
+
+        start = None
+        while True:
+            entry = self._take_idle()
+            raw = self._ensure_healthy(*entry) if entry is not None else self._create_if_room()
+            if raw is not None:
+                if start is not None:
+                    self._record_wait(start)
+                return PooledConnection(self, raw)
+
+            # Pool exhausted: wait until a checkout is returned or a discarded connection frees its slot
+            if start is None:
+                start = time.monotonic()
+            remaining = start + timeout - time.monotonic()
+            if remaining <= 0:
+                self._record_wait(start, timed_out=True)
+                raise PoolTimeoutError(f"No database connection available after {timeout}s (pool size {self.size}).")
+            with self._available:
+                # Checked under the lock, so a release or discard cannot slip in between check and wait
+                if self._idle.empty() and self._open_connections >= self.size:
+                    self._available.wait(remaining)
+
+    def _record_wait(self, start, timed_out=False):
+        with self._lock:
+            self._stats['waits'] += 1
+            self._stats['wait_seconds'] += time.monotonic() - start
+            if timed_out:
+                self._stats['timeouts'] += 1
+
+    def stats(self):
+        """Return a snapshot of the pool counters."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['size'] = self.size
+            snapshot['open_connections'] = self._open_connections
+        snapshot['idle_connections'] = self._idle.qsize()
+        snapshot['in_use_connections'] = snapshot['open_connections'] - snapshot['idle_connections']
+        return snapshot
+
+    def close_all(self):
+        """Close every idle connection. Checked-out connections are closed when they are returned."""
+        while True:
+            try:
+                raw, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(raw)
+
+    def _take_idle(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _create_if_room(self):
+        with self._lock:
+            if self._open_connections >= self.size:
+                return None
+            self._open_connections += 1  # Reserve the slot before connecting outside the lock
+
+        try:
+            raw = self.connection_factory()
+        except Exception:
+            with self._lock:
+                self._open_connections -= 1
+            raise
+
+        with self._lock:
+            self._stats['connections_created'] += 1
+        logger.debug(f"Opened pooled connection ({self._open_connections}/{self.size}).")
+        return raw
+
+    def _ensure_healthy(self, raw, last_used):
+        """
+        Ping connections that have sat idle for a while and replace dead ones. Returns None when another
+        checkout took the dead connection's slot first; the caller then waits like any other checkout.
+        """
+        if time.monotonic() - last_used < self.health_check_interval:
+            return raw
+
+        with self._lock:
+            self._stats['health_checks'] += 1
+        try:
+            if raw.is_connected():
+                return raw
+        except Exception as e:
+            logger.warning(f"Pooled connection health check failed: {e}")
+
+        self._discard(raw)
+        return self._create_if_room()
+
+    def _prepared_cursor(self, raw, query):
+        # Only the thread holding the checkout touches this connection's statements
+        statements = self._statements.setdefault(id(raw), OrderedDict())
+        cursor = statements.get(query)
+        if cursor is not None:
+            statements.move_to_end(query)
+            with self._lock:
+                self._stats['statement_cache_hits'] += 1
+            return cursor
+
+        cursor = raw.cursor(prepared=True)
+        statements[query] = cursor
+        with self._lock:
+            self._stats['statements_prepared'] += 1
+        if len(statements) > MAX_PREPARED_STATEMENTS:
+            _, evicted = statements.popitem(last=False)
+            self._close_cursor(evicted)
+        return cursor
+
+    @staticmethod
+    def _close_cursor(cursor):
+        try:
+            cursor.close()  # Deallocates the server-side statement
+        except Exception:
+            pass
+
+    def _release(self, raw):
+        try:
+            # Never hand out a connection with an open transaction (stale snapshot or pending writes)
+            if getattr(raw, 'in_transaction', False):
+                raw.rollback()
+        except Exception as e:
+            logger.warning(f"Discarding pooled connection that failed to reset: {e}")
+            self._discard(raw)
+            return
+        self._idle.put((raw, time.monotonic()))
+        with self._available:
+            self._available.notify()
+
+    def _discard(self, raw):
+        for cursor in self._statements.pop(id(raw), {}).values():
+            self._close_cursor(cursor)
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._available:
+            self._open_connections -= 1
+            self._stats['connections_discarded'] += 1
+            self._available.notify()
+
+
+# Process-wide pools keyed by connection settings, shared by every DatabaseOperations instance
+# (including across Streamlit reruns and sessions, since imported modules stay loaded).
+_shared_pools = {}
+_shared_pools_lock = threading.Lock()
+
+
+def connection_factory(db_config):
+    """Return a zero-argument function opening a connection for `db_config` (MySQL, or SQLite when 'backend' says so)."""
+    if db_config.get('backend') == 'sqlite':
+        from backend.database.sqlite_backend import connect
+        return lambda: connect(db_config['database'])
+    return lambda: mysql.connector.connect(**db_config)
+
+
+def get_shared_pool(db_config, size=None, timeout=None, health_check_interval=None):
+    """Return the process-wide pool for `db_config`, creating it on first use."""
+    key = tuple(sorted(db_config.items()))
+    with _shared_pools_lock:
+        pool = _shared_pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(
+                connection_factory(db_config),
+                size=size or DEFAULT_POOL_SIZE,
+                timeout=DEFAULT_CHECKOUT_TIMEOUT if timeout is None else timeout,
+                health_check_interval=(DEFAULT_HEALTH_CHECK_INTERVAL if health_check_interval is None
+                                       else health_check_interval),
+            )
+            _shared_pools[key] = pool
+        return pool
@@ -1,10 +1,17 @@
-import mysql.connector
-import calendar
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import pandas as pd
 import logging
 from backend.database.queries import *  # Import queries from the queries file
+from backend.database.connection_pool import get_shared_pool
+from backend.database.result_cache import ResultCache, get_shared_cache, frame_nbytes
+from backend.database.query_stats import get_shared_query_stats
+from backend.database.dimensions import get_shared_dimensions
+from backend.database.query_builder import build_expense_filters, build_rollup_filters, build_keyset_filter
+from backend.database.result_frames import frame_from_rows, frame_from_raw_rows
+from backend.fact_frame import order_expense_facts, compact_fact_frame, MemoryReport
 
 load_dotenv()
 
@@ -12,266 +19,489 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rows fetched per round trip when streaming large results
+DEFAULT_CHUNK_SIZE = int(os.getenv('DB_FETCH_CHUNK_SIZE', 10000))
 
-class DatabaseOperations:
-    def __init__(self):
-        self.db_config = {
-            'host': os.getenv('DB_HOST'),
-            'user': os.getenv('DB_USER'),
-            'password': os.getenv('DB_PASSWORD'),
-            'database': os.getenv('DB_NAME')
-        }
+# Transactions per page in the expense browser
+DEFAULT_PAGE_SIZE = int(os.getenv('DB_PAGE_SIZE', 50))
 
-    def get_db_connection(self):
-        """Establish and return a database connection."""
-        return mysql.connector.connect(**self.db_config)
-
-    def fetch_user_expenses(self, user_id=None):
-        """Fetch all expenses for a specific user or all users, without dropping null values."""
-        query = """
-        SELECT e.expense_date, c.category_name, e.amount_paid
-        FROM expenses e
-        JOIN categories c ON e.category_id = c.category_id
-        """
-        if user_id and user_id != "All Users":
-            query += " WHERE e.user_id = %s"
+# Dimensions whose names fact rows carry, and the columns of the frames whose names come from the registry
+FACT_DIMENSIONS = ('category', 'subcategory', 'payment_mode')
+EXPENSE_PAGE_COLUMNS = ['expense_id', 'expense_date', 'user_name', 'category_name', 'subcategory_name',
+                        'payment_mode_name', 'amount_paid']
+PAYMENT_MODE_COUNT_COLUMNS = ['expense_date', 'category_name', 'payment_mode_name', 'payment_count']
 
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        if user_id and user_id != "All Users":
-            cursor.execute(query, (user_id,))
-        else:
-            cursor.execute(query)
+# Aggregate columns of fetch_expense_summary
+SUMMARY_MEASURES = ('expense_count', 'amount_count', 'total_amount', 'min_amount', 'max_amount')
 
-        data = cursor.fetchall()
-        conn.close()
+# How long (seconds) one data-version probe is trusted before cached results are checked again
+DATA_VERSION_CHECK_INTERVAL = float(os.getenv('DB_VERSION_CHECK_INTERVAL', 1))
 
-        return pd.DataFrame(data, columns=['expense_date', 'category_name', 'amount_paid'])
+# Whether optional tables (rollup, data_versions) and columns exist, per (backend, host, database, table[, column]);
+# looked up once per process
+_existing_tables = {}
 
-    def fetch_user_categories(self, user_id='ALL Users', selected_year=None, selected_month=None):
-        """Fetch distinct expense categories for a specific user or all users."""
-        query = FETCH_USER_CATEGORIES
 
-        # Add year filter if specified
-        if selected_year is not None:
-            query += f" AND YEAR(e.expense_date) = {selected_year}"
-            logger.debug(f"Adding year filter: {selected_year}")
+def forget_schema_checks():
+    """Forget which optional tables and columns exist, so they are looked up again (e.g. after migrating)."""
+    _existing_tables.clear()
 
-        # Add month filter if specified
-        if selected_month is not None:
-            try:
-                month_numeric = list(calendar.month_name).index(selected_month)
-                if month_numeric > 0:
-                    query += f" AND MONTH(e.expense_date) = {month_numeric}"
-                    logger.debug(f"Adding month filter: {selected_month} ({month_numeric})")
-                else:
-                    logger.warning(f"Invalid month name provided: {selected_month}")
-            except ValueError:
-                logger.warning(f"Invalid month name provided: {selected_month}")
-
-        # Add user filter if specified
-        if user_id != 'ALL Users' and user_id is not None:
-            query += f" AND e.user_id = '{user_id}'"
-            logger.debug(f"Adding user filter: {user_id}")
-
-        query += " ORDER BY c.category_name;"
-        logger.debug(f"Generated query: {query}")
 
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(query)
-        data = cursor.fetchall()
-        conn.close()
+# Database engine: 'mysql' (default) or 'sqlite' (embedded file database at DB_SQLITE_PATH)
+DB_BACKEND = os.getenv('DB_BACKEND', 'mysql').lower()
+
 
-        return pd.DataFrame(data, columns=['category_name'])
+class DatabaseOperations:
+    def __init__(self, backend=None, db_config=None):
+        self.backend = (backend or DB_BACKEND).lower()
+        if self.backend not in ('mysql', 'sqlite'):
+            raise ValueError(f"Unknown DB_BACKEND: {self.backend} (expected 'mysql' or 'sqlite')")
+        if db_config is not None:
+            # e.g. another process's DatabaseOperations.db_config, so both use the same database
+            self.db_config = dict(db_config)
+        elif self.backend == 'sqlite':
+            self.db_config = {
+                'backend': 'sqlite',
+                'database': os.getenv('DB_SQLITE_PATH', 'expenses.sqlite3')
+            }
+        else:
+            self.db_config = {
+                'host': os.getenv('DB_HOST'),
+                'user': os.getenv('DB_USER'),
+                'password': os.getenv('DB_PASSWORD'),
+                'database': os.getenv('DB_NAME')
+            }
+        # Every instance shares one process-wide pool for these credentials
+        self.pool = get_shared_pool(self.db_config)
+        # Query results shared across instances and Streamlit reruns (see execute_query)
+        self.cache = get_shared_cache()
+        self.cache_scope = (self.backend, self.db_config.get('host'), self.db_config.get('database'))
+        self._data_version = None
+        self._data_version_checked_at = 0.0
+        # Per-query timings and the slow-query log, shared across instances (see query_stats.py)
+        self.query_stats = get_shared_query_stats()
+        # Users, categories, subcategories and payment modes, loaded once per process (see dimensions.py);
+        # fact queries return ids and names are attached from here
+        self.dimensions = get_shared_dimensions(self.cache_scope)
+        # Size of the frames this instance (one dashboard run) builds, per stage
+        self.memory_report = MemoryReport()
+        # Parquet snapshot written by scripts/export_snapshot.py; when present, fact and summary reads use it
+        self.snapshot_path = os.getenv('DB_SNAPSHOT_PATH')
+
+    def get_db_connection(self):
+        """Check out a pooled database connection; closing it returns it to the pool."""
+        return self.pool.get_connection()
+
+    def pool_stats(self):
+        """Return connection pool counters (checkouts, waits, connections created, ...)."""
+        return self.pool.stats()
+
+    def cache_stats(self):
+        """Return result cache counters (hits, misses, evictions, expirations, bytes, ...)."""
+        return self.cache.stats()
+
+    def memory_summary(self):
+        """Return the size of the frames built so far, per stage (see MemoryReport.summary)."""
+        return self.memory_report.summary()
+
+    def query_summary(self):
+        """Return recent query timings aggregated per calling method (see QueryStats.summary)."""
+        return self.query_stats.summary()
+
+    def fetch_user_categories(self, user_id='ALL Users', selected_year=None, selected_month=None):
+        """Fetch distinct expense categories for a specific user or all users."""
+        where_sql, params = build_expense_filters(user_id, selected_year, selected_month)
+        query = FETCH_USER_CATEGORY_IDS + where_sql
+        logger.debug(f"Generated query: {query} {params}")
+        categories_df = self.dimensions.attach_names(self, self.execute_query(query, params), ('category',))
+        if categories_df.empty:
+            return pd.DataFrame(columns=['category_name'])
+        return categories_df[['category_name']].drop_duplicates().sort_values('category_name', ignore_index=True)
 
     def fetch_users(self):
-        """Fetch all users from the database."""
-        query = FETCH_USERS
-        try:
-            with self.get_db_connection() as conn:
-                with conn.cursor() as cursor:
-                    cursor.execute(query)
-                    users = cursor.fetchall()
-                    return {user[1]: user[0] for user in users}
-        except Exception as e:
-            logger.error(f"Error fetching users: {e}")
-            return {}
+        """Fetch all users as {user_name: user_id}, from the dimension registry."""
+        names = self.dimensions.names(self, 'user')
+        return dict(zip(names.tolist(), names.index.tolist()))
 
     def fetch_all_categories(self):
-        """Fetch all unique categories across all users."""
-        query = FETCH_ALL_CATEGORIES
-        try:
-            with self.get_db_connection() as conn:
-                with conn.cursor() as cursor:
-                    cursor.execute(query)
-                    categories = cursor.fetchall()
-                    return [category[0] for category in categories]
-        except Exception as e:
-            logger.error(f"Error fetching categories: {e}")
-            return []
+        """Fetch all unique categories across all users, from the dimension registry."""
+        return self.dimensions.names(self, 'category').drop_duplicates().tolist()
 
-    def execute_query(self, query):
-        """Execute SQL query and return results as DataFrame."""
+    def execute_query(self, query, params=None, chunk_size=None, use_cache=True):
+        """
+        Execute SQL query and return results as DataFrame.
+        Parameterized queries run as server-side prepared statements cached per pooled connection.
+        With `chunk_size`, rows are streamed in batches and converted to typed columns batch by batch,
+        so the full result never exists as Python tuples at once.
+        Other results are kept in the process-wide result cache, keyed on the normalized query and its
+        parameters, so reruns that only change presentation (chart type, detailed view) skip the database.
+        Cached results are reused only while data_version() is unchanged.
+        Every call is timed in self.query_stats, attributed to the fetch_* method that issued it.
+        """
         try:
-            with self.get_db_connection() as conn:
-                with conn.cursor() as cursor:
-                    cursor.execute(query)
-                    data = cursor.fetchall()
-                    columns = [col[0] for col in cursor.description]  # Fetch column names dynamically
-            return pd.DataFrame(data, columns=columns)
+            if chunk_size:
+                frames = list(self.iter_query_chunks(query, params, chunk_size))
+                return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+            cache_key = ResultCache.make_key(self.cache_scope, query, params) if use_cache else None
+            # Entries from an older version of the data are dropped
+            version = self.data_version() if cache_key is not None else None
+
+            with self.query_stats.timer(query) as timer:
+                if cache_key is not None:
+                    cached = self.cache.get(cache_key, version)
+                    if cached is not None:
+                        timer.cached = True
+                        timer.done(len(cached))
+                        return cached
+
+                with self.get_db_connection() as conn:
+                    if params is not None and hasattr(conn, 'prepared_cursor'):
+                        cursor = conn.prepared_cursor(query)  # Cached; stays open with the connection
+                        cursor.execute(query, params)
+                        timer.first_row()
+                        data = cursor.fetchall()
+                        description = cursor.description
+                    else:
+                        with conn.cursor() as cursor:
+                            cursor.execute(query, params)
+                            timer.first_row()
+                            data = cursor.fetchall()
+                            description = cursor.description  # Column names and types
+                result = frame_from_rows(data, description)
+                timer.done(len(result), frame_nbytes(result))
+            if cache_key is not None:
+                self.cache.put(cache_key, result, version=version)  # Failed queries (below) are never cached
+            return result
         except Exception as e:
             logger.error(f"Error executing query: {e}")
             return pd.DataFrame()
 
-    def generate_expense_query(self, user_id='ALL Users', selected_year=None, selected_month=None):
-        """Generate SQL query for fetching user expenses dynamically without dropping null values."""
-        logger.debug("Generating expense query.")
+    def run_concurrently(self, calls, max_workers=None):
+        """
+        Run independent fetches at the same time, each on its own pooled connection, and return
+        {name: result} once all have finished. `calls` maps a name to a zero-argument callable,
+        e.g. `functools.partial(db_ops.fetch_expense_summary, user_id=1)`.
+        Latency is close to the slowest call instead of the sum; at most `max_workers` (default:
+        the pool size) run at once. An exception raised by any call is re-raised here.
+        """
+        if len(calls) <= 1:
+            return {name: call() for name, call in calls.items()}
 
-        query = FETCH_USER_EXPENSES_BASE_QUERY
+        workers = min(len(calls), max_workers or self.pool.size)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db-query") as executor:
+            futures = {name: executor.submit(call) for name, call in calls.items()}
+            return {name: future.result() for name, future in futures.items()}
 
-        # Add year filter if specified
-        if selected_year is not None:
-            query += f" AND YEAR(e.expense_date) = {selected_year}"
-            logger.debug(f"Adding year filter: {selected_year}")
+    def execute_queries(self, queries, max_workers=None):
+        """
+        Execute independent queries concurrently. `queries` maps a name to a query string or a
+        (query, params) pair; returns {name: DataFrame}.
+        """
+        calls = {}
+        for name, query in queries.items():
+            query, params = (query, None) if isinstance(query, str) else query
+            calls[name] = lambda query=query, params=params: self.execute_query(query, params)
+        return self.run_concurrently(calls, max_workers)
 
-        # Add month filter if specified
-        if selected_month is not None:
-            try:
-                month_numeric = list(calendar.month_name).index(selected_month)
-                if month_numeric > 0:
-                    query += f" AND MONTH(e.expense_date) = {month_numeric}"
-                    logger.debug(f"Adding month filter: {selected_month} ({month_numeric})")
-                else:
-                    logger.warning(f"Invalid month name provided: {selected_month}")
-            except ValueError:
-                logger.warning(f"Invalid month name provided: {selected_month}")
-
-        if user_id != 'ALL Users' and user_id is not None:
-            query += f" AND e.user_id = {user_id}"
-            logger.debug(f"Adding user filter: {user_id}")
-
-        query += " ORDER BY c.category_name, s.subcategory_name, e.amount_paid DESC;"
-        logger.debug(f"Generated query: {query}")
-        return self.execute_query(query)
-    
+    def iter_query_chunks(self, query, params=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Yield the result of `query` as DataFrames of at most `chunk_size` rows, reading from an
+        unbuffered cursor with fetchmany(). Memory stays bounded by one chunk, so exports and
+        offline jobs can process results larger than RAM. An empty result yields one empty frame.
+        The pooled connection is held until the iterator is exhausted or closed.
+        """
+        conn = self.get_db_connection()
+        finished = False
+        try:
+            # MySQL: unbuffered raw cursor, so rows stay on the server until fetched and arrive as
+            # undecoded bytes, which frame_from_raw_rows parses column-wise with NumPy
+            raw = self.backend == 'mysql'
+            to_frame = frame_from_raw_rows if raw else frame_from_rows
+            cursor = conn.cursor(raw=True) if raw else conn.cursor()
+            # Timed from execute to the last chunk, including the time the reader spends between chunks
+            with self.query_stats.timer(query) as timer:
+                cursor.execute(query, params)
+                timer.first_row()
+                rows = cursor.fetchmany(chunk_size)
+                description = cursor.description
+                frame = to_frame(rows, description)
+                timer.done(len(frame), frame_nbytes(frame))
+                yield frame
+                while rows:
+                    rows = cursor.fetchmany(chunk_size)
+                    if rows:
+                        frame = to_frame(rows, description)
+                        timer.done(len(frame), frame_nbytes(frame))
+                        yield frame
+            cursor.close()
+            finished = True
+        finally:
+            if finished:
+                conn.close()
+            else:
+                conn.discard()  # Abandoned mid-stream: unread rows would poison the next checkout
 
-    def fetch_categories(self, user_id='ALL Users', selected_year=None, selected_month=None):
+    def generate_expense_query(self, user_id='ALL Users', selected_year=None, selected_month=None):
+        """Fetch user expenses for the filters without dropping null values."""
+        where_sql, params = build_expense_filters(user_id, selected_year, selected_month)
+        query = FETCH_USER_EXPENSES_BASE_QUERY + where_sql + " ORDER BY c.category_name, s.subcategory_name, e.amount_paid DESC"
+        logger.debug(f"Generated query: {query} {params}")
+        return self.execute_query(query, params)
+
+    def fetch_expense_facts(self, user_id='ALL Users', selected_year=None, selected_month=None):
         """
-        Fetch distinct expense categories for a specific user, year, and month.
+        Fetch expense facts (date, user, category, subcategory, payment mode, amount) in one query of ids;
+        category, subcategory and payment-mode names are attached from the dimension registry.
+        Returned as a compact fact frame (see fact_frame.compact_fact_frame): categorical names,
+        32-bit ids, float32 amounts, expense_year/expense_month as small ints.
+        Category, subcategory and payment-mode frames are derived from it in memory.
         """
-        query = """
-        SELECT DISTINCT c.category_id, c.category_name
-        FROM categories c
-        JOIN expenses e ON c.category_id = e.category_id
-        WHERE 1=1
+        if self.snapshot_available():
+            from backend.database.parquet_snapshot import fetch_snapshot_facts
+            facts_df = fetch_snapshot_facts(self.snapshot_path, user_id, selected_year, selected_month)
+            return self.memory_report.record('facts: compact', compact_fact_frame(facts_df))
+
+        query, params = self._expense_facts_query(user_id, selected_year, selected_month)
+        ids_df = self.memory_report.record('facts: ids from database', self.execute_query(query, params))
+        if ids_df.empty:
+            return ids_df
+        facts_df = self.dimensions.attach_names(self, ids_df, FACT_DIMENSIONS, categorical=True)
+        return self.memory_report.record('facts: compact', order_expense_facts(compact_fact_frame(facts_df)))
+
+    def fetch_expense_page(self, user_id='ALL Users', selected_year=None, selected_month=None, category_id=None,
+                           after=None, page_size=DEFAULT_PAGE_SIZE):
         """
-        
-        # Filter by user
-        if user_id != 'ALL Users' and user_id is not None:
-            query += f" AND e.user_id = '{user_id}'"
-        
-        # Filter by year
-        if selected_year is not None:
-            query += f" AND YEAR(e.expense_date) = {selected_year}"
-        
-        # Filter by month
-        if selected_month is not None:
-            try:
-                month_numeric = list(calendar.month_name).index(selected_month)
-                query += f" AND MONTH(e.expense_date) = {month_numeric}"
-            except ValueError:
-                logger.warning(f"Invalid month name provided: {selected_month}")
-        
-        query += " ORDER BY c.category_name;"
-        logger.debug(f"Generated fetch_categories query: {query}")
-
+        Fetch one page of individual expenses, newest first, for the dashboard filters.
+        `after` is the (expense_date, expense_id) key returned with the previous page; each page
+        is one range read on the keyset indexes (scripts/migrate.py, migration 5), however deep
+        into the history it is. Returns (page DataFrame, key for the next page or None at the end).
+        """
+        where_sql, params = build_expense_filters(user_id, selected_year, selected_month, category_id)
+        keyset_sql, keyset_params = build_keyset_filter(after)
+        # Keyset bound first: given two upper bounds on expense_date, SQLite seeks on the first one
+        query = FETCH_EXPENSE_PAGE_BASE_QUERY + keyset_sql + where_sql + EXPENSE_PAGE_ORDER_BY
+        # One extra row says whether another page follows, without a COUNT(*) over the whole range
+        params = keyset_params + params + (int(page_size) + 1,)
+        logger.debug(f"Generated expense page query: {query} {params}")
+
+        page_df = self.execute_query(query, params)
+        next_key = None
+        if len(page_df) > page_size:
+            page_df = page_df.iloc[:page_size]
+            last = page_df.iloc[-1]
+            next_key = (pd.Timestamp(last['expense_date']).date(), int(last['expense_id']))
+        page_df = self.dimensions.attach_names(self, page_df).reindex(columns=EXPENSE_PAGE_COLUMNS)
+        return self.memory_report.record('transactions page', page_df), next_key
+
+    def iter_expense_facts(self, user_id='ALL Users', selected_year=None, selected_month=None,
+                           chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Stream expense facts for the filters as typed DataFrame chunks (see iter_query_chunks),
+        with names attached to each chunk as in fetch_expense_facts. Unordered.
+        """
+        query, params = self._expense_facts_query(user_id, selected_year, selected_month)
+        chunks = self.iter_query_chunks(query, params, chunk_size)
         try:
-            with self.get_db_connection() as conn:
-                with conn.cursor() as cursor:
-                    cursor.execute(query)
-                    categories = cursor.fetchall()
-                    return pd.DataFrame(categories, columns=['category_id', 'category_name'])
-        except Exception as e:
-            logger.error(f"Error fetching categories: {e}")
-            return pd.DataFrame()
+            for chunk in chunks:
+                yield self.dimensions.attach_names(self, chunk, FACT_DIMENSIONS)
+        finally:
+            chunks.close()  # Abandoned early: release (discard) the streaming connection now
 
+    def _expense_facts_query(self, user_id, selected_year, selected_month):
+        where_sql, params = build_expense_filters(user_id, selected_year, selected_month)
+        query = FETCH_EXPENSE_FACTS_BASE_QUERY + where_sql
+        logger.debug(f"Generated expense facts query: {query} {params}")
+        return query, params
+
+    def fetch_categories(self, user_id='ALL Users', selected_year=None, selected_month=None):
+        """
+        Fetch distinct expense categories for a specific user, year, and month.
+        """
+        where_sql, params = build_expense_filters(user_id, selected_year, selected_month)
+        query = FETCH_CATEGORIES + where_sql + " ORDER BY c.category_name"
+        logger.debug(f"Generated fetch_categories query: {query} {params}")
+        return self.execute_query(query, params)
 
     def fetch_subcategories(self, user_id='ALL Users', selected_year=None, selected_month=None, category_id=None):
         """
         Fetch distinct subcategories based on user, year, month, and optionally category_id.
         """
-        query = FETCH_SUBCATEGORIES
-        
-        # Filter by user
-        if user_id != 'ALL Users' and user_id is not None:
-            query += f" AND e.user_id = '{user_id}'"
-        
-        # Filter by year
-        if selected_year is not None:
-            query += f" AND YEAR(e.expense_date) = {selected_year}"
-        
-        # Filter by month
-        if selected_month is not None:
-            try:
-                month_numeric = list(calendar.month_name).index(selected_month)
-                query += f" AND MONTH(e.expense_date) = {month_numeric}"
-            except ValueError:
-                logger.warning(f"Invalid month name provided: {selected_month}")
-        
-        # Filter by category
-        if category_id is not None:
-            query += f" AND s.category_id = {category_id}"
-        
-        query += " ORDER BY s.subcategory_name;"
-        logger.debug(f"Generated fetch_subcategories query: {query}")
+        where_sql, params = build_expense_filters(user_id, selected_year, selected_month, category_id,
+                                                  category_column='s.category_id')
+        query = FETCH_SUBCATEGORIES + where_sql + " ORDER BY s.subcategory_name"
+        logger.debug(f"Generated fetch_subcategories query: {query} {params}")
+        return self.execute_query(query, params)
 
-        try:
-            with self.get_db_connection() as conn:
-                with conn.cursor() as cursor:
-                    cursor.execute(query)
-                    subcategories = cursor.fetchall()
-                    return pd.DataFrame(subcategories, columns=['subcategory_id', 'subcategory_name'])
-        except Exception as e:
-            logger.error(f"Error fetching subcategories: {e}")
-            return pd.DataFrame()
-        
     def fetch_payment_mode_counts(self, user_id='ALL Users', selected_year=None, selected_month=None, category_id=None):
         """
         Fetch count of payment modes used for selected user, year, month, and category.
         """
-        query = FETCH_PAYMENT_MODE_COUNT_QUERY
-
-        # Filter by user
-        if user_id != 'ALL Users' and user_id is not None:
-            query += f" AND e.user_id = '{user_id}'"
-
-        # Filter by year
-        if selected_year is not None:
-            query += f" AND YEAR(e.expense_date) = {selected_year}"
-
-        # Filter by month
-        if selected_month is not None:
+        where_sql, params = build_expense_filters(user_id, selected_year, selected_month, category_id)
+        query = FETCH_PAYMENT_MODE_COUNT_QUERY + where_sql
+        logger.debug(f"Generated fetch_payment_mode_counts query: {query} {params}")
+        payment_mode_df = self.dimensions.attach_names(self, self.execute_query(query, params))
+        return payment_mode_df.reindex(columns=PAYMENT_MODE_COUNT_COLUMNS)
+
+    def fetch_expense_summary(self, user_id='ALL Users', selected_year=None, selected_month=None, category_id=None,
+                              group_by=('category', 'subcategory', 'payment_mode'), use_rollup=None,
+                              use_snapshot=None):
+        """
+        Fetch SUM/COUNT/MIN/MAX of amount_paid grouped by the given dimensions
+        ('category', 'subcategory', 'payment_mode', 'year', 'month'), so only O(groups) rows leave the database.
+        expense_count counts all rows; amount_count counts rows with a non-null amount.
+        The database groups on ids; names are attached from the dimension registry.
+
+        All dashboard filters are whole months, so by default the answer comes from the
+        expense_monthly_rollup table when it exists (min_amount/max_amount are then NULL).
+        Pass use_rollup=False to force a scan of expenses.
+        When DB_SNAPSHOT_PATH points at a Parquet snapshot, it is aggregated instead (use_snapshot=False
+        to query the database).
+        """
+        unknown = set(group_by) - set(SUMMARY_DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown summary dimension(s): {sorted(unknown)}")
+
+        if use_snapshot is None:
+            use_snapshot = self.snapshot_available()
+        if use_snapshot:
+            from backend.database.parquet_snapshot import fetch_snapshot_summary
+            return fetch_snapshot_summary(self.snapshot_path, user_id, selected_year, selected_month, category_id,
+                                          group_by)
+
+        if use_rollup is None:
+            use_rollup = self.rollup_available()
+
+        # Grouped on ids only. A subcategory only counts under its own category, which needs the category id
+        sql_group_by = list(group_by)
+        if 'subcategory' in group_by and 'category' not in group_by:
+            sql_group_by.insert(0, 'category')
+
+        if use_rollup:
+            select_columns = [column for dimension in sql_group_by for column in ROLLUP_SUMMARY_DIMENSIONS[dimension]]
+            base_query = FETCH_ROLLUP_SUMMARY_QUERY
+            where_sql, params = build_rollup_filters(user_id, selected_year, selected_month, category_id)
+        else:
+            select_columns = [column for dimension in sql_group_by for column in SUMMARY_DIMENSIONS[dimension]]
+            base_query = FETCH_EXPENSE_SUMMARY_QUERY
+            where_sql, params = build_expense_filters(user_id, selected_year, selected_month, category_id)
+
+        group_columns = ", ".join(column.split(" AS ")[0] for column in select_columns)
+        query = base_query.format(select_columns=", ".join(select_columns)) + where_sql + f" GROUP BY {group_columns}"
+        logger.debug(f"Generated fetch_expense_summary query: {query} {params}")
+
+        summary_df = self.dimensions.attach_names(self, self.execute_query(query, params))
+        # Already typed by the SQL casts; this only normalises all-NULL columns (e.g. rollup min/max)
+        for column in SUMMARY_MEASURES:
+            if column in summary_df.columns:
+                summary_df[column] = pd.to_numeric(summary_df[column], errors='coerce')
+
+        if 'subcategory' in group_by and not summary_df.empty:
+            keys = [column for column in summary_df.columns if column not in SUMMARY_MEASURES]
+            if 'category' not in group_by:
+                keys = [column for column in keys if column not in ('category_id', 'category_name')]
+            # Subcategories filed under another category came back as NULL; merge those rows into one
+            # group (and, when grouping by subcategory alone, drop the category the query added)
+            if 'category' not in group_by or summary_df.duplicated(keys).any():
+                summary_df = summary_df.groupby(keys, dropna=False, sort=False, as_index=False).agg(
+                    expense_count=('expense_count', 'sum'),
+                    amount_count=('amount_count', 'sum'),
+                    total_amount=('total_amount', lambda amounts: amounts.sum(min_count=1)),
+                    min_amount=('min_amount', 'min'),
+                    max_amount=('max_amount', 'max'),
+                )
+        return self.memory_report.record(f"summary by {', '.join(group_by)}", summary_df)
+
+    def snapshot_available(self):
+        """Whether DB_SNAPSHOT_PATH names an existing Parquet snapshot directory."""
+        return bool(self.snapshot_path) and os.path.isdir(self.snapshot_path)
+
+    def rollup_available(self):
+        """Whether reads may use expense_monthly_rollup (DB_USE_ROLLUP=0 disables it). Checked once per process."""
+        if os.getenv('DB_USE_ROLLUP', '1') == '0':
+            return False
+        return self.table_exists('expense_monthly_rollup')
+
+    def table_exists(self, table_name):
+        """Whether `table_name` exists in the database. Looked up once per process; False if the check fails."""
+        key = self.cache_scope + (table_name,)
+        if key not in _existing_tables:
             try:
-                month_numeric = list(calendar.month_name).index(selected_month)
-                query += f" AND MONTH(e.expense_date) = {month_numeric}"
-            except ValueError:
-                logger.warning(f"Invalid month name provided: {selected_month}")
-
-        # Filter by category
-        if category_id is not None:
-            query += f" AND e.category_id = {category_id}"
-
-        #query += " GROUP BY c.category_name,pm.payment_mode_name ORDER BY payment_count DESC;"
-        logger.debug(f"Generated fetch_payment_mode_counts query: {query}")
-
+                query = CHECK_TABLE_SQLITE_QUERY if self.backend == 'sqlite' else CHECK_TABLE_QUERY
+                with self.get_db_connection() as conn:
+                    with conn.cursor() as cursor, self.query_stats.timer(query) as timer:
+                        cursor.execute(query, (table_name,))
+                        timer.first_row()
+                        _existing_tables[key] = cursor.fetchone()[0] > 0
+                        timer.done(1)
+            except Exception as e:
+                logger.warning(f"Could not check for the {table_name} table: {e}")
+                return False
+        return _existing_tables[key]
+
+    def column_exists(self, table_name, column_name):
+        """Whether `table_name` has `column_name`. Looked up once per process; False if the check fails."""
+        key = self.cache_scope + (table_name, column_name)
+        if key not in _existing_tables:
+            try:
+                query = CHECK_COLUMN_SQLITE_QUERY if self.backend == 'sqlite' else CHECK_COLUMN_QUERY
+                with self.get_db_connection() as conn:
+                    with conn.cursor() as cursor, self.query_stats.timer(query) as timer:
+                        cursor.execute(query, (table_name, column_name))
+                        timer.first_row()
+                        _existing_tables[key] = cursor.fetchone()[0] > 0
+                        timer.done(1)
+            except Exception as e:
+                logger.warning(f"Could not check for the {table_name}.{column_name} column: {e}")
+                return False
+        return _existing_tables[key]
+
+    def data_version(self):
+        """
+        Return a token that changes whenever expenses, categories, subcategories, payment_modes or users change,
+        so cached results can be reused until exactly then. Reads the trigger-maintained data_versions
+        counters (scripts/migrate.py, migration 3), falling back to row counts, newest ids and last
+        updates. Probed at most once per DB_VERSION_CHECK_INTERVAL seconds per instance; None if it fails.
+        """
+        now = time.monotonic()
+        if self._data_version is not None and now - self._data_version_checked_at < DATA_VERSION_CHECK_INTERVAL:
+            return self._data_version
 
+        query = (FETCH_DATA_VERSIONS_QUERY if self.table_exists('data_versions')
+                 else FETCH_DATA_VERSIONS_FALLBACK_QUERY)
         try:
             with self.get_db_connection() as conn:
-                with conn.cursor() as cursor:
+                with conn.cursor() as cursor, self.query_stats.timer(query) as timer:
                     cursor.execute(query)
-                    payment_modes = cursor.fetchall()
-                    return pd.DataFrame(payment_modes, columns=['expense_date','category_name','payment_mode_name', 'payment_count'])
+                    timer.first_row()
+                    rows = cursor.fetchall()
+                    timer.done(len(rows))
         except Exception as e:
-            logger.error(f"Error fetching payment mode counts: {e}")
-            return pd.DataFrame()
\ No newline at end of file
+            logger.warning(f"Could not read the data version: {e}")
+            return None
+
+        self._data_version = tuple(sorted(tuple(row) for row in rows))
+        self._data_version_checked_at = now
+        return self._data_version
+
+    def fetch_monthly_summary(self, user_id='ALL Users', selected_year=None):
+        """Expense count and total per month of the selected year."""
+        return self.fetch_expense_summary(user_id, selected_year, group_by=('year', 'month'))
+
+    def fetch_yearly_summary(self, user_id='ALL Users'):
+        """Expense count and total per year."""
+        return self.fetch_expense_summary(user_id, group_by=('year',))
+
+    def fetch_category_summary(self, user_id='ALL Users', selected_year=None, selected_month=None):
+        """Per-category SUM/COUNT/MIN/MAX of amount_paid for the filters."""
+        return self.fetch_expense_summary(user_id, selected_year, selected_month, group_by=('category',))
+
+    def fetch_subcategory_summary(self, user_id='ALL Users', selected_year=None, selected_month=None, category_id=None):
+        """Per-(category, subcategory) SUM/COUNT/MIN/MAX of amount_paid for the filters."""
+        return self.fetch_expense_summary(user_id, selected_year, selected_month, category_id,
+                                          group_by=('category', 'subcategory'))
+
+    def fetch_payment_mode_summary(self, user_id='ALL Users', selected_year=None, selected_month=None, category_id=None):
+        """Per-(category, payment mode) expense counts and amounts for the filters."""
+        return self.fetch_expense_summary(user_id, selected_year, selected_month, category_id,
+                                          group_by=('category', 'payment_mode'))
@@ -0,0 +1,243 @@
+import datetime
+import os
+import sqlite3
+import logging
+from dotenv import load_dotenv
+from backend.database import sqlite_backend
+from backend.database.db_operations import DEFAULT_CHUNK_SIZE
+from backend.database.schema import MIGRATIONS
+from backend.database.queries import (SYNC_TABLE_COLUMNS, SYNC_FINGERPRINT_COLUMNS, FETCH_SERVER_TIME_QUERY,
+                                      FETCH_CHANGED_EXPENSE_IDS_QUERY, PRUNE_EXPENSE_CHANGES_QUERY)
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Changes are re-read from this many seconds before the previous sync started, so rows committed late
+# (by transactions that began before the watermark) are still picked up; re-applying a row is a no-op
+SYNC_OVERLAP_SECONDS = float(os.getenv('DB_SYNC_OVERLAP_SECONDS', 300))
+
+# Change-log entries older than this are pruned; a copy last synced before that does a full resync
+SYNC_RETENTION_DAYS = float(os.getenv('DB_SYNC_RETENTION_DAYS', 7))
+
+# Expense ids per `IN (...)` lookup of changed rows
+ID_BATCH_SIZE = 500
+
+PRIMARY_KEYS = {
+    'users': 'user_id',
+    'categories': 'category_id',
+    'subcategories': 'subcategory_id',
+    'payment_modes': 'payment_mode_id',
+    'expenses': 'expense_id',
+}
+DIMENSION_TABLES = ('users', 'categories', 'subcategories', 'payment_modes')
+
+MIGRATIONS_BY_VERSION = {migration['version']: migration for migration in MIGRATIONS}
+
+SYNC_STATE_SQL = "CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+
+
+def _as_datetime(value):
+    # MySQL returns CURRENT_TIMESTAMP as a datetime, SQLite as 'YYYY-MM-DD HH:MM:SS' text
+    return datetime.datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _upsert_sql(table, columns):
+    """
+    INSERT ... ON CONFLICT DO UPDATE of `columns` for `table` that only touches rows whose values differ,
+    so re-applied rows do not fire the local triggers (and do not invalidate cached dashboard results).
+    """
+    key = PRIMARY_KEYS[table]
+    names = list(columns) + (['password'] if table == 'users' else [])
+    values = ['%s'] * len(columns) + (["''"] if table == 'users' else [])
+    updated = [column for column in columns if column != key]
+    return (
+        f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join(values)}) "
+        f"ON CONFLICT ({key}) DO UPDATE SET {', '.join(f'{column} = excluded.{column}' for column in updated)} "
+        f"WHERE ({', '.join(f'{table}.{column}' for column in updated)}) "
+        f"IS NOT ({', '.join(f'excluded.{column}' for column in updated)})"
+    )
+
+
+def _select_sql(table, columns):
+    return f"SELECT {', '.join(columns)} FROM {table}"
+
+
+class LocalExpenseCopy:
+    """
+    A local SQLite copy of the expense tables, kept current by pulling only what changed.
+    Each refresh reads the expense ids written since the last watermark from the change log
+    (scripts/migrate.py, migration 4), re-reads those rows, upserts the ones that still exist and
+    deletes the rest. The small dimension tables are diffed in full. The copy has the same schema,
+    so the dashboard can read it with DB_BACKEND=sqlite and DB_SQLITE_PATH pointing at it.
+    """
+
+    def __init__(self, source_ops, path, overlap_seconds=SYNC_OVERLAP_SECONDS,
+                 retention_days=SYNC_RETENTION_DAYS, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.source_ops = source_ops
+        self.path = path
+        self.overlap = datetime.timedelta(seconds=overlap_seconds)
+        self.retention = datetime.timedelta(days=retention_days)
+        self.chunk_size = chunk_size
+        self.columns = dict(SYNC_TABLE_COLUMNS)
+        if not source_ops.column_exists('expenses', 'fingerprint'):
+            # Source before migration 7: the copy keeps NULL source references and fingerprints
+            self.columns['expenses'] = tuple(column for column in SYNC_TABLE_COLUMNS['expenses']
+                                             if column not in SYNC_FINGERPRINT_COLUMNS)
+
+    def refresh(self, full=False):
+        """
+        Bring the local copy up to date with the source database in one local transaction
+        (readers of the copy see either the old or the new state). Does a full copy on first use,
+        when `full` is set, or when the last sync is older than the change-log retention.
+        Returns counts of what was pulled and applied.
+        """
+        local = self._open_local()
+        source = self.source_ops.get_db_connection()
+        try:
+            state = self._read_state(local)
+            source_cursor = source.cursor()
+            source_cursor.execute(FETCH_SERVER_TIME_QUERY)
+            started = _as_datetime(source_cursor.fetchone()[0])
+            since = state.get('since')
+            full = full or since is None or started - datetime.datetime.fromisoformat(since) > self.retention
+
+            cursor = local.cursor()
+            cursor.execute("BEGIN")
+            # Parents are synced after the expense rows are read; checking foreign keys at commit lets
+            # expenses be applied first without failing on a category created in between
+            cursor.execute("PRAGMA defer_foreign_keys = ON")
+            if full:
+                stats = self._copy_all_expenses(source_cursor, cursor)
+            else:
+                stats = self._apply_expense_changes(source_cursor, cursor, since)
+            stats['dimension_rows_deleted'] = self._sync_dimensions(source_cursor, cursor)
+            stats['full'] = full
+
+            # Next sync starts a little before this one did, to catch transactions that commit late
+            watermark = started - self.overlap
+            cursor.executemany("INSERT OR REPLACE INTO sync_state (name, value) VALUES (%s, %s)",
+                               [('since', watermark.isoformat(' ')), ('synced_at', started.isoformat(' '))])
+            cursor.close()
+            source_cursor.close()
+            local.commit()
+        except sqlite3.IntegrityError:
+            # A parent row was created and deleted between two reads; only a fresh full copy is consistent
+            local.rollback()
+            if full:
+                raise
+            logger.warning("Local copy references a row deleted during the sync; doing a full resync")
+            return self.refresh(full=True)
+        except Exception:
+            local.rollback()
+            raise
+        finally:
+            source.close()
+            local.close()
+
+        logger.info(f"Synced local expense copy at {self.path}: {stats}")
+        return stats
+
+    def _open_local(self):
+        if not os.path.exists(self.path) or not self._has_sync_state():
+            sqlite_backend.create_schema(self.path)
+        local = sqlite_backend.connect(self.path)
+        cursor = local.cursor()
+        cursor.execute(SYNC_STATE_SQL)
+        # The copy is never a sync source itself, so it does not need its own change log
+        for event in ('insert', 'update', 'delete'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_expenses_changelog_{event}")
+        # A copy made before the fingerprint columns existed gets them, and one full resync to fill them
+        cursor.execute("SELECT COUNT(*) FROM pragma_table_info('expenses') WHERE name = 'fingerprint'")
+        if cursor.fetchone()[0] == 0:
+            for sql in sqlite_backend.migration_statements(MIGRATIONS_BY_VERSION[7]):
+                cursor.execute(sql)
+            cursor.execute("DELETE FROM sync_state WHERE name = 'since'")
+        # and one made before migration 8 a fingerprint index that includes expense_date
+        cursor.execute("SELECT COUNT(*) FROM pragma_index_info('uq_expenses_fingerprint') WHERE name = 'expense_date'")
+        if cursor.fetchone()[0] == 0:
+            for sql in sqlite_backend.migration_statements(MIGRATIONS_BY_VERSION[8]):
+                cursor.execute(sql)
+        local.commit()
+        cursor.close()
+        return local
+
+    def _has_sync_state(self):
+        local = sqlite_backend.connect(self.path)
+        try:
+            cursor = local.cursor()
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'sync_state'")
+            return cursor.fetchone()[0] > 0
+        finally:
+            local.close()
+
+    @staticmethod
+    def _read_state(local):
+        cursor = local.cursor()
+        cursor.execute("SELECT name, value FROM sync_state")
+        state = dict(cursor.fetchall())
+        cursor.close()
+        return state
+
+    def _copy_all_expenses(self, source_cursor, cursor):
+        cursor.execute("DELETE FROM expenses")
+        source_cursor.execute(_select_sql('expenses', self.columns['expenses']))
+        upsert = _upsert_sql('expenses', self.columns['expenses'])
+        pulled = 0
+        while True:
+            rows = source_cursor.fetchmany(self.chunk_size)
+            if not rows:
+                break
+            cursor.executemany(upsert, rows)
+            pulled += len(rows)
+        return {'expenses_pulled': pulled, 'expenses_deleted': 0}
+
+    def _apply_expense_changes(self, source_cursor, cursor, since):
+        source_cursor.execute(FETCH_CHANGED_EXPENSE_IDS_QUERY, (datetime.datetime.fromisoformat(since),))
+        changed_ids = [row[0] for row in source_cursor.fetchall()]
+
+        rows = []
+        for start in range(0, len(changed_ids), ID_BATCH_SIZE):
+            batch = changed_ids[start:start + ID_BATCH_SIZE]
+            source_cursor.execute(
+                f"{_select_sql('expenses', self.columns['expenses'])} WHERE expense_id IN ({', '.join(['%s'] * len(batch))})", batch)
+            rows.extend(source_cursor.fetchall())
+
+        # Changed ids that no longer exist in the source were deleted there
+        deleted_ids = set(changed_ids) - {row[0] for row in rows}
+        # Deletes first: a re-created expense may carry the fingerprint of the one it replaced
+        cursor.executemany("DELETE FROM expenses WHERE expense_id = %s", [(expense_id,) for expense_id in deleted_ids])
+        cursor.executemany(_upsert_sql('expenses', self.columns['expenses']), rows)
+        return {'expenses_pulled': len(rows), 'expenses_deleted': len(deleted_ids)}
+
+    def _sync_dimensions(self, source_cursor, cursor):
+        # Users, categories, subcategories and payment modes are small: upsert them all, delete the
+        # ones gone from the source (the local foreign keys cascade to expenses as they do in MySQL)
+        deleted = 0
+        for table in DIMENSION_TABLES:
+            source_cursor.execute(_select_sql(table, self.columns[table]))
+            rows = source_cursor.fetchall()
+            cursor.executemany(_upsert_sql(table, self.columns[table]), rows)
+
+            key = PRIMARY_KEYS[table]
+            cursor.execute(f"SELECT {key} FROM {table}")
+            missing = {row[0] for row in cursor.fetchall()} - {row[0] for row in rows}
+            cursor.executemany(f"DELETE FROM {table} WHERE {key} = %s", [(row_id,) for row_id in missing])
+            deleted += len(missing)
+        return deleted
+
+
+def prune_change_log(source_ops, retention_days=SYNC_RETENTION_DAYS):
+    """Delete change-log entries older than the retention window; returns the number of rows removed."""
+    conn = source_ops.get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(FETCH_SERVER_TIME_QUERY)
+        cutoff = _as_datetime(cursor.fetchone()[0]) - datetime.timedelta(days=retention_days)
+        cursor.execute(PRUNE_EXPENSE_CHANGES_QUERY, (cutoff,))
+        removed = cursor.rowcount
+        conn.commit()
+        cursor.close()
+        return removed
+    finally:
+        conn.close()
@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+import logging
+import pandas as pd
+from dotenv import load_dotenv
+from backend.database.queries import FETCH_DIMENSION_QUERIES
+from backend.database.result_frames import frame_from_rows
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Reload the dimension tables at least this often (seconds), even when no change counter moved
+# (e.g. a database without migration 6 has no counter for users)
+DIMENSION_MAX_AGE = float(os.getenv('DB_DIMENSION_MAX_AGE', 300))
+
+# (id column, name column) per dimension
+DIMENSIONS = {
+    'user': ('user_id', 'user_name'),
+    'category': ('category_id', 'category_name'),
+    'subcategory': ('subcategory_id', 'subcategory_name'),
+    'payment_mode': ('payment_mode_id', 'payment_mode_name'),
+}
+
+# Tables whose data_version() entries mean the dimensions changed
+_DIMENSION_TABLES = ('users', 'categories', 'subcategories', 'payment_modes')
+
+
+def _dimension_version(version):
+    """The users/categories/subcategories/payment_modes part of a DatabaseOperations.data_version() token."""
+    if version is None:
+        return None
+    return tuple(row for row in version if row[0] in _DIMENSION_TABLES)
+
+
+class DimensionRegistry:
+    """
+    Users, categories, subcategories and payment modes, loaded whole and kept in memory so fact
+    queries can return integer ids only. The four tables are read together on one pooled connection,
+    and again only when their data_version() counters change (or after DB_DIMENSION_MAX_AGE seconds).
+    Methods take the DatabaseOperations to load through; the registry itself is shared per database.
+    """
+
+    def __init__(self, max_age=DIMENSION_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._tables = None
+        self._name_dtypes = None
+        self._version = None
+        self._loaded_at = 0.0
+        self.loads = 0
+
+    def tables(self, db_ops):
+        """
+        {dimension: DataFrame indexed by id} for the four dimensions, reloaded if they changed.
+        If a reload fails the previous tables are kept; before the first successful load they are empty.
+        """
+        return self._current(db_ops)[0]
+
+    def name_dtypes(self, db_ops):
+        """
+        {name column: CategoricalDtype of every name, sorted} for the four dimensions. The same dtype
+        objects are handed out until the next reload, so categorical frames built from them share categories.
+        """
+        return self._current(db_ops)[1]
+
+    def _current(self, db_ops):
+        version = _dimension_version(db_ops.data_version())
+        with self._lock:
+            fresh = (self._tables is not None and version is not None and version == self._version
+                     and time.monotonic() - self._loaded_at < self.max_age)
+            if not fresh:
+                try:
+                    self._tables = self._load(db_ops)
+                    self._name_dtypes = self._build_name_dtypes(self._tables)
+                    self._version = version
+                    self._loaded_at = time.monotonic()
+                    self.loads += 1
+                except Exception as e:
+                    logger.error(f"Error loading dimension tables: {e}")
+                    if self._tables is None:
+                        tables = self._empty_tables()
+                        return tables, self._build_name_dtypes(tables)
+            return self._tables, self._name_dtypes
+
+    def _load(self, db_ops):
+        tables = {}
+        with db_ops.get_db_connection() as conn:
+            for dimension, query in FETCH_DIMENSION_QUERIES.items():
+                with conn.cursor() as cursor, db_ops.query_stats.timer(query, method='load_dimensions') as timer:
+                    cursor.execute(query)
+                    timer.first_row()
+                    rows = cursor.fetchall()
+                    timer.done(len(rows))
+                    frame = frame_from_rows(rows, cursor.description)
+                tables[dimension] = frame.set_index(DIMENSIONS[dimension][0])
+        logger.info("Loaded dimension tables: " + ", ".join(f"{len(t)} {d}" for d, t in tables.items()))
+        return tables
+
+    @staticmethod
+    def _build_name_dtypes(tables):
+        # Sorted, so sorting a categorical column orders names alphabetically, as ORDER BY did
+        return {name_column: pd.CategoricalDtype(sorted(tables[dimension][name_column].dropna().unique()))
+                for dimension, (_, name_column) in DIMENSIONS.items()}
+
+    @staticmethod
+    def _empty_tables():
+        tables = {}
+        for dimension, (id_column, name_column) in DIMENSIONS.items():
+            columns = ['category_id', name_column] if dimension == 'subcategory' else [name_column]
+            tables[dimension] = pd.DataFrame(columns=columns, index=pd.Index([], dtype='int64', name=id_column))
+        return tables
+
+    def names(self, db_ops, dimension):
+        """id -> name Series for one dimension ('user', 'category', 'subcategory' or 'payment_mode')."""
+        return self.tables(db_ops)[dimension][DIMENSIONS[dimension][1]]
+
+    def attach_names(self, db_ops, df, dimensions=tuple(DIMENSIONS), categorical=False):
+        """
+        Return `df` with a name column inserted after each id column of `dimensions` it has, joined the
+        way the SQL queries did: rows whose category or payment mode is unknown are dropped, unknown
+        users get no name, and a subcategory that belongs to a different category than the row's is
+        treated as no subcategory (id and name both null). With `categorical`, the names are
+        Categoricals of name_dtypes(). `df` itself is not modified.
+        """
+        present = [dimension for dimension in dimensions if DIMENSIONS[dimension][0] in df.columns]
+        if not present:
+            return df
+        tables, name_dtypes = self._current(db_ops)
+        df = df.copy(deep=False)
+
+        for dimension in ('category', 'payment_mode'):
+            if dimension in present:
+                id_column = DIMENSIONS[dimension][0]
+                known = df[id_column].isin(tables[dimension].index)
+                if not known.all():
+                    df = df[known]
+
+        if 'subcategory' in present and 'category_id' in df.columns:
+            subcategories = tables['subcategory']
+            parent = df['subcategory_id'].map(subcategories['category_id'])
+            df['subcategory_id'] = df['subcategory_id'].where(parent.eq(df['category_id']))
+
+        for dimension in present:
+            id_column, name_column = DIMENSIONS[dimension]
+            names = df[id_column].map(tables[dimension][name_column])
+            if categorical:
+                names = names.astype(name_dtypes[name_column])
+            df.insert(df.columns.get_loc(id_column) + 1, name_column, names)
+        return df.reset_index(drop=True)
+
+
+# One registry per database, shared by every DatabaseOperations instance and Streamlit rerun
+_shared_dimensions = {}
+_shared_dimensions_lock = threading.Lock()
+
+
+def get_shared_dimensions(scope):
+    """Return the process-wide dimension registry for `scope` (backend, host, database), creating it on first use."""
+    with _shared_dimensions_lock:
+        if scope not in _shared_dimensions:
+            _shared_dimensions[scope] = DimensionRegistry()
+        return _shared_dimensions[scope]
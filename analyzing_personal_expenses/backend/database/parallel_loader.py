@@ -0,0 +1,213 @@
+import datetime
+import multiprocessing
+import os
+import queue
+import re
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from dotenv import load_dotenv
+from backend.database.bulk_loader import (BulkExpenseLoader, load_expense_lookups, BULK_BATCH_SIZE,
+                                          BULK_TRANSACTION_ROWS)
+from backend.database.db_operations import DatabaseOperations
+from backend.database.queries import FETCH_INDEX_NAMES_QUERY, FETCH_INDEX_NAMES_SQLITE_QUERY
+from backend.synthetic_expenses import (SyntheticExpenseGenerator, expense_rows, DEFAULT_START_DATE,
+                                        DEFAULT_END_DATE, DEFAULT_GENERATOR_CHUNK_SIZE)
+from backend.database.schema import MIGRATIONS
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for parallel loads (default: one per core)
+DEFAULT_LOAD_WORKERS = int(os.getenv('DB_LOAD_WORKERS', os.cpu_count() or 1))
+
+# Ways to split a load between workers: disjoint sets of users, or consecutive date ranges
+SPLIT_MODES = ('user', 'date')
+
+# MySQL error raised when dropping an index a foreign key needs
+ER_DROP_INDEX_FK = 1553
+
+
+def expense_secondary_indexes():
+    """(name, columns, MySQL ADD INDEX statement) for every index the migrations (schema.py) add to `expenses`."""
+    indexes = []
+    for migration in MIGRATIONS:
+        for sql in migration['statements']:
+            match = re.match(r'\s*ALTER TABLE expenses\s+ADD INDEX (\w+) \(([^)]*)\)', sql)
+            if match:
+                indexes.append((match.group(1), match.group(2), sql))
+    return indexes
+
+
+@contextmanager
+def deferred_indexes(db_ops):
+    """
+    Drop the secondary indexes migrations added to `expenses` for the duration of the block and
+    rebuild them once at the end (also when the block fails), rather than updating every index on
+    every inserted row. On MySQL an index a foreign key relies on is kept.
+    """
+    query = FETCH_INDEX_NAMES_SQLITE_QUERY if db_ops.backend == 'sqlite' else FETCH_INDEX_NAMES_QUERY
+    with db_ops.get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query, ('expenses',))
+            existing = {row[0] for row in cursor.fetchall()}
+            dropped = []
+            for name, columns, add_sql in expense_secondary_indexes():
+                if name not in existing:
+                    continue
+                try:
+                    if db_ops.backend == 'sqlite':
+                        cursor.execute(f"DROP INDEX {name}")
+                    else:
+                        cursor.execute(f"ALTER TABLE expenses DROP INDEX {name}")
+                    dropped.append((name, columns, add_sql))
+                except Exception as e:
+                    if getattr(e, 'errno', None) != ER_DROP_INDEX_FK:
+                        raise
+                    logger.info(f"Keeping {name} during the load: a foreign key needs it")
+        conn.commit()
+    logger.info(f"Deferred indexes: {', '.join(name for name, _, _ in dropped) or 'none'}")
+
+    try:
+        yield [name for name, _, _ in dropped]
+    finally:
+        started = time.perf_counter()
+        with db_ops.get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                for name, columns, add_sql in dropped:
+                    if db_ops.backend == 'sqlite':
+                        cursor.execute(f"CREATE INDEX {name} ON expenses ({columns})")
+                    else:
+                        cursor.execute(add_sql)
+            conn.commit()
+        logger.info(f"Rebuilt {len(dropped)} indexes in {time.perf_counter() - started:.1f}s")
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    return day.replace(year=day.year + month // 12, month=month % 12 + 1)
+
+
+def split_work(lookups, rows, workers, split='user', seed=None, start=DEFAULT_START_DATE, end=DEFAULT_END_DATE):
+    """
+    Divide `rows` generated expenses into at most `workers` parts that never write the same users
+    (split='user', rows in proportion to each part's users) or the same dates (split='date', whole
+    months each when there are at least as many months as workers).
+    Each part is {'index', 'rows', 'lookups', 'start', 'end', 'seed'}; part seeds derive from `seed`.
+    """
+    if split not in SPLIT_MODES:
+        raise ValueError(f"Unknown split: {split} (expected one of {', '.join(SPLIT_MODES)})")
+    if split == 'user':
+        workers = max(1, min(workers, len(lookups['user_ids'])))
+        user_groups = [lookups['user_ids'][i::workers] for i in range(workers)]
+        shares = [len(group) for group in user_groups]
+        ranges = [(start, end)] * workers
+    else:
+        days = (end - start).days + 1
+        workers = max(1, min(workers, days))
+        bounds = [start + datetime.timedelta(days=days * i // workers) for i in range(workers + 1)]
+        months = (end.year - start.year) * 12 + end.month - start.month + 1
+        if months >= workers:
+            # Whole months each, so workers never add to the same monthly rollup bucket
+            bounds = [start] + [_add_months(start.replace(day=1), months * i // workers)
+                                for i in range(1, workers)] + [end + datetime.timedelta(days=1)]
+        ranges = [(bounds[i], bounds[i + 1] - datetime.timedelta(days=1)) for i in range(workers)]
+        shares = [(last - first).days + 1 for first, last in ranges]
+        user_groups = [lookups['user_ids']] * workers
+
+    total_share = sum(shares)
+    cumulative = [rows * sum(shares[:i]) // total_share for i in range(workers + 1)]
+    parts = []
+    for i in range(workers):
+        parts.append({
+            'index': i,
+            'rows': cumulative[i + 1] - cumulative[i],
+            'lookups': dict(lookups, user_ids=user_groups[i]),
+            'start': ranges[i][0],
+            'end': ranges[i][1],
+            'seed': None if seed is None else [seed, i],
+        })
+    return parts
+
+
+def _load_part(backend, db_config, part, options, progress_queue):
+    """Worker process: generate and load one part on a connection (and transactions) of its own."""
+    db_ops = DatabaseOperations(backend, db_config=db_config)
+    generator = SyntheticExpenseGenerator(part['lookups'], seed=part['seed'], null_rate=options['null_rate'],
+                                          start=part['start'], end=part['end'])
+    chunks = generator.chunks(part['rows'], options['chunk_size'])
+    # Change tracking is recorded per commit, so workers do not queue on the shared data_versions row
+    loader = BulkExpenseLoader(db_ops, batch_size=options['batch_size'],
+                               transaction_rows=options['transaction_rows'], method=options['method'],
+                               defer_change_tracking=True)
+    try:
+        return loader.load((row for chunk in chunks for row in expense_rows(chunk)),
+                           progress=lambda stats: progress_queue.put((part['index'], stats['rows'])))
+    finally:
+        db_ops.pool.close_all()
+
+
+def load_parallel(db_ops, rows, workers=DEFAULT_LOAD_WORKERS, split='user', seed=None, null_rate=0.0,
+                  chunk_size=DEFAULT_GENERATOR_CHUNK_SIZE, batch_size=BULK_BATCH_SIZE,
+                  transaction_rows=BULK_TRANSACTION_ROWS, method='executemany', defer_indexes=False,
+                  progress=None):
+    """
+    Generate and load `rows` expenses with a pool of worker processes, split by user or date range
+    (split_work). Every worker loads its part through its own connection and transactions.
+    `progress`, if given, is called in this process with {'rows', 'total', 'rows_per_second',
+    'workers_done', 'workers'} whenever a worker commits. With `defer_indexes`, the secondary indexes
+    on `expenses` are dropped for the load and rebuilt after it (deferred_indexes).
+    Returns {'rows', 'workers', 'seconds', 'rows_per_second', 'parts'}, parts being each worker's
+    BulkExpenseLoader stats. If a worker fails, the others are waited for and the error re-raised;
+    the rows they committed stay.
+
+    Workers write disjoint rows of expenses and of the monthly rollup. On MySQL (migration 9) they defer
+    the data-version and change-log triggers to their commits (BulkExpenseLoader), so the only row they
+    share, the 'expenses' data version, is locked once per commit rather than once per row.
+    """
+    parts = split_work(load_expense_lookups(db_ops), rows, workers, split, seed)
+    options = {'null_rate': null_rate, 'chunk_size': chunk_size, 'batch_size': batch_size,
+               'transaction_rows': transaction_rows, 'method': method}
+    committed = [0] * len(parts)
+    started = time.perf_counter()
+
+    def report(workers_done):
+        seconds = time.perf_counter() - started
+        if progress is not None:
+            progress({'rows': sum(committed), 'total': rows,
+                      'rows_per_second': sum(committed) / seconds if seconds else 0.0,
+                      'workers_done': workers_done, 'workers': len(parts)})
+
+    def drain(progress_queue):
+        updated = False
+        while True:
+            try:
+                index, part_rows = progress_queue.get_nowait()
+            except queue.Empty:
+                return updated
+            committed[index] = part_rows
+            updated = True
+
+    # Spawned rather than forked: a forked worker would inherit this process's pooled connections
+    context = multiprocessing.get_context('spawn')
+    indexes = deferred_indexes(db_ops) if defer_indexes else nullcontext()
+    with indexes, context.Manager() as manager, \
+            ProcessPoolExecutor(max_workers=len(parts), mp_context=context) as executor:
+        progress_queue = manager.Queue()
+        futures = [executor.submit(_load_part, db_ops.backend, db_ops.db_config, part, options, progress_queue)
+                   for part in parts]
+        pending = set(futures)
+        while pending:
+            _, pending = wait(pending, timeout=0.5)
+            if drain(progress_queue) or not pending:
+                report(len(futures) - len(pending))
+        results = [future.result() for future in futures]
+
+    seconds = time.perf_counter() - started
+    loaded = sum(result['rows'] for result in results)
+    logger.info(f"Loaded {loaded} expenses with {len(parts)} workers in {seconds:.2f}s "
+                f"({loaded / seconds if seconds else 0:.0f} rows/s)")
+    return {'rows': loaded, 'workers': len(parts), 'seconds': seconds,
+            'rows_per_second': loaded / seconds if seconds else 0.0, 'parts': results}
@@ -0,0 +1,166 @@
+import os
+import shutil
+import tempfile
+import logging
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from backend.database.query_builder import ALL_USERS, parse_month
+from backend.fact_frame import order_expense_facts
+
+logger = logging.getLogger(__name__)
+
+# Expense facts as stored in the snapshot (DatabaseOperations.iter_expense_facts, with names, plus the partition keys)
+SNAPSHOT_SCHEMA = pa.schema([
+    ('expense_date', pa.date32()),
+    ('user_id', pa.int32()),
+    ('category_id', pa.int32()),
+    ('category_name', pa.string()),
+    ('subcategory_id', pa.int32()),
+    ('subcategory_name', pa.string()),
+    ('payment_mode_id', pa.int32()),
+    ('payment_mode_name', pa.string()),
+    ('amount_paid', pa.float64()),
+    ('expense_year', pa.int16()),
+    ('expense_month', pa.int8()),
+])
+
+# Directory layout: <path>/expense_year=2024/expense_month=1/part-0.parquet
+PARTITIONING = ds.partitioning(
+    pa.schema([('expense_year', pa.int16()), ('expense_month', pa.int8())]), flavor='hive'
+)
+
+# Parquet dictionary-encodes these on disk; they are read back as dictionary arrays (pandas categoricals)
+DICTIONARY_COLUMNS = ['category_name', 'subcategory_name', 'payment_mode_name']
+SNAPSHOT_FORMAT = ds.ParquetFileFormat(read_options={'dictionary_columns': DICTIONARY_COLUMNS})
+
+FACT_COLUMNS = [name for name in SNAPSHOT_SCHEMA.names if name not in ('expense_year', 'expense_month')]
+
+# Snapshot columns for each summary dimension (see SUMMARY_DIMENSIONS in queries.py)
+SNAPSHOT_SUMMARY_DIMENSIONS = {
+    'category': ['category_id', 'category_name'],
+    'subcategory': ['subcategory_id', 'subcategory_name'],
+    'payment_mode': ['payment_mode_id', 'payment_mode_name'],
+    'year': ['expense_year'],
+    'month': ['expense_month'],
+}
+
+
+def _record_batch(chunk_df):
+    """Convert one typed fact chunk into a record batch with the snapshot schema."""
+    chunk_df = chunk_df[FACT_COLUMNS].copy()
+    dates = pd.to_datetime(chunk_df['expense_date'])
+    chunk_df['expense_year'] = dates.dt.year
+    chunk_df['expense_month'] = dates.dt.month
+    return pa.RecordBatch.from_pandas(chunk_df, schema=SNAPSHOT_SCHEMA, preserve_index=False)
+
+
+def write_snapshot(db_ops, path, selected_year=None, chunk_size=None):
+    """
+    Export expense facts (joined with category, subcategory and payment-mode names) to Parquet files
+    under `path`, partitioned by year and month. Rows are streamed from the database chunk by chunk.
+    With `selected_year`, only that year's partitions are replaced; otherwise the whole snapshot is.
+    The new files are written to a staging directory first, so readers never see a half-written year.
+    Returns the number of rows written.
+    """
+    path = os.path.abspath(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.snapshot-', dir=os.path.dirname(path))
+    rows = 0
+
+    def batches():
+        nonlocal rows
+        chunks = (db_ops.iter_expense_facts(None, selected_year, chunk_size=chunk_size) if chunk_size
+                  else db_ops.iter_expense_facts(None, selected_year))
+        for chunk_df in chunks:
+            if not chunk_df.empty:
+                rows += len(chunk_df)
+                yield _record_batch(chunk_df)
+
+    try:
+        ds.write_dataset(
+            batches(), staging, schema=SNAPSHOT_SCHEMA, format='parquet', partitioning=PARTITIONING,
+            basename_template='part-{i}.parquet', existing_data_behavior='overwrite_or_ignore',
+        )
+        if selected_year is None:
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(staging, path)
+        else:
+            year_dir = f"expense_year={int(selected_year)}"
+            shutil.rmtree(os.path.join(path, year_dir), ignore_errors=True)
+            if os.path.isdir(os.path.join(staging, year_dir)):
+                os.makedirs(path, exist_ok=True)
+                os.replace(os.path.join(staging, year_dir), os.path.join(path, year_dir))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    logger.info(f"Wrote {rows} expense rows to the snapshot at {path}")
+    return rows
+
+
+def snapshot_filter(user_id=None, selected_year=None, selected_month=None, category_id=None):
+    """
+    Dataset filter for the dashboard filters. Year/month conditions are on partition keys, so
+    non-matching directories are never opened; user/category use Parquet row-group statistics.
+    """
+    conditions = []
+    if selected_year is not None:
+        conditions.append(pc.field('expense_year') == int(selected_year))
+
+    month_numeric = parse_month(selected_month)
+    if month_numeric is not None:
+        conditions.append(pc.field('expense_month') == month_numeric)
+
+    if user_id is not None and user_id not in ALL_USERS:
+        conditions.append(pc.field('user_id') == int(user_id))
+
+    if category_id is not None:
+        conditions.append(pc.field('category_id') == int(category_id))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read_snapshot(path, columns=None, user_id=None, selected_year=None, selected_month=None, category_id=None):
+    """Read the filtered snapshot rows as an Arrow table, projecting only `columns`."""
+    dataset = ds.dataset(path, format=SNAPSHOT_FORMAT, partitioning=PARTITIONING)
+    table = dataset.to_table(columns=columns, filter=snapshot_filter(user_id, selected_year, selected_month, category_id))
+    return table.unify_dictionaries()  # Each file has its own dictionary; grouping and pandas need one per column
+
+
+def _to_frame(table):
+    df = table.to_pandas(date_as_object=False)
+    # Categories come in file order; sort them so sort_values orders names alphabetically, as in SQL
+    for column in DICTIONARY_COLUMNS:
+        if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].cat.set_categories(sorted(df[column].cat.categories))
+    return df
+
+
+def fetch_snapshot_facts(path, user_id=None, selected_year=None, selected_month=None, ordered=True):
+    """Same frame as DatabaseOperations.fetch_expense_facts (before compact_fact_frame), read from the snapshot."""
+    # The partition keys come along as the int16/int8 expense_year and expense_month of a compact fact frame
+    df = _to_frame(read_snapshot(path, SNAPSHOT_SCHEMA.names, user_id, selected_year, selected_month))
+    return order_expense_facts(df) if ordered else df
+
+
+def fetch_snapshot_summary(path, user_id=None, selected_year=None, selected_month=None, category_id=None,
+                           group_by=('category', 'subcategory', 'payment_mode')):
+    """Same frame as DatabaseOperations.fetch_expense_summary, aggregated from the snapshot with Arrow."""
+    keys = [column for dimension in group_by for column in SNAPSHOT_SUMMARY_DIMENSIONS[dimension]]
+    table = read_snapshot(path, keys + ['amount_paid'], user_id, selected_year, selected_month, category_id)
+    summary = table.group_by(keys).aggregate([
+        ([], 'count_all'),
+        ('amount_paid', 'count'),
+        ('amount_paid', 'sum'),
+        ('amount_paid', 'min'),
+        ('amount_paid', 'max'),
+    ])
+    summary = summary.select(keys + ['count_all', 'amount_paid_count', 'amount_paid_sum',
+                                     'amount_paid_min', 'amount_paid_max'])
+    summary = summary.rename_columns(keys + ['expense_count', 'amount_count', 'total_amount',
+                                             'min_amount', 'max_amount'])
+    return _to_frame(summary)
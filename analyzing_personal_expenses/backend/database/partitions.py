@@ -0,0 +1,323 @@
+import datetime
+import os
+import re
+import logging
+from dotenv import load_dotenv
+import pandas as pd
+from backend.database.db_operations import DatabaseOperations
+from backend.database.queries import (FETCH_EXPENSE_PARTITIONS_QUERY, FETCH_EXPENSE_FOREIGN_KEYS_QUERY,
+                                      FETCH_EXPENSE_DATE_RANGE_QUERY, FETCH_INDEX_COLUMNS_QUERY,
+                                      CHECK_TABLE_QUERY)
+from backend.database.query_builder import date_range
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Partition sizes: one partition per year of expense_date, or per month
+PARTITION_SCHEMES = ('year', 'month')
+
+# Periods after the current one that get a partition ahead of time (add_future_partitions)
+PARTITIONS_AHEAD = int(os.getenv('DB_PARTITIONS_AHEAD', 2))
+
+# First period of an empty partitioned table; its partition also holds every earlier date
+PARTITION_START = datetime.date.fromisoformat(os.getenv('DB_PARTITION_START', '2020-01-01'))
+
+# Catch-all partition for dates after the last period, split up by add_future_partitions
+MAXVALUE_PARTITION = 'pmax'
+
+# MySQL cannot partition a table with foreign keys, so partitioning replaces the ON DELETE actions of
+# the expenses foreign keys with BEFORE DELETE triggers on the referenced tables. Unlike FK cascades,
+# the deletes and updates they make fire the rollup, data-version and change-log triggers on expenses.
+REFERENTIAL_ACTION_TRIGGERS = {
+    'users': "UPDATE expenses SET user_id = NULL WHERE user_id = OLD.user_id",
+    'subcategories': "UPDATE expenses SET subcategory_id = NULL WHERE subcategory_id = OLD.subcategory_id",
+    # The category's subcategories go with it (their own FK cascade), so expenses filed under them lose it
+    'categories': """BEGIN
+        UPDATE expenses SET subcategory_id = NULL
+        WHERE subcategory_id IN (SELECT subcategory_id FROM subcategories WHERE category_id = OLD.category_id);
+        DELETE FROM expenses WHERE category_id = OLD.category_id;
+    END""",
+    'payment_modes': "DELETE FROM expenses WHERE payment_mode_id = OLD.payment_mode_id",
+}
+
+# The checks the foreign keys made on writes to expenses, as BEFORE INSERT/UPDATE triggers: a referenced id
+# must exist (and is share-locked, as a foreign key check would), or the write fails with the foreign-key error
+REFERENCE_CHECKS = (('user_id', 'users'), ('category_id', 'categories'), ('subcategory_id', 'subcategories'),
+                    ('payment_mode_id', 'payment_modes'))
+ER_NO_REFERENCED_ROW = 1452
+
+
+def reference_check_trigger(event):
+    """CREATE TRIGGER statement that checks the REFERENCE_CHECKS of each row an INSERT or UPDATE writes."""
+    checks = []
+    for column, table in REFERENCE_CHECKS:
+        # An UPDATE that leaves the id as it was needs no check (and must not fail over a since-deleted parent)
+        unchanged = f" AND NOT NEW.{column} <=> OLD.{column}" if event == 'UPDATE' else ""
+        checks.append(f"""IF NEW.{column} IS NOT NULL{unchanged}
+               AND NOT EXISTS (SELECT 1 FROM {table} WHERE {column} = NEW.{column} FOR SHARE) THEN
+            SIGNAL SQLSTATE '23000' SET MYSQL_ERRNO = {ER_NO_REFERENCED_ROW},
+                MESSAGE_TEXT = 'Cannot add or update an expense: no {table} row with this {column}';
+        END IF;""")
+    return (f"CREATE TRIGGER trg_expenses_check_references_{event.lower()} BEFORE {event} ON expenses "
+            f"FOR EACH ROW BEGIN {' '.join(checks)} END")
+
+
+# Names the partitions are given: p2024 (year) or p202403 (month)
+_PARTITION_NAME = re.compile(r'p(\d{4})(\d{2})?$')
+
+
+def period_start(day, scheme):
+    """First day of the year or month containing `day`."""
+    return datetime.date(day.year, 1, 1) if scheme == 'year' else datetime.date(day.year, day.month, 1)
+
+
+def next_period(start, scheme):
+    """First day of the period after the one starting at `start`."""
+    if scheme == 'year':
+        return datetime.date(start.year + 1, 1, 1)
+    return datetime.date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def partition_name(start, scheme):
+    return f"p{start:%Y}" if scheme == 'year' else f"p{start:%Y%m}"
+
+
+def period_partitions(first, last, scheme):
+    """(name, upper bound) of each period from the one containing `first` to the one containing `last`."""
+    if scheme not in PARTITION_SCHEMES:
+        raise ValueError(f"Unknown partition scheme: {scheme} (expected one of {', '.join(PARTITION_SCHEMES)})")
+    partitions = []
+    start = period_start(first, scheme)
+    while start <= last:
+        partitions.append((partition_name(start, scheme), next_period(start, scheme)))
+        start = next_period(start, scheme)
+    return partitions
+
+
+def partition_definitions(partitions, catch_all=True):
+    """The "(PARTITION p2024 VALUES LESS THAN ('2025-01-01'), ...)" list, ending with the MAXVALUE partition."""
+    definitions = [f"PARTITION {name} VALUES LESS THAN ('{bound.isoformat()}')" for name, bound in partitions]
+    if catch_all:
+        definitions.append(f"PARTITION {MAXVALUE_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    return "(" + ", ".join(definitions) + ")"
+
+
+def horizon(scheme, ahead=PARTITIONS_AHEAD, today=None):
+    """A day in the period `ahead` periods after today's: partitions should reach at least that far."""
+    start = period_start(today or datetime.date.today(), scheme)
+    for _ in range(ahead):
+        start = next_period(start, scheme)
+    return start
+
+
+def scheme_of(partitions):
+    """'year' or 'month', from the names of the existing partitions (fetch_partitions)."""
+    for name, _, _ in partitions:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            return 'month' if match.group(2) else 'year'
+    raise ValueError("expenses has no year or month partitions")
+
+
+def fetch_partitions(cursor):
+    """[(name, upper bound date or None for MAXVALUE, estimated rows)] of expenses; empty if not partitioned."""
+    cursor.execute(FETCH_EXPENSE_PARTITIONS_QUERY)
+    partitions = []
+    for name, description, rows in cursor.fetchall():
+        bound = None if description == 'MAXVALUE' else datetime.date.fromisoformat(description.strip("'"))
+        partitions.append((name, bound, rows))
+    return partitions
+
+
+def expected_partitions(partitions, start, end):
+    """Names of the partitions (fetch_partitions) that can hold dates in [start, end)."""
+    names = []
+    lower = None
+    for name, bound, _ in partitions:
+        if (lower is None or lower < end) and (bound is None or bound > start):
+            names.append(name)
+        lower = bound
+    return names
+
+
+def enable_partitioning(cursor, scheme='year', ahead=PARTITIONS_AHEAD):
+    """
+    Convert expenses to RANGE COLUMNS(expense_date) partitions of one year or month each, from the period
+    of its oldest expense (PARTITION_START when empty) to `ahead` periods after today, plus the MAXVALUE
+    catch-all. MySQL requires every unique key to include the partitioning column and allows no foreign
+    keys, so the primary key becomes (expense_id, expense_date), the fingerprint index gains expense_date
+    (as migration 8 does) and the foreign keys are replaced by triggers: REFERENTIAL_ACTION_TRIGGERS on
+    the referenced tables for deletes, and reference_check_trigger() on expenses for inserts and updates.
+    The table is copied once; on an empty table (create_tables.py --partition-by) that is instant.
+    """
+    if fetch_partitions(cursor):
+        raise ValueError("expenses is already partitioned")
+    cursor.execute(FETCH_EXPENSE_DATE_RANGE_QUERY)
+    oldest, newest = cursor.fetchone()
+    first = oldest or PARTITION_START
+    last = max(newest or first, horizon(scheme, ahead))
+    partitions = period_partitions(first, last, scheme)
+
+    for table, action in REFERENTIAL_ACTION_TRIGGERS.items():
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_expenses_on_delete")
+        cursor.execute(f"""CREATE TRIGGER trg_{table}_expenses_on_delete BEFORE DELETE ON {table}
+                           FOR EACH ROW {action}""")
+    for event in ('INSERT', 'UPDATE'):
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_expenses_check_references_{event.lower()}")
+        cursor.execute(reference_check_trigger(event))
+
+    cursor.execute(FETCH_EXPENSE_FOREIGN_KEYS_QUERY)
+    foreign_keys = [row[0] for row in cursor.fetchall()]
+    if foreign_keys:
+        cursor.execute("ALTER TABLE expenses " + ", ".join(f"DROP FOREIGN KEY {name}" for name in foreign_keys))
+
+    # Databases that stopped at migration 7 still have the fingerprint index without expense_date
+    cursor.execute(FETCH_INDEX_COLUMNS_QUERY, ('expenses', 'uq_expenses_fingerprint'))
+    fingerprint_columns = [row[0] for row in cursor.fetchall()]
+    if fingerprint_columns and 'expense_date' not in fingerprint_columns:
+        cursor.execute("""ALTER TABLE expenses
+                          DROP INDEX uq_expenses_fingerprint,
+                          ADD UNIQUE INDEX uq_expenses_fingerprint (fingerprint, expense_date)""")
+
+    cursor.execute(f"""ALTER TABLE expenses
+                       DROP PRIMARY KEY, ADD PRIMARY KEY (expense_id, expense_date)
+                       PARTITION BY RANGE COLUMNS(expense_date) {partition_definitions(partitions)}""")
+    logger.info(f"Partitioned expenses by {scheme}: {partitions[0][0]} to {partitions[-1][0]}, "
+                f"then {MAXVALUE_PARTITION}")
+    return [name for name, _ in partitions]
+
+
+def add_future_partitions(cursor, through=None, ahead=PARTITIONS_AHEAD):
+    """
+    Give every period up to the one containing `through` (default: `ahead` periods after today) a partition
+    of its own, splitting them off the MAXVALUE partition. Only rows already in that partition are moved,
+    so when it is empty (new dates are not stored ahead of time) this is instant. Returns the new names.
+    """
+    partitions = fetch_partitions(cursor)
+    if not partitions:
+        raise ValueError("expenses is not partitioned (see enable_partitioning)")
+    scheme = scheme_of(partitions)
+    bounded = [bound for _, bound, _ in partitions if bound is not None]
+    through = through or horizon(scheme, ahead)
+    # The last bound is the first day of the first period without a partition
+    new = period_partitions(bounded[-1], through, scheme)
+    if not new:
+        return []
+
+    if partitions[-1][1] is None:
+        cursor.execute(f"ALTER TABLE expenses REORGANIZE PARTITION {MAXVALUE_PARTITION} "
+                       f"INTO {partition_definitions(new)}")
+    else:
+        cursor.execute(f"ALTER TABLE expenses ADD PARTITION {partition_definitions(new, catch_all=False)}")
+    logger.info(f"Added expense partitions {new[0][0]} to {new[-1][0]}")
+    return [name for name, _ in new]
+
+
+def drop_partitions(cursor, before, archive=False):
+    """
+    Remove the partitions whose dates all fall before `before`: whole periods of history go at once,
+    without deleting row by row. With `archive`, each is first swapped into a table of its own
+    (expenses_archive_<partition>), so the rows are kept outside expenses. Row triggers do not fire,
+    so the rollup buckets of those months are deleted and the expense ids logged to expense_changes here.
+    Returns the names of the removed partitions.
+    """
+    partitions = fetch_partitions(cursor)
+    old = [(name, bound) for name, bound, _ in partitions if bound is not None and bound <= before]
+    if len(old) == len(partitions):
+        old = old[:-1]  # No MAXVALUE partition, and MySQL keeps at least one
+    if not old:
+        return []
+    names = ", ".join(name for name, _ in old)
+
+    def table_exists(table):
+        cursor.execute(CHECK_TABLE_QUERY, (table,))
+        return cursor.fetchone()[0] > 0
+
+    if table_exists('expense_changes'):
+        cursor.execute(f"INSERT INTO expense_changes (expense_id) SELECT expense_id FROM expenses PARTITION ({names})")
+    if archive:
+        for name, _ in old:
+            archive_table = f"expenses_archive_{name}"
+            cursor.execute(f"CREATE TABLE {archive_table} LIKE expenses")
+            cursor.execute(f"ALTER TABLE {archive_table} REMOVE PARTITIONING")
+            cursor.execute(f"ALTER TABLE expenses EXCHANGE PARTITION {name} WITH TABLE {archive_table}")
+    cursor.execute(f"ALTER TABLE expenses DROP PARTITION {names}")
+
+    # Every removed month starts before the last removed partition's bound
+    last_bound = old[-1][1]
+    if table_exists('expense_monthly_rollup'):
+        cursor.execute("DELETE FROM expense_monthly_rollup WHERE expense_year < %s "
+                       "OR (expense_year = %s AND expense_month < %s)",
+                       (last_bound.year, last_bound.year, last_bound.month))
+    if table_exists('data_versions'):
+        cursor.execute("UPDATE data_versions SET version = version + 1 WHERE table_name = 'expenses'")
+    logger.info(f"{'Archived' if archive else 'Dropped'} expense partitions {names}")
+    return [name for name, _ in old]
+
+
+class _QueryRecorder(DatabaseOperations):
+    """DatabaseOperations whose execute_query records each query and its parameters instead of running it."""
+
+    def __init__(self, db_ops):
+        super().__init__(db_ops.backend, db_config=db_ops.db_config)
+        self.snapshot_path = None  # The database queries, not the Parquet snapshot's
+        self.recorded = []
+
+    def execute_query(self, query, params=None, chunk_size=None, use_cache=True):
+        self.recorded.append((query, params))
+        return pd.DataFrame()
+
+
+def dashboard_queries(db_ops, user_id='ALL Users', selected_year=None, selected_month=None, category_id=None):
+    """[(method, query, params)] of the expense queries DatabaseOperations builds for the dashboard filters."""
+    recorder = _QueryRecorder(db_ops)
+    calls = {
+        'generate_expense_query': lambda: recorder.generate_expense_query(user_id, selected_year, selected_month),
+        'fetch_expense_facts': lambda: recorder.fetch_expense_facts(user_id, selected_year, selected_month),
+        'fetch_expense_page': lambda: recorder.fetch_expense_page(user_id, selected_year, selected_month,
+                                                                  category_id),
+        'fetch_categories': lambda: recorder.fetch_categories(user_id, selected_year, selected_month),
+        'fetch_subcategories': lambda: recorder.fetch_subcategories(user_id, selected_year, selected_month,
+                                                                    category_id),
+        'fetch_payment_mode_counts': lambda: recorder.fetch_payment_mode_counts(user_id, selected_year,
+                                                                                selected_month, category_id),
+        'fetch_expense_summary': lambda: recorder.fetch_expense_summary(user_id, selected_year, selected_month,
+                                                                        category_id, use_rollup=False,
+                                                                        use_snapshot=False),
+    }
+    queries = []
+    for method, call in calls.items():
+        recorder.recorded = []
+        call()
+        queries.extend((method, query, params) for query, params in recorder.recorded)
+    return queries
+
+
+def check_pruning(db_ops, selected_year, selected_month=None, user_id='ALL Users', category_id=None):
+    """
+    EXPLAIN every dashboard query (dashboard_queries) for one year or month and compare the expenses
+    partitions MySQL reads with the partitions that can hold those dates. Returns [{'method',
+    'partitions', 'expected', 'pruned'}]; 'pruned' is False when a query reads any other partition.
+    """
+    if db_ops.backend != 'mysql':
+        raise ValueError("Partition pruning can only be checked on MySQL")
+    start, end = date_range(selected_year, selected_month)
+    results = []
+    with db_ops.get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            expected = expected_partitions(fetch_partitions(cursor), start, end)
+            if not expected:
+                raise ValueError("expenses is not partitioned (see enable_partitioning)")
+            for method, query, params in dashboard_queries(db_ops, user_id, selected_year, selected_month,
+                                                           category_id):
+                cursor.execute("EXPLAIN " + query, params)
+                columns = [column[0].lower() for column in cursor.description]
+                read = []
+                for row in cursor.fetchall():
+                    plan = dict(zip(columns, row))
+                    if plan.get('table') == 'e' and plan.get('partitions'):
+                        read.extend(plan['partitions'].split(','))
+                results.append({'method': method, 'partitions': read, 'expected': expected,
+                                'pruned': set(read) <= set(expected)})
+    return results
@@ -1,19 +1,8 @@
-# To fetch all Users
-FETCH_USERS = """
-SELECT user_id, user_name FROM users
-"""
-
-# To fetch All categories
-FETCH_ALL_CATEGORIES = """
-SELECT DISTINCT category_name FROM categories
-"""
-
-# To fetch all Categories for a user
-FETCH_USER_CATEGORIES = """
-SELECT DISTINCT c.category_name
+# To fetch all Categories for a user (ids only; names come from the dimension registry)
+FETCH_USER_CATEGORY_IDS = """
+SELECT DISTINCT e.category_id
 FROM expenses e
-JOIN categories c ON e.category_id = c.category_id
-LEFT JOIN subcategories s ON e.subcategory_id = s.subcategory_id AND s.category_id = c.category_id
+WHERE 1=1
 """
 
 # Base query to fetch user expenses with all data (no null value filtering)
@@ -22,13 +11,56 @@ SELECT
 e.expense_date,
 c.category_name,
 s.subcategory_name,
-e.amount_paid
+CAST(e.amount_paid AS DOUBLE) AS amount_paid
 FROM expenses e
 JOIN categories c ON e.category_id = c.category_id
 LEFT JOIN subcategories s ON e.subcategory_id = s.subcategory_id AND s.category_id = c.category_id
 where 1=1 
 """
 
+# Amounts are cast to DOUBLE in SQL so the driver returns floats instead of one Decimal per row
+
+# Fact rows: every column the dashboard needs in a single scan of expenses, with no joins. Ids are mapped
+# to names in memory from the dimension registry (backend/database/dimensions.py)
+FETCH_EXPENSE_FACTS_BASE_QUERY = """
+SELECT
+e.expense_date,
+e.user_id,
+e.category_id,
+e.subcategory_id,
+e.payment_mode_id,
+CAST(e.amount_paid AS DOUBLE) AS amount_paid
+FROM expenses e
+where 1=1
+"""
+
+# One page of individual transactions, newest first; filters and the keyset condition are appended
+FETCH_EXPENSE_PAGE_BASE_QUERY = """
+SELECT
+e.expense_id,
+e.expense_date,
+e.user_id,
+e.category_id,
+e.subcategory_id,
+e.payment_mode_id,
+CAST(e.amount_paid AS DOUBLE) AS amount_paid
+FROM expenses e
+WHERE 1=1
+"""
+
+EXPENSE_PAGE_ORDER_BY = """
+ORDER BY e.expense_date DESC, e.expense_id DESC
+LIMIT %s
+"""
+
+# Distinct categories with expenses for the selected filters
+FETCH_CATEGORIES = """
+SELECT DISTINCT c.category_id, c.category_name
+FROM categories c
+JOIN expenses e ON c.category_id = e.category_id
+WHERE 1=1
+"""
+
 
 FETCH_SUBCATEGORIES="""
 SELECT DISTINCT s.subcategory_id, s.subcategory_name
@@ -42,15 +74,204 @@ WHERE 1=1
 FETCH_PAYMENT_MODE_COUNT_QUERY = """
 SELECT
     e.expense_date,
-    c.category_name,
-    pm.payment_mode_name, 
+    e.category_id,
+    e.payment_mode_id,
     e.payment_mode_id AS payment_count
 FROM 
     expenses e
-JOIN 
-    payment_modes pm ON e.payment_mode_id = pm.payment_mode_id
-JOIN 
-    categories c ON e.category_id = c.category_id
 WHERE 
     1=1
-"""
\ No newline at end of file
+"""
+
+
+# Columns selected (and grouped on) for each summary dimension
+SUMMARY_DIMENSIONS = {
+    'category': ['e.category_id'],
+    'subcategory': ['e.subcategory_id'],
+    'payment_mode': ['e.payment_mode_id'],
+    'year': ['YEAR(e.expense_date) AS expense_year'],
+    'month': ['MONTH(e.expense_date) AS expense_month'],
+}
+
+# Same dimensions when reading from the monthly rollup table
+ROLLUP_SUMMARY_DIMENSIONS = {
+    'category': ['r.category_id'],
+    'subcategory': ['NULLIF(r.subcategory_id, 0) AS subcategory_id'],
+    'payment_mode': ['r.payment_mode_id'],
+    'year': ['r.expense_year'],
+    'month': ['r.expense_month'],
+}
+
+# Aggregated expenses for a filter set, grouped on dimension ids; {select_columns} comes from SUMMARY_DIMENSIONS
+FETCH_EXPENSE_SUMMARY_QUERY = """
+SELECT
+{select_columns},
+COUNT(*) AS expense_count,
+COUNT(e.amount_paid) AS amount_count,
+CAST(SUM(e.amount_paid) AS DOUBLE) AS total_amount,
+CAST(MIN(e.amount_paid) AS DOUBLE) AS min_amount,
+CAST(MAX(e.amount_paid) AS DOUBLE) AS max_amount
+FROM expenses e
+WHERE 1=1
+"""
+
+
+# The same summary answered from expense_monthly_rollup (no MIN/MAX: they cannot be maintained on delete).
+# user_id / subcategory_id are stored as 0 when the expense has none.
+FETCH_ROLLUP_SUMMARY_QUERY = """
+SELECT
+{select_columns},
+CAST(SUM(r.expense_count) AS SIGNED) AS expense_count,
+CAST(SUM(r.amount_count) AS SIGNED) AS amount_count,
+CAST(SUM(r.amount_sum) AS DOUBLE) AS total_amount,
+NULL AS min_amount,
+NULL AS max_amount
+FROM expense_monthly_rollup r
+WHERE r.expense_count > 0
+"""
+
+# Whether a table exists (e.g. the rollup table from scripts/migrate.py, migration 2)
+CHECK_TABLE_QUERY = """
+SELECT COUNT(*) FROM information_schema.tables
+WHERE table_schema = DATABASE() AND table_name = %s
+"""
+
+# Same check for the embedded SQLite backend
+CHECK_TABLE_SQLITE_QUERY = """
+SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = %s
+"""
+
+# Whether a table has a column (optional columns added by migrations)
+CHECK_COLUMN_QUERY = """
+SELECT COUNT(*) FROM information_schema.columns
+WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+"""
+
+# Same check for the embedded SQLite backend
+CHECK_COLUMN_SQLITE_QUERY = """
+SELECT COUNT(*) FROM pragma_table_info(%s) WHERE name = %s
+"""
+
+# Names of the indexes on a table (MySQL lists one row per indexed column)
+FETCH_INDEX_NAMES_QUERY = """
+SELECT DISTINCT index_name FROM information_schema.statistics
+WHERE table_schema = DATABASE() AND table_name = %s
+"""
+
+# Same list for the embedded SQLite backend
+FETCH_INDEX_NAMES_SQLITE_QUERY = """
+SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s
+"""
+
+# Columns of one index in order (empty when the index does not exist)
+FETCH_INDEX_COLUMNS_QUERY = """
+SELECT column_name FROM information_schema.statistics
+WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+ORDER BY seq_in_index
+"""
+
+# Insert triggers on expenses that check the deferred change-tracking variable (schema.py, migration 9)
+COUNT_DEFERRABLE_TRACKING_TRIGGERS_QUERY = """
+SELECT COUNT(*) FROM information_schema.triggers
+WHERE trigger_schema = DATABASE() AND event_object_table = 'expenses'
+  AND trigger_name IN ('trg_expenses_version_insert', 'trg_expenses_changelog_insert')
+  AND action_statement LIKE %s
+"""
+
+# Partitions of the expenses table in order, with the upper bound of each ('MAXVALUE' for the catch-all)
+FETCH_EXPENSE_PARTITIONS_QUERY = """
+SELECT partition_name, partition_description, table_rows FROM information_schema.partitions
+WHERE table_schema = DATABASE() AND table_name = 'expenses' AND partition_name IS NOT NULL
+ORDER BY partition_ordinal_position
+"""
+
+# Foreign keys declared on expenses (a partitioned table can have none)
+FETCH_EXPENSE_FOREIGN_KEYS_QUERY = """
+SELECT constraint_name FROM information_schema.table_constraints
+WHERE table_schema = DATABASE() AND table_name = 'expenses' AND constraint_type = 'FOREIGN KEY'
+"""
+
+FETCH_EXPENSE_DATE_RANGE_QUERY = "SELECT MIN(expense_date), MAX(expense_date) FROM expenses"
+
+# Recomputes rollup rows from expenses; filters on e.expense_date may be appended
+REBUILD_EXPENSE_ROLLUP_QUERY = """
+INSERT INTO expense_monthly_rollup
+    (user_id, expense_year, expense_month, category_id, subcategory_id, payment_mode_id,
+     expense_count, amount_count, amount_sum)
+SELECT
+    IFNULL(e.user_id, 0),
+    YEAR(e.expense_date),
+    MONTH(e.expense_date),
+    e.category_id,
+    IFNULL(e.subcategory_id, 0),
+    e.payment_mode_id,
+    COUNT(*),
+    COUNT(e.amount_paid),
+    IFNULL(SUM(e.amount_paid), 0)
+FROM expenses e
+WHERE 1=1
+"""
+
+REBUILD_EXPENSE_ROLLUP_GROUP_BY = """
+GROUP BY IFNULL(e.user_id, 0), YEAR(e.expense_date), MONTH(e.expense_date),
+         e.category_id, IFNULL(e.subcategory_id, 0), e.payment_mode_id
+"""
+
+
+# Tables whose changes invalidate cached dashboard results (users from migration 6)
+DATA_VERSION_TABLES = ('expenses', 'categories', 'subcategories', 'payment_modes', 'users')
+
+# Change counters bumped by triggers (scripts/migrate.py, migrations 3 and 6): one indexed read of a 5-row table
+FETCH_DATA_VERSIONS_QUERY = """
+SELECT table_name, version FROM data_versions
+"""
+
+# Fallback when data_versions does not exist: row count, newest id and last update per table
+FETCH_DATA_VERSIONS_FALLBACK_QUERY = """
+SELECT 'expenses', COUNT(*), MAX(expense_id), MAX(updation_date) FROM expenses
+UNION ALL
+SELECT 'categories', COUNT(*), MAX(category_id), MAX(updation_date) FROM categories
+UNION ALL
+SELECT 'subcategories', COUNT(*), MAX(subcategory_id), MAX(updation_date) FROM subcategories
+UNION ALL
+SELECT 'payment_modes', COUNT(*), MAX(payment_mode_id), MAX(updation_date) FROM payment_modes
+UNION ALL
+SELECT 'users', COUNT(*), MAX(user_id), MAX(updation_date) FROM users
+"""
+
+# The four dimension tables, read whole by the dimension registry (backend/database/dimensions.py)
+FETCH_DIMENSION_QUERIES = {
+    'user': "SELECT user_id, user_name FROM users ORDER BY user_id",
+    'category': "SELECT category_id, category_name FROM categories ORDER BY category_id",
+    'subcategory': "SELECT subcategory_id, category_id, subcategory_name FROM subcategories ORDER BY subcategory_id",
+    'payment_mode': "SELECT payment_mode_id, payment_mode_name FROM payment_modes ORDER BY payment_mode_id",
+}
+
+
+# Delta sync of a local copy (backend/database/delta_sync.py): columns copied per table, parents first.
+# Password hashes are not copied; the local copy stores an empty string instead.
+SYNC_TABLE_COLUMNS = {
+    'users': ('user_id', 'user_name', 'user_email', 'role', 'creation_date', 'updation_date'),
+    'categories': ('category_id', 'category_name', 'creation_date', 'updation_date'),
+    'subcategories': ('subcategory_id', 'category_id', 'subcategory_name', 'creation_date', 'updation_date'),
+    'payment_modes': ('payment_mode_id', 'payment_mode_name', 'creation_date', 'updation_date'),
+    'expenses': ('expense_id', 'user_id', 'category_id', 'subcategory_id', 'amount_paid', 'expense_date',
+                 'payment_mode_id', 'creation_date', 'updation_date', 'source_ref', 'fingerprint'),
+}
+
+# Expense columns added by migration 7; a source database without them is synced without them
+SYNC_FINGERPRINT_COLUMNS = ('source_ref', 'fingerprint')
+
+# Server clock, read before pulling changes so the next sync's watermark never skips a commit
+FETCH_SERVER_TIME_QUERY = """
+SELECT CURRENT_TIMESTAMP
+"""
+
+# Expenses inserted, updated or deleted since a watermark (change log from scripts/migrate.py, migration 4)
+FETCH_CHANGED_EXPENSE_IDS_QUERY = """
+SELECT DISTINCT expense_id FROM expense_changes WHERE changed_at >= %s
+"""
+
+PRUNE_EXPENSE_CHANGES_QUERY = """
+DELETE FROM expense_changes WHERE changed_at < %s
+"""
@@ -0,0 +1,133 @@
+import calendar
+import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Values the UI uses to mean "no user filter"
+ALL_USERS = ('ALL Users', 'All Users')
+
+
+def parse_month(selected_month):
+    """
+    Convert a month name ("March"), number (3) or numeric string ("3") into 1-12.
+    Returns None (and logs a warning) for anything that is not a valid month.
+    """
+    if selected_month is None:
+        return None
+
+    if isinstance(selected_month, int):
+        month_numeric = selected_month
+    elif str(selected_month).strip().isdigit():
+        month_numeric = int(str(selected_month).strip())
+    else:
+        names = [name.lower() for name in calendar.month_name]
+        try:
+            month_numeric = names.index(str(selected_month).strip().lower())
+        except ValueError:
+            month_numeric = 0
+
+    if 1 <= month_numeric <= 12:
+        return month_numeric
+
+    logger.warning(f"Invalid month name provided: {selected_month}")
+    return None
+
+
+def date_range(selected_year=None, selected_month=None):
+    """
+    Return the half-open [start, end) date range covering the selected year, or one month of it.
+    Returns None when no year is selected.
+    """
+    if selected_year is None:
+        return None
+
+    year = int(selected_year)
+    month_numeric = parse_month(selected_month)
+    if month_numeric is None:
+        return datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1)
+
+    start = datetime.date(year, month_numeric, 1)
+    end = datetime.date(year + 1, 1, 1) if month_numeric == 12 else datetime.date(year, month_numeric + 1, 1)
+    return start, end
+
+
+def build_expense_filters(user_id=None, selected_year=None, selected_month=None, category_id=None,
+                          alias='e', category_column=None):
+    """
+    Build the WHERE-clause fragment and bound parameters for the dashboard filters.
+
+    Dates are filtered with a sargable half-open range on `expense_date`
+    (instead of YEAR()/MONTH() calls), so MySQL can use indexes on that column.
+    The fragment starts with " AND" and is meant to follow a "WHERE 1=1" base query.
+    """
+    clauses = []
+    params = []
+
+    if selected_year is not None:
+        start, end = date_range(selected_year, selected_month)
+        clauses.append(f"{alias}.expense_date >= %s AND {alias}.expense_date < %s")
+        params.extend([start, end])
+    else:
+        # A month without a year can only be matched with MONTH(); the UI always sends a year
+        month_numeric = parse_month(selected_month)
+        if month_numeric is not None:
+            clauses.append(f"MONTH({alias}.expense_date) = %s")
+            params.append(month_numeric)
+
+    if user_id is not None and user_id not in ALL_USERS:
+        clauses.append(f"{alias}.user_id = %s")
+        params.append(int(user_id))
+
+    if category_id is not None:
+        clauses.append(f"{category_column or alias + '.category_id'} = %s")
+        params.append(int(category_id))
+
+    where_sql = "".join(f" AND {clause}" for clause in clauses)
+    return where_sql, tuple(params)
+
+
+def build_rollup_filters(user_id=None, selected_year=None, selected_month=None, category_id=None, alias='r'):
+    """
+    Build the WHERE-clause fragment and bound parameters for the monthly rollup table,
+    whose year and month are stored as columns. The fragment starts with " AND".
+    """
+    clauses = []
+    params = []
+
+    if selected_year is not None:
+        clauses.append(f"{alias}.expense_year = %s")
+        params.append(int(selected_year))
+
+    month_numeric = parse_month(selected_month)
+    if month_numeric is not None:
+        clauses.append(f"{alias}.expense_month = %s")
+        params.append(month_numeric)
+
+    if user_id is not None and user_id not in ALL_USERS:
+        clauses.append(f"{alias}.user_id = %s")
+        params.append(int(user_id))
+
+    if category_id is not None:
+        clauses.append(f"{alias}.category_id = %s")
+        params.append(int(category_id))
+
+    where_sql = "".join(f" AND {clause}" for clause in clauses)
+    return where_sql, tuple(params)
+
+
+def build_keyset_filter(after=None, alias='e'):
+    """
+    Build the " AND ..." fragment that continues a newest-first listing after the
+    (expense_date, expense_id) key of the previous page's last row. Written as an OR of
+    two ranges rather than a row comparison, plus a redundant `expense_date <=` bound that
+    gives the index seek its upper end; without it, planners walk back from the newest
+    row and skip every row before the key, so deep pages get slower.
+    """
+    if after is None:
+        return "", ()
+
+    expense_date, expense_id = after
+    where_sql = (f" AND {alias}.expense_date <= %s"
+                 f" AND ({alias}.expense_date < %s OR ({alias}.expense_date = %s AND {alias}.expense_id < %s))")
+    return where_sql, (expense_date, expense_date, expense_date, int(expense_id))
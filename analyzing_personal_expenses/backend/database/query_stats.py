@@ -0,0 +1,182 @@
+import os
+import sys
+import threading
+import time
+import logging
+from collections import deque
+import pandas as pd
+from dotenv import load_dotenv
+from backend.database.result_cache import normalize_query
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Queries slower than this are written to the slow-query log
+SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', 500))
+
+# Number of recent query executions kept for the diagnostics aggregates
+QUERY_STATS_WINDOW = int(os.getenv('DB_QUERY_STATS_WINDOW', 1000))
+
+# Slow queries go to their own logger; DB_SLOW_QUERY_LOG also writes them to that file
+slow_query_logger = logging.getLogger('slow_queries')
+if os.getenv('DB_SLOW_QUERY_LOG'):
+    _handler = logging.FileHandler(os.getenv('DB_SLOW_QUERY_LOG'))
+    _handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+    slow_query_logger.addHandler(_handler)
+
+# Data-access helpers skipped when naming the method a query was issued for
+_INTERNAL_FRAMES = {'execute_query', 'iter_query_chunks', 'execute_queries', 'run_concurrently', 'timer',
+                    '__init__', '<lambda>', '<listcomp>', '<dictcomp>', '<genexpr>'}
+
+
+def calling_method(depth=2):
+    """Name of the nearest function up the stack that is not a data-access helper (e.g. fetch_expense_summary)."""
+    frame = sys._getframe(depth)
+    while frame is not None and frame.f_code.co_name in _INTERNAL_FRAMES:
+        frame = frame.f_back
+    return frame.f_code.co_name if frame is not None else '<unknown>'
+
+
+class QueryTimer:
+    """
+    Times one query execution for QueryStats. Use as a context manager around execute and fetch;
+    call first_row() when execute() returns and done() with the result size.
+    Leaving the block with an exception records the query as failed.
+    """
+
+    def __init__(self, stats, query, method, cached=False):
+        self.stats = stats
+        self.query = query
+        self.method = method
+        self.cached = cached
+        self.started = time.perf_counter()
+        self.first_row_at = None
+        self.rows = 0
+        self.nbytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # A stream closed before its end (GeneratorExit) was abandoned by the reader, not failed
+        self.finish(error=exc_type is not None and not issubclass(exc_type, GeneratorExit))
+
+    def finish(self, error=False):
+        self.stats.record(
+            method=self.method,
+            query=self.query,
+            wall_ms=(time.perf_counter() - self.started) * 1000,
+            first_row_ms=(self.first_row_at - self.started) * 1000 if self.first_row_at is not None else None,
+            rows=self.rows,
+            nbytes=self.nbytes,
+            cached=self.cached,
+            error=error,
+        )
+
+    def first_row(self):
+        """Mark the time the server started returning the result (execute() returned)."""
+        if self.first_row_at is None:
+            self.first_row_at = time.perf_counter()
+
+    def done(self, rows, nbytes=0):
+        """Add `rows` and `nbytes` to the result size (called once, or once per streamed chunk)."""
+        self.first_row()
+        self.rows += rows
+        self.nbytes += nbytes
+
+
+class QueryStats:
+    """
+    Thread-safe record of recent query executions: wall time, time to first row, rows and
+    approximate bytes returned, the DatabaseOperations method that issued each query, and
+    whether it was answered from the result cache. Executions over `slow_ms` are logged to
+    the 'slow_queries' logger.
+    """
+
+    def __init__(self, window=QUERY_STATS_WINDOW, slow_ms=SLOW_QUERY_MS):
+        self.slow_ms = slow_ms
+        self._records = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._totals = {'queries': 0, 'slow_queries': 0, 'errors': 0}
+
+    def timer(self, query, method=None, cached=False):
+        """Start timing `query`, attributed to `method` (default: the calling DatabaseOperations method)."""
+        return QueryTimer(self, query, method or calling_method(), cached)
+
+    def record(self, method, query, wall_ms, first_row_ms=None, rows=0, nbytes=0, cached=False, error=False):
+        record = {
+            'method': method,
+            'wall_ms': wall_ms,
+            'first_row_ms': first_row_ms,
+            'rows': rows,
+            'bytes': nbytes,
+            'cached': cached,
+            'error': error,
+        }
+        slow = wall_ms >= self.slow_ms and not cached
+        with self._lock:
+            self._records.append(record)
+            self._totals['queries'] += 1
+            self._totals['slow_queries'] += slow
+            self._totals['errors'] += error
+
+        if slow:
+            first_row = f"{first_row_ms:.1f} ms" if first_row_ms is not None else "n/a"
+            slow_query_logger.warning(
+                f"Slow query in {method}: {wall_ms:.1f} ms (first row {first_row}), {rows} rows, "
+                f"{nbytes} bytes{' [failed]' if error else ''}: {normalize_query(query)}"
+            )
+
+    def totals(self):
+        """Counters since the process started (queries, slow_queries, errors)."""
+        with self._lock:
+            return dict(self._totals)
+
+    def summary(self):
+        """
+        Aggregate the recent executions per calling method, slowest total first: calls, cache hits,
+        total/mean/max wall time, mean time to first row, rows and bytes, slow calls and errors.
+        """
+        with self._lock:
+            records = list(self._records)
+        columns = ['method', 'calls', 'cache_hits', 'total_ms', 'mean_ms', 'max_ms', 'mean_first_row_ms',
+                   'rows', 'bytes', 'slow', 'errors']
+        if not records:
+            return pd.DataFrame(columns=columns)
+
+        df = pd.DataFrame(records)
+        df['first_row_ms'] = pd.to_numeric(df['first_row_ms'])  # None (cache hits, failures) becomes NaN
+        df['slow'] = (df['wall_ms'] >= self.slow_ms) & ~df['cached']
+        summary = df.groupby('method').agg(
+            calls=('wall_ms', 'size'),
+            cache_hits=('cached', 'sum'),
+            total_ms=('wall_ms', 'sum'),
+            mean_ms=('wall_ms', 'mean'),
+            max_ms=('wall_ms', 'max'),
+            mean_first_row_ms=('first_row_ms', 'mean'),
+            rows=('rows', 'sum'),
+            bytes=('bytes', 'sum'),
+            slow=('slow', 'sum'),
+            errors=('error', 'sum'),
+        ).reset_index()
+        return summary.sort_values('total_ms', ascending=False, ignore_index=True)[columns].round(1)
+
+    def clear(self):
+        """Drop the recent executions (totals are kept)."""
+        with self._lock:
+            self._records.clear()
+
+
+# One collector per process, shared by every DatabaseOperations instance
+_shared_query_stats = None
+_shared_query_stats_lock = threading.Lock()
+
+
+def get_shared_query_stats():
+    """Return the process-wide query statistics, creating them on first use."""
+    global _shared_query_stats
+    with _shared_query_stats_lock:
+        if _shared_query_stats is None:
+            _shared_query_stats = QueryStats()
+        return _shared_query_stats
@@ -0,0 +1,146 @@
+import os
+import re
+import threading
+import time
+import logging
+from collections import OrderedDict
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Cache settings, overridable from .env (DB_CACHE_MAX_MB=0 disables caching)
+DEFAULT_MAX_BYTES = int(float(os.getenv('DB_CACHE_MAX_MB', 64)) * 1024 * 1024)
+DEFAULT_TTL = float(os.getenv('DB_CACHE_TTL', 300))
+
+
+def normalize_query(query):
+    """Collapse whitespace so formatting differences do not create separate cache entries."""
+    return re.sub(r'\s+', ' ', query).strip()
+
+
+def frame_nbytes(frame):
+    """Memory held by a DataFrame or Series, including the contents of object (string) columns."""
+    return int(np.sum(frame.memory_usage(index=True, deep=True)))
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of query result DataFrames.
+    Total size is bounded by `max_bytes` (least recently used entries are evicted first) and each
+    entry expires `ttl` seconds after it was stored. Entries stored with a data `version` do not
+    expire by time; they are dropped when looked up with a different version instead.
+    Frames are copied in and out, so callers may modify what they get back.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (frame, nbytes, expires_at, version)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,  # Entries dropped because the data version changed
+            'rejected': 0,  # Frames larger than the whole cache
+        }
+
+    @staticmethod
+    def make_key(scope, query, params=None):
+        """Cache key for `query` with `params` against the database identified by `scope`."""
+        return scope, normalize_query(query), tuple(params) if params is not None else None
+
+    def get(self, key, version=None):
+        """
+        Return a copy of the cached frame for `key`, or None if absent, expired, or stored under a
+        data version other than `version` (a version-less lookup never reuses a versioned entry).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            frame, nbytes, expires_at, entry_version = entry
+            if entry_version != version:
+                self._remove(key)
+                self._stats['invalidations'] += 1
+                self._stats['misses'] += 1
+                return None
+            if self._clock() >= expires_at:
+                self._remove(key)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+        return frame.copy()
+
+    def put(self, key, frame, ttl=None, version=None):
+        """
+        Store a copy of `frame` under `key`, evicting least recently used entries to stay under max_bytes.
+        With a data `version` (and no explicit `ttl`), the entry is kept until that version changes.
+        """
+        if self.max_bytes <= 0:
+            return
+
+        nbytes = frame_nbytes(frame)
+        if ttl is None:
+            ttl = float('inf') if version is not None else self.ttl
+        expires_at = self._clock() + ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if nbytes > self.max_bytes:
+                self._stats['rejected'] += 1
+                return
+
+            while self._bytes + nbytes > self.max_bytes:
+                evicted_key = next(iter(self._entries))
+                self._remove(evicted_key)
+                self._stats['evictions'] += 1
+
+            self._entries[key] = (frame.copy(), nbytes, expires_at, version)
+            self._bytes += nbytes
+
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return a snapshot of the cache counters and current size."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['entries'] = len(self._entries)
+            snapshot['bytes'] = self._bytes
+            snapshot['max_bytes'] = self.max_bytes
+        lookups = snapshot['hits'] + snapshot['misses']
+        snapshot['hit_ratio'] = snapshot['hits'] / lookups if lookups else 0.0
+        return snapshot
+
+    def _remove(self, key):
+        _, nbytes, _, _ = self._entries.pop(key)
+        self._bytes -= nbytes
+
+
+# One cache per process, shared by every DatabaseOperations instance (Streamlit reruns create new ones)
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """Return the process-wide result cache, creating it on first use."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResultCache()
+        return _shared_cache
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from mysql.connector.constants import FieldType
+
+# Driver column types decoded into typed NumPy columns instead of object columns
+DECIMAL_TYPES = {FieldType.DECIMAL, FieldType.NEWDECIMAL}
+FLOAT_TYPES = DECIMAL_TYPES | {FieldType.DOUBLE, FieldType.FLOAT}
+INTEGER_TYPES = {FieldType.TINY, FieldType.SHORT, FieldType.INT24, FieldType.LONG, FieldType.LONGLONG,
+                 FieldType.YEAR}
+DATE_TYPES = {FieldType.DATE}
+DATETIME_TYPES = {FieldType.DATETIME, FieldType.TIMESTAMP}
+
+
+def column_names(description):
+    """Column names from a DB-API cursor description."""
+    return [col[0] for col in description]
+
+
+def _float_column(values):
+    # Python floats (DOUBLE, or DECIMAL cast in SQL) convert in one C-level pass; None needs NaN
+    try:
+        return np.array(values, dtype=np.float64)
+    except TypeError:
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def frame_from_rows(rows, description):
+    """
+    Build a DataFrame from one batch of decoded result tuples.
+    Numeric columns become float64/int64 and DATE/DATETIME columns datetime64 in bulk NumPy
+    conversions, instead of object columns of Decimal/date values.
+    """
+    columns = column_names(description)
+    if not rows:
+        return pd.DataFrame(columns=columns)
+
+    data = {}
+    for index, (name, type_code) in enumerate((col[0], col[1]) for col in description):
+        values = [row[index] for row in rows]
+        if type_code in FLOAT_TYPES:
+            data[name] = _float_column(values)
+        elif type_code in DATE_TYPES or type_code in DATETIME_TYPES:
+            data[name] = pd.DatetimeIndex(values)  # date/datetime objects convert in one C-level pass
+        else:
+            data[name] = values
+    return pd.DataFrame(data, columns=columns)
+
+
+def frame_from_raw_rows(rows, description):
+    """
+    Build a DataFrame from rows of a raw cursor (`conn.cursor(raw=True)`), where every value is
+    the server's text encoding as bytes. Numbers and dates are parsed by NumPy's bytes-to-number
+    and ISO-date casts, so no Decimal or date object is ever created for them.
+    """
+    columns = column_names(description)
+    if not rows:
+        return pd.DataFrame(columns=columns)
+
+    data = {}
+    for index, (name, type_code) in enumerate((col[0], col[1]) for col in description):
+        values = [row[index] for row in rows]
+        has_nulls = None in values
+        first = next((v for v in values if v is not None), None)
+        if isinstance(first, bytearray):
+            values = [None if v is None else bytes(v) for v in values]  # Pure-Python driver returns bytearray
+
+        if type_code in FLOAT_TYPES:
+            raw = [b'nan' if v is None else v for v in values] if has_nulls else values
+            data[name] = np.array(raw, dtype=np.bytes_).astype(np.float64)
+        elif type_code in INTEGER_TYPES:
+            if has_nulls:
+                raw = [b'nan' if v is None else v for v in values]
+                data[name] = np.array(raw, dtype=np.bytes_).astype(np.float64)
+            else:
+                data[name] = np.array(values, dtype=np.bytes_).astype(np.int64)
+        elif type_code in DATE_TYPES:
+            raw = [b'NaT' if v is None else v for v in values] if has_nulls else values
+            data[name] = np.array(raw, dtype=np.bytes_).astype('datetime64[D]').astype('datetime64[s]')
+        elif type_code in DATETIME_TYPES:
+            raw = [b'NaT' if v is None else v for v in values] if has_nulls else values
+            data[name] = np.array(raw, dtype=np.bytes_).astype('datetime64[us]')
+        else:
+            data[name] = [None if v is None else v.decode('utf-8') for v in values]
+    return pd.DataFrame(data, columns=columns)
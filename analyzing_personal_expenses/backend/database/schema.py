@@ -0,0 +1,292 @@
+from backend.database.queries import REBUILD_EXPENSE_ROLLUP_QUERY, REBUILD_EXPENSE_ROLLUP_GROUP_BY
+
+# MySQL schema of the expense tracker: the base tables (run by scripts/create_tables.py) and the versioned
+# migrations on top of them (applied by scripts/migrate.py). sqlite_backend.py translates both for SQLite.
+
+# SQL script to create tables for the expense tracker application
+CREATE_TABLES_SQL = """
+-- Drop Existing Tables (if any)
+-- These tables are dropped to start fresh in case they already exist
+-- Tables added by scripts/migrate.py go too (with the record of applied migrations), so that
+-- migrate.py applies every migration again to the new tables instead of reporting them up to date
+DROP TABLE IF EXISTS expense_monthly_rollup;
+DROP TABLE IF EXISTS data_versions;
+DROP TABLE IF EXISTS expense_changes;
+DROP TABLE IF EXISTS schema_migrations;
+DROP TABLE IF EXISTS expenses;
+DROP TABLE IF EXISTS subcategories;
+DROP TABLE IF EXISTS categories;
+DROP TABLE IF EXISTS payment_modes;
+DROP TABLE IF EXISTS users;
+
+CREATE TABLE users (
+    user_id INT PRIMARY KEY AUTO_INCREMENT,   -- Unique identifier for each user
+    user_name VARCHAR(100) NOT NULL,          -- User's name
+    user_email VARCHAR(100) NOT NULL,         -- User's email
+    password VARCHAR(255) NOT NULL,           -- User's password (hashed)
+    role ENUM('admin', 'user') NOT NULL,      -- User's role (admin or user)
+    creation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP, -- Record creation timestamp
+    updation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP -- Record last update timestamp
+);
+
+-- Categories Table: Stores categories for different expense types
+CREATE TABLE categories (
+    category_id INT AUTO_INCREMENT PRIMARY KEY,         -- Auto-incremented category ID
+    category_name VARCHAR(100) NOT NULL UNIQUE,          -- Category name (e.g., 'Food', 'Transport')
+    creation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,   -- Date of creation
+    updation_date TIMESTAMP DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP  -- Date of last update
+) AUTO_INCREMENT = 100;  -- Starts category IDs from 100
+
+-- Subcategories Table: Stores subcategories for each category
+CREATE TABLE subcategories (
+    subcategory_id INT AUTO_INCREMENT PRIMARY KEY,       -- Auto-incremented subcategory ID
+    category_id INT NOT NULL,                            -- Foreign key referencing category_id
+    subcategory_name VARCHAR(100) NOT NULL,              -- Subcategory name
+    creation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,   -- Date of creation
+    updation_date TIMESTAMP DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP,  -- Date of last update
+    FOREIGN KEY (category_id) REFERENCES categories(category_id) ON DELETE CASCADE ON UPDATE CASCADE  -- Foreign key constraint for category_id
+) AUTO_INCREMENT = 1000;  -- Starts subcategory IDs from 1000
+
+-- Payment Modes Table: Stores different payment methods used for expenses
+CREATE TABLE payment_modes (
+    payment_mode_id INT AUTO_INCREMENT PRIMARY KEY,      -- Auto-incremented payment mode ID
+    payment_mode_name VARCHAR(50) NOT NULL UNIQUE,       -- Payment method name (e.g., 'UPI', 'Credit Card')
+    creation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,   -- Date of creation
+    updation_date TIMESTAMP DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP  -- Date of last update
+);
+
+-- Expenses Table: Stores records of individual expenses made by users
+-- Amount_paid can be NULL to allow for blank/invalid data
+-- User_id can be NULL to allow for expenses without a user
+-- on DELETE SET NULL is used to set user_id to NULL when a user is deleted
+-- Subcategory_id can be NULL to allow for expenses without a subcategory
+-- Expenses Table: Stores records of individual expenses made by users
+CREATE TABLE expenses (
+    expense_id INT AUTO_INCREMENT PRIMARY KEY,           -- Auto-incremented expense ID
+    user_id INT NULL,                                     -- Can be NULL
+    category_id INT NOT NULL,                             -- Cannot be NULL
+    subcategory_id INT NULL,                              -- Can be NULL
+    amount_paid DECIMAL(10,2) NULL,                       -- Can be NULL
+    expense_date DATE NOT NULL,                           -- Cannot be NULL
+    payment_mode_id INT NOT NULL,                         -- Cannot be NULL
+    creation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,    -- Date of creation
+    updation_date TIMESTAMP DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP,  -- Date of last update
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE SET NULL ON UPDATE CASCADE,
+    FOREIGN KEY (category_id) REFERENCES categories(category_id) ON DELETE CASCADE ON UPDATE CASCADE,
+    FOREIGN KEY (subcategory_id) REFERENCES subcategories(subcategory_id) ON DELETE SET NULL ON UPDATE CASCADE,
+    FOREIGN KEY (payment_mode_id) REFERENCES payment_modes(payment_mode_id) ON DELETE CASCADE ON UPDATE CASCADE
+) AUTO_INCREMENT = 10000;
+"""
+
+
+# Tracks which migrations have been applied. Unlike create_tables.py, migrations never drop data.
+CREATE_SCHEMA_MIGRATIONS_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,                              -- Migration number
+    description VARCHAR(255) NOT NULL,                    -- What the migration does
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP        -- When it was applied
+)
+"""
+
+# Rollup maintenance: add (+1) or remove (-1) one expense row from its monthly rollup bucket.
+# NEW/OLD rows reach the rollup through these triggers; FK cascades (e.g. deleting a category)
+# do not fire triggers, so run scripts/refresh_rollup.py after such bulk changes.
+ROLLUP_ADD_NEW_ROW = """
+INSERT INTO expense_monthly_rollup
+    (user_id, expense_year, expense_month, category_id, subcategory_id, payment_mode_id,
+     expense_count, amount_count, amount_sum)
+VALUES
+    (IFNULL(NEW.user_id, 0), YEAR(NEW.expense_date), MONTH(NEW.expense_date), NEW.category_id,
+     IFNULL(NEW.subcategory_id, 0), NEW.payment_mode_id,
+     1, NEW.amount_paid IS NOT NULL, IFNULL(NEW.amount_paid, 0))
+ON DUPLICATE KEY UPDATE
+    expense_count = expense_count + 1,
+    amount_count = amount_count + (NEW.amount_paid IS NOT NULL),
+    amount_sum = amount_sum + IFNULL(NEW.amount_paid, 0)
+"""
+
+ROLLUP_OLD_ROW_KEY = """
+user_id = IFNULL(OLD.user_id, 0) AND expense_year = YEAR(OLD.expense_date)
+AND expense_month = MONTH(OLD.expense_date) AND category_id = OLD.category_id
+AND subcategory_id = IFNULL(OLD.subcategory_id, 0) AND payment_mode_id = OLD.payment_mode_id
+"""
+
+ROLLUP_REMOVE_OLD_ROW = f"""
+UPDATE expense_monthly_rollup
+SET expense_count = expense_count - 1,
+    amount_count = amount_count - (OLD.amount_paid IS NOT NULL),
+    amount_sum = amount_sum - IFNULL(OLD.amount_paid, 0)
+WHERE {ROLLUP_OLD_ROW_KEY};
+DELETE FROM expense_monthly_rollup WHERE {ROLLUP_OLD_ROW_KEY} AND expense_count <= 0
+"""
+
+# Session variable that suspends the data-version and change-log triggers on expenses (migration 9) for one
+# connection. BulkExpenseLoader(defer_change_tracking=True) sets it and records its rows once per commit
+# instead, so parallel load workers do not queue on the one 'expenses' row of data_versions.
+DEFERRED_CHANGE_TRACKING_VARIABLE = '@expenses_change_tracking'
+
+
+def _deferrable(statement, deferrable):
+    if not deferrable:
+        return statement
+    return f"BEGIN IF {DEFERRED_CHANGE_TRACKING_VARIABLE} IS NULL THEN {statement}; END IF; END"
+
+
+# Data-version counters: every row change on a tracked table bumps that table's counter, so caches can
+# check one tiny table instead of re-running their queries (DatabaseOperations.data_version)
+def data_version_statements(tables, deferrable=False):
+    """Counter rows and triggers for `tables` in data_versions (with `deferrable`, see migration 9)."""
+    statements = ["INSERT IGNORE INTO data_versions (table_name) VALUES "
+                  + ", ".join(f"('{table}')" for table in tables)]
+    for table in tables:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            bump = f"UPDATE data_versions SET version = version + 1 WHERE table_name = '{table}'"
+            statements += [
+                f"DROP TRIGGER IF EXISTS trg_{table}_version_{event.lower()}",
+                f"""CREATE TRIGGER trg_{table}_version_{event.lower()} AFTER {event} ON {table}
+                   FOR EACH ROW {_deferrable(bump, deferrable)}""",
+            ]
+    return statements
+
+
+# Expense change log: one row per inserted, updated or deleted expense, read by delta syncs of local copies
+# (backend/database/delta_sync.py). The expense's current state is re-read, so the row only needs its id.
+def expense_change_log_triggers(deferrable=False):
+    """Change-log triggers on expenses (with `deferrable`, see migration 9)."""
+    return [
+        statement
+        for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD'))
+        for statement in (
+            f"DROP TRIGGER IF EXISTS trg_expenses_changelog_{event.lower()}",
+            f"""CREATE TRIGGER trg_expenses_changelog_{event.lower()} AFTER {event} ON expenses
+               FOR EACH ROW {_deferrable(
+                   f"INSERT INTO expense_changes (expense_id) VALUES ({row}.expense_id)", deferrable)}""",
+        )
+    ]
+
+
+EXPENSE_CHANGE_LOG_TRIGGERS = expense_change_log_triggers()
+
+# Versioned, forward-only schema changes, applied in order.
+# Index builds use ALGORITHM=INPLACE, LOCK=NONE so existing tables stay readable and writable.
+MIGRATIONS = [
+    {
+        'version': 1,
+        'description': 'Covering indexes for the dashboard expense queries',
+        'statements': [
+            # Single-user dashboards: user_id equality + expense_date range, then every column
+            # the fact/category/subcategory/payment-mode queries read (index-only scans)
+            """ALTER TABLE expenses
+               ADD INDEX idx_expenses_user_date (user_id, expense_date, category_id, subcategory_id, payment_mode_id, amount_paid),
+               ALGORITHM=INPLACE, LOCK=NONE""",
+            # "All Users" dashboards: expense_date range only
+            """ALTER TABLE expenses
+               ADD INDEX idx_expenses_date (expense_date, user_id, category_id, subcategory_id, payment_mode_id, amount_paid),
+               ALGORITHM=INPLACE, LOCK=NONE""",
+        ],
+    },
+    {
+        'version': 2,
+        'description': 'Monthly expense rollup table maintained by triggers',
+        'statements': [
+            """CREATE TABLE IF NOT EXISTS expense_monthly_rollup (
+                user_id INT NOT NULL DEFAULT 0,                  -- 0 when the expense has no user
+                expense_year SMALLINT NOT NULL,
+                expense_month TINYINT NOT NULL,
+                category_id INT NOT NULL,
+                subcategory_id INT NOT NULL DEFAULT 0,           -- 0 when the expense has no subcategory
+                payment_mode_id INT NOT NULL,
+                expense_count INT NOT NULL DEFAULT 0,            -- Rows in the bucket
+                amount_count INT NOT NULL DEFAULT 0,             -- Rows with a non-null amount_paid
+                amount_sum DECIMAL(16,2) NOT NULL DEFAULT 0,     -- Sum of non-null amount_paid
+                PRIMARY KEY (user_id, expense_year, expense_month, category_id, subcategory_id, payment_mode_id),
+                INDEX idx_rollup_period (expense_year, expense_month, user_id)
+            )""",
+            "DROP TRIGGER IF EXISTS trg_expenses_rollup_insert",
+            f"""CREATE TRIGGER trg_expenses_rollup_insert AFTER INSERT ON expenses
+               FOR EACH ROW {ROLLUP_ADD_NEW_ROW}""",
+            "DROP TRIGGER IF EXISTS trg_expenses_rollup_delete",
+            f"""CREATE TRIGGER trg_expenses_rollup_delete AFTER DELETE ON expenses
+               FOR EACH ROW BEGIN {ROLLUP_REMOVE_OLD_ROW}; END""",
+            "DROP TRIGGER IF EXISTS trg_expenses_rollup_update",
+            f"""CREATE TRIGGER trg_expenses_rollup_update AFTER UPDATE ON expenses
+               FOR EACH ROW BEGIN {ROLLUP_REMOVE_OLD_ROW}; {ROLLUP_ADD_NEW_ROW}; END""",
+            # Backfill from history once the triggers are in place
+            "DELETE FROM expense_monthly_rollup",
+            REBUILD_EXPENSE_ROLLUP_QUERY + REBUILD_EXPENSE_ROLLUP_GROUP_BY,
+        ],
+    },
+    {
+        'version': 3,
+        'description': 'Change counters for cache invalidation maintained by triggers',
+        'statements': [
+            """CREATE TABLE IF NOT EXISTS data_versions (
+                table_name VARCHAR(64) PRIMARY KEY,              -- Tracked table
+                version BIGINT NOT NULL DEFAULT 0                -- Bumped on every insert/update/delete
+            )""",
+        ] + data_version_statements(('expenses', 'categories', 'subcategories', 'payment_modes')),
+    },
+    {
+        'version': 4,
+        'description': 'Expense change log for incremental sync of local copies',
+        'statements': [
+            """CREATE TABLE IF NOT EXISTS expense_changes (
+                change_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                expense_id INT NOT NULL,                          -- Inserted, updated or deleted expense
+                changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_expense_changes_changed_at (changed_at, expense_id)
+            )""",
+        ] + EXPENSE_CHANGE_LOG_TRIGGERS,
+    },
+    {
+        'version': 5,
+        'description': 'Keyset indexes for paging through individual expenses',
+        'statements': [
+            # Pages ordered by (expense_date, expense_id) read one index range per page, with or without a user
+            """ALTER TABLE expenses
+               ADD INDEX idx_expenses_date_id (expense_date, expense_id),
+               ALGORITHM=INPLACE, LOCK=NONE""",
+            """ALTER TABLE expenses
+               ADD INDEX idx_expenses_user_date_id (user_id, expense_date, expense_id),
+               ALGORITHM=INPLACE, LOCK=NONE""",
+        ],
+    },
+    {
+        'version': 6,
+        'description': 'Change counter for users, so the dimension registry reloads new users',
+        'statements': data_version_statements(('users',)),
+    },
+    {
+        'version': 7,
+        'description': 'Content fingerprints, so re-imported expenses are not stored twice',
+        'statements': [
+            # SHA-256 (hex) of user, date, amount, category, subcategory, payment mode and source reference,
+            # written by backend/database/bulk_loader.py. Rows written before this migration keep NULL.
+            """ALTER TABLE expenses
+               ADD COLUMN source_ref VARCHAR(255) NULL,
+               ADD COLUMN fingerprint CHAR(64) CHARACTER SET ascii NULL""",
+            """ALTER TABLE expenses
+               ADD UNIQUE INDEX uq_expenses_fingerprint (fingerprint),
+               ALGORITHM=INPLACE, LOCK=NONE""",
+        ],
+    },
+    {
+        'version': 8,
+        'description': 'Fingerprint index includes expense_date, so expenses can be partitioned',
+        'statements': [
+            # Every unique key on a partitioned table must include the partitioning column
+            # (backend/database/partitions.py). expense_date is part of the fingerprint, so no duplicate
+            # that the old index rejected gets through. One statement: the table is never without the index.
+            """ALTER TABLE expenses
+               DROP INDEX uq_expenses_fingerprint,
+               ADD UNIQUE INDEX uq_expenses_fingerprint (fingerprint, expense_date),
+               ALGORITHM=INPLACE, LOCK=NONE""",
+        ],
+    },
+    {
+        'version': 9,
+        'description': 'Expense change tracking that bulk loads can defer to their commits',
+        'statements': data_version_statements(('expenses',), deferrable=True)
+                      + expense_change_log_triggers(deferrable=True),
+    },
+]
@@ -0,0 +1,329 @@
+import datetime
+import decimal
+import re
+import sqlite3
+import logging
+from mysql.connector.constants import FieldType
+from backend.database.schema import CREATE_TABLES_SQL, MIGRATIONS
+
+logger = logging.getLogger(__name__)
+
+# Stores dates as ISO text (so half-open range filters compare correctly), per parameter rather than with
+# sqlite3.register_adapter, which would change every sqlite3 connection in the process
+_ADAPTERS = {
+    datetime.date: lambda value: value.isoformat(),
+    datetime.datetime: lambda value: value.isoformat(" "),
+    decimal.Decimal: str,  # Stored with NUMERIC affinity, read back as float
+}
+
+# Reads DATE/TIMESTAMP/DECIMAL columns back as date/datetime/float, like the MySQL driver with the DOUBLE
+# casts in queries.py; result columns are matched by name to the schema's columns of these types
+_CONVERTERS = {
+    'DATE': lambda value: datetime.date.fromisoformat(value[:10]) if isinstance(value, str) else value,
+    'TIMESTAMP': lambda value: datetime.datetime.fromisoformat(value) if isinstance(value, str) else value,
+    'DECIMAL': float,
+}
+
+
+def _adapt(params):
+    return tuple(_ADAPTERS[type(value)](value) if type(value) in _ADAPTERS else value for value in params)
+
+# MySQL column type codes reported for decoded Python values, so result_frames types the columns
+_TYPE_CODES = [
+    (datetime.datetime, FieldType.DATETIME),
+    (datetime.date, FieldType.DATE),
+    (bool, FieldType.TINY),
+    (int, FieldType.LONGLONG),
+    (float, FieldType.DOUBLE),
+    (bytes, FieldType.BLOB),
+]
+
+
+def _type_code(value):
+    for python_type, type_code in _TYPE_CODES:
+        if isinstance(value, python_type):
+            return type_code
+    return FieldType.VAR_STRING
+
+
+def _year(value):
+    return None if value is None else int(str(value)[:4])
+
+
+def _month(value):
+    return None if value is None else int(str(value)[5:7])
+
+
+def _datediff(first, second):
+    if first is None or second is None:
+        return None
+    return (datetime.date.fromisoformat(str(first)[:10]) - datetime.date.fromisoformat(str(second)[:10])).days
+
+
+class SQLiteCursor:
+    """
+    mysql.connector-style cursor over sqlite3: accepts %s placeholders, works as a context
+    manager, and reports MySQL type codes in `description` once rows have been fetched.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._type_codes = None
+        self._converters = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def execute(self, query, params=None):
+        self._type_codes = None
+        self._cursor.execute(query.replace('%s', '?'), _adapt(params or ()))
+        self._converters = self._column_converters()
+        return self
+
+    def executemany(self, query, seq_of_params):
+        self._cursor.executemany(query.replace('%s', '?'), (_adapt(params) for params in seq_of_params))
+        return self
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        rows = self._convert([row] if row is not None else [])
+        self._infer_types(rows)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size=None):
+        rows = self._convert(self._cursor.fetchmany(size) if size else self._cursor.fetchmany())
+        self._infer_types(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._convert(self._cursor.fetchall())
+        self._infer_types(rows)
+        return rows
+
+    def _column_converters(self):
+        if self._cursor.description is None:
+            return None
+        converters = [(index, _CONVERTERS[COLUMN_TYPES[column[0]]])
+                      for index, column in enumerate(self._cursor.description) if column[0] in COLUMN_TYPES]
+        return converters or None
+
+    def _convert(self, rows):
+        if not self._converters:
+            return rows
+        converted = []
+        for row in rows:
+            row = list(row)
+            for index, converter in self._converters:
+                if row[index] is not None:
+                    row[index] = converter(row[index])
+            converted.append(tuple(row))
+        return converted
+
+    def _infer_types(self, rows):
+        # SQLite values carry their own type; take it from the first non-null value per column
+        if self._type_codes is not None or not rows or self._cursor.description is None:
+            return
+        self._type_codes = [
+            _type_code(next((row[index] for row in rows if row[index] is not None), ''))
+            for index in range(len(self._cursor.description))
+        ]
+
+    @property
+    def description(self):
+        if self._cursor.description is None:
+            return None
+        type_codes = self._type_codes or [None] * len(self._cursor.description)
+        return [(col[0], type_code, None, None, None, None, True)
+                for col, type_code in zip(self._cursor.description, type_codes)]
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """
+    mysql.connector-style connection over sqlite3, so ConnectionPool and DatabaseOperations can use it
+    unchanged. `prepared` and `raw` cursor options are accepted and ignored (sqlite3 caches statements).
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, prepared=False, raw=False, **kwargs):
+        return SQLiteCursor(self._connection.cursor())
+
+    @property
+    def in_transaction(self):
+        return self._connection.in_transaction
+
+    def is_connected(self):
+        try:
+            self._connection.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def close(self):
+        self._connection.close()
+
+
+def connect(path):
+    """
+    Open a SQLite database file with the MySQL functions the queries use (YEAR, MONTH, DATEDIFF).
+    Use a file path rather than ':memory:', since every pooled connection opens its own handle.
+    """
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.execute("PRAGMA journal_mode = WAL")  # Readers on other pooled connections do not block writers
+    connection.create_function("YEAR", 1, _year, deterministic=True)
+    connection.create_function("MONTH", 1, _month, deterministic=True)
+    connection.create_function("DATEDIFF", 2, _datediff, deterministic=True)
+    return SQLiteConnection(connection)
+
+
+# Migrations with no SQLite counterpart, and why; every statement of the others is translated
+SQLITE_SKIPPED_MIGRATIONS = {
+    2: "the rollup triggers are MySQL upserts; SQLite summaries aggregate expenses directly",
+}
+
+
+def _split_clauses(sql):
+    """Split the comma-separated clauses of a statement, leaving commas inside parentheses alone."""
+    clauses, depth, start = [], 0, 0
+    for position, char in enumerate(sql):
+        depth += {'(': 1, ')': -1}.get(char, 0)
+        if char == ',' and depth == 0:
+            clauses.append(sql[start:position].strip())
+            start = position + 1
+    clauses.append(sql[start:].strip())
+    return [clause for clause in clauses if clause]
+
+
+def _translate_column(definition):
+    definition = re.sub(r'\b(?:BIG)?INT (?:PRIMARY KEY AUTO_INCREMENT|AUTO_INCREMENT PRIMARY KEY)',
+                        'INTEGER PRIMARY KEY AUTOINCREMENT', definition)
+    definition = re.sub(r'ENUM\([^)]*\)', 'TEXT', definition)
+    definition = re.sub(r'\s+CHARACTER SET \w+', '', definition)
+    return re.sub(r'\s+ON UPDATE CURRENT_TIMESTAMP', '', definition)
+
+
+def _translate_create_table(sql):
+    """CREATE TABLE for SQLite, followed by the CREATE INDEX statements of its inline indexes."""
+    table = re.match(r'CREATE TABLE (?:IF NOT EXISTS )?(\w+)', sql).group(1)
+    head, body = sql.split('(', 1)
+    body, tail = body.rsplit(')', 1)
+    columns, indexes = [], []
+    for clause in _split_clauses(body):
+        index = re.match(r'(UNIQUE )?INDEX (\w+) \(([^)]*)\)$', clause)
+        if index:
+            unique, name, index_columns = index.groups()
+            indexes.append(f"CREATE {unique or ''}INDEX IF NOT EXISTS {name} ON {table} ({index_columns})")
+        else:
+            columns.append(_translate_column(clause))
+    statements = [f"{head.strip()} ({', '.join(columns)})"] + indexes
+
+    start_id = re.match(r'\s*AUTO_INCREMENT\s*=\s*(\d+)\s*$', tail)
+    if start_id:
+        # AUTO_INCREMENT = N: the next id handed out is N
+        statements.append(f"INSERT INTO sqlite_sequence (name, seq) VALUES ('{table}', {int(start_id.group(1)) - 1})")
+    return statements
+
+
+def _translate_alter_table(sql):
+    """One SQLite statement per clause of an ALTER TABLE (ADD/DROP INDEX, ADD COLUMN)."""
+    table, clauses = re.match(r'ALTER TABLE (\w+)\s+(.*)$', sql, re.S).groups()
+    statements = []
+    for clause in _split_clauses(clauses):
+        index = re.match(r'ADD (UNIQUE )?INDEX (\w+) \(([^)]*)\)$', clause)
+        column = re.match(r'ADD COLUMN (.*)$', clause, re.S)
+        if index:
+            unique, name, columns = index.groups()
+            statements.append(f"CREATE {unique or ''}INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+        elif clause.startswith('DROP INDEX '):
+            statements.append(f"DROP INDEX IF EXISTS {clause.split()[-1]}")
+        elif column:
+            statements.append(f"ALTER TABLE {table} ADD COLUMN {_translate_column(column.group(1))}")
+        elif not re.match(r'(ALGORITHM|LOCK)\s*=', clause):
+            raise ValueError(f"No SQLite translation for ALTER TABLE clause: {clause}")
+    return statements
+
+
+def _translate_trigger(sql):
+    # SQLite trigger bodies are always BEGIN ... END blocks of ';'-terminated statements
+    head, body = re.match(r'(CREATE TRIGGER .*? FOR EACH ROW)\s+(.*)$', sql, re.S).groups()
+    body = re.sub(r'^BEGIN\s+(.*?);?\s*END$', r'\1', body.strip(), flags=re.S)
+    # SQLite has no session variables, so deferrable triggers (schema.py, migration 9) always fire;
+    # its writers take turns anyway
+    body = re.sub(r'^IF @\w+ IS NULL THEN\s+(.*?);?\s*END IF$', r'\1', body, flags=re.S)
+    return [f"{head} BEGIN {body}; END"]
+
+
+def translate_statement(sql):
+    """Translate one MySQL schema statement from schema.py into a list of SQLite statements."""
+    sql = re.sub(r'--[^\n]*', '', sql).strip()
+    if sql.startswith('CREATE TABLE'):
+        return _translate_create_table(sql)
+    if sql.startswith('ALTER TABLE'):
+        return _translate_alter_table(sql)
+    if sql.startswith('CREATE TRIGGER'):
+        return _translate_trigger(sql)
+    if sql.startswith('INSERT IGNORE INTO'):
+        return ['INSERT OR IGNORE INTO' + sql[len('INSERT IGNORE INTO'):]]
+    if sql.startswith(('DROP TABLE IF EXISTS', 'DROP TRIGGER IF EXISTS')):
+        return [sql]
+    raise ValueError(f"No SQLite translation for: {sql[:60]}")
+
+
+def migration_statements(migration):
+    """SQLite statements of one entry of MIGRATIONS ([] for SQLITE_SKIPPED_MIGRATIONS)."""
+    if migration['version'] in SQLITE_SKIPPED_MIGRATIONS:
+        return []
+    return [statement for sql in migration['statements'] for statement in translate_statement(sql)]
+
+
+def schema_statements():
+    """Translate the MySQL base tables in schema.py, then its migrations in order, into SQLite statements."""
+    statements = [statement for sql in CREATE_TABLES_SQL.split(';') if re.sub(r'--[^\n]*', '', sql).strip()
+                  for statement in translate_statement(sql)]
+    for migration in MIGRATIONS:
+        statements += migration_statements(migration)
+    return statements
+
+
+# Declared type of every DATE, TIMESTAMP and DECIMAL column in the schema, by column name (SQLiteCursor)
+COLUMN_TYPES = {
+    name: column_type
+    for sql in schema_statements() if sql.startswith('CREATE TABLE')
+    for name, column_type in re.findall(r'(?:\(|, )(\w+) (DATE|TIMESTAMP|DECIMAL)\b', sql)
+}
+
+
+def create_schema(path):
+    """(Re)create the expense tracker tables and indexes in the SQLite database at `path`."""
+    conn = connect(path)
+    cursor = conn.cursor()
+    try:
+        for sql in schema_statements():
+            cursor.execute(sql)
+        conn.commit()
+        logger.info(f"Created SQLite schema in {path}")
+    finally:
+        cursor.close()
+        conn.close()
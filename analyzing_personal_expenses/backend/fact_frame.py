@@ -0,0 +1,144 @@
+import threading
+import pandas as pd
+from backend.database.query_builder import parse_month
+from backend.database.result_cache import frame_nbytes
+
+# Columns of the per-expense frame that DataCleaner and the charts work on
+EXPENSE_COLUMNS = ['expense_date', 'category_name', 'subcategory_name', 'amount_paid']
+
+# Compact fact-frame dtypes (see compact_fact_frame). user_id and subcategory_id may be NULL.
+FACT_NAME_COLUMNS = ('user_name', 'category_name', 'subcategory_name', 'payment_mode_name')
+FACT_ID_DTYPES = {'user_id': 'Int32', 'category_id': 'int32', 'subcategory_id': 'Int32', 'payment_mode_id': 'int32'}
+
+
+def compact_fact_frame(facts_df, name_dtypes=None):
+    """
+    Canonical in-memory fact frame: name columns as Categoricals, ids as 32-bit ints, amount_paid as
+    float32, plus expense_year (int16) and expense_month (int8, 1-12) derived from expense_date.
+    `name_dtypes` ({column: CategoricalDtype}, e.g. DimensionRegistry.name_dtypes) gives every frame
+    the same categories, so frames concatenate and compare without falling back to object columns.
+    float32 holds every amount below 167,772.16 to within half a cent; sum amounts as float64
+    (see category_amount_totals).
+    """
+    name_dtypes = name_dtypes or {}
+    df = facts_df.copy(deep=False)
+    for column in FACT_NAME_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype(name_dtypes.get(column, 'category'))
+    for column, dtype in FACT_ID_DTYPES.items():
+        if column in df.columns:
+            df[column] = df[column].astype(dtype)
+    if 'amount_paid' in df.columns:
+        df['amount_paid'] = df['amount_paid'].astype('float32')
+    if 'expense_date' in df.columns:
+        dates = pd.to_datetime(df['expense_date'])
+        df['expense_year'] = dates.dt.year.astype('int16')
+        df['expense_month'] = dates.dt.month.astype('int8')
+    return df
+
+
+def filter_period(facts_df, selected_year=None, selected_month=None):
+    """
+    Rows of a fact frame in `selected_year` and `selected_month` (a name like "March" or 1-12), compared
+    as small ints on expense_year/expense_month (derived from expense_date if the frame lacks them).
+    """
+    mask = pd.Series(True, index=facts_df.index)
+    if selected_year or selected_month:
+        compact = ({'expense_year', 'expense_month'}.issubset(facts_df.columns)
+                   and pd.api.types.is_integer_dtype(facts_df['expense_month']))
+        dates = None if compact else pd.to_datetime(facts_df['expense_date'], errors='coerce')
+        if selected_year:
+            years = facts_df['expense_year'] if dates is None else dates.dt.year
+            mask &= years == int(selected_year)
+        if selected_month:
+            months = facts_df['expense_month'] if dates is None else dates.dt.month
+            mask &= months == parse_month(selected_month)
+    return facts_df[mask]
+
+
+def category_amount_totals(facts_df):
+    """Sum of amount_paid per category_name, added up as float64 so long sums do not accumulate float32 rounding."""
+    amounts = pd.to_numeric(facts_df['amount_paid'], errors='coerce').astype('float64')
+    return amounts.groupby(facts_df['category_name'], observed=True).sum()
+
+
+def expense_frame(facts_df):
+    """Return the expense columns (date, category, subcategory, amount) of a fact frame."""
+    if facts_df.empty:
+        return pd.DataFrame(columns=EXPENSE_COLUMNS)
+    return facts_df[EXPENSE_COLUMNS]  # Copy-on-write: no copy until a column is modified
+
+
+def order_expense_facts(facts_df):
+    """Sort facts like ORDER BY category_name, subcategory_name, amount_paid DESC (SQL puts NULLs first ascending)."""
+    return facts_df.sort_values(['category_name', 'subcategory_name', 'amount_paid'],
+                                ascending=[True, True, False], na_position='first', ignore_index=True,
+                                key=lambda col: col.fillna(float('-inf')) if col.name == 'amount_paid' else col)
+
+
+def derive_categories(facts_df):
+    """Distinct categories present in the fact frame, ordered by name."""
+    if facts_df.empty:
+        return pd.DataFrame(columns=['category_id', 'category_name'])
+    return (
+        facts_df[['category_id', 'category_name']]
+        .drop_duplicates()
+        .sort_values('category_name')
+        .reset_index(drop=True)
+    )
+
+
+def derive_subcategories(facts_df):
+    """Distinct (non-null) subcategories present in the fact frame, ordered by name."""
+    if facts_df.empty:
+        return pd.DataFrame(columns=['subcategory_id', 'subcategory_name'])
+    return (
+        facts_df[['subcategory_id', 'subcategory_name']]
+        .dropna(subset=['subcategory_id'])
+        .astype({'subcategory_id': 'int64'})
+        .drop_duplicates()
+        .sort_values('subcategory_name')
+        .reset_index(drop=True)
+    )
+
+
+def derive_payment_modes(facts_df):
+    """Payment-mode rows in the shape DataVisualization.get_payment_mode_count expects."""
+    if facts_df.empty:
+        return pd.DataFrame(columns=['expense_date', 'category_name', 'payment_mode_name', 'payment_count'])
+    payment_mode_df = facts_df[['expense_date', 'category_name', 'payment_mode_name', 'payment_mode_id']].copy()
+    return payment_mode_df.rename(columns={'payment_mode_id': 'payment_count'})
+
+
+class MemoryReport:
+    """
+    Memory held by the frames a dashboard run builds, one entry per stage (e.g. 'cleaned summary'),
+    measured with frame_nbytes. Thread-safe, since fetches run concurrently.
+    """
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, frame):
+        """Record the size of `frame` (DataFrame or Series) at `stage` (seen again: overwritten); returns `frame`."""
+        entry = {'rows': len(frame), 'columns': frame.shape[1] if frame.ndim == 2 else 1, 'bytes': frame_nbytes(frame)}
+        with self._lock:
+            self._stages[stage] = entry
+        return frame
+
+    def summary(self):
+        """One row per stage in recording order: rows, columns, bytes, MB and bytes per row."""
+        with self._lock:
+            stages = dict(self._stages)
+        columns = ['stage', 'rows', 'columns', 'bytes', 'mb', 'bytes_per_row']
+        if not stages:
+            return pd.DataFrame(columns=columns)
+        df = pd.DataFrame.from_dict(stages, orient='index').rename_axis('stage').reset_index()
+        df['mb'] = (df['bytes'] / 1024 / 1024).round(2)
+        df['bytes_per_row'] = (df['bytes'] / df['rows'].where(df['rows'] > 0)).round(1)
+        return df[columns]
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(entry['bytes'] for entry in self._stages.values())
@@ -0,0 +1,224 @@
+import csv
+import datetime
+import decimal
+import os
+import re
+import time
+import logging
+from collections import Counter
+from backend.database.bulk_loader import (BulkExpenseLoader, EXPENSE_LOAD_COLUMNS, BULK_BATCH_SIZE,
+                                          BULK_TRANSACTION_ROWS)
+
+logger = logging.getLogger(__name__)
+
+# Statement CSV header for each field; override per export with StatementImporter(columns=...)
+DEFAULT_STATEMENT_COLUMNS = {
+    'date': 'Date',
+    'amount': 'Amount',
+    'category': 'Category',
+    'subcategory': 'Subcategory',
+    'payment_mode': 'Payment Mode',
+    'user': 'User',
+    'reference': 'Reference',
+}
+
+# Date formats tried in order when no date_format is given (day before month, as Indian bank exports write them)
+STATEMENT_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%d %b %Y', '%d-%b-%Y', '%d/%m/%y')
+
+# Largest amount a DECIMAL(10,2) amount_paid holds
+MAX_STATEMENT_AMOUNT = decimal.Decimal('99999999.99')
+
+# Imported expenses keep the default creation_date (the time of the import)
+IMPORT_COLUMNS = tuple(column for column in EXPENSE_LOAD_COLUMNS if column != 'creation_date')
+
+# Characters dropped from amounts: currency symbols, thousands separators, spaces
+_AMOUNT_NOISE = re.compile(r'[^\d.()+-]')
+
+
+def read_statement(path, encoding='utf-8-sig'):
+    """Yield (line number, {header: value}) for each data row of a statement CSV, one row at a time."""
+    with open(path, newline='', encoding=encoding) as f:
+        reader = csv.DictReader(f)
+        for record in reader:
+            yield reader.line_num, record
+
+
+def parse_amount(text):
+    """'₹1,234.50', '-12', '(12.00)' -> Decimal with two places; None if it is not a number."""
+    text = _AMOUNT_NOISE.sub('', text or '')
+    negative = text.startswith('(') and text.endswith(')')
+    try:
+        amount = decimal.Decimal(text.strip('()'))
+    except decimal.InvalidOperation:
+        return None
+    if not amount.is_finite():
+        return None
+    return (-amount if negative else amount).quantize(decimal.Decimal('0.01'), rounding=decimal.ROUND_HALF_UP)
+
+
+def parse_date(text, formats=STATEMENT_DATE_FORMATS):
+    """The first of `formats` that parses `text`, as a date; None if none does."""
+    text = (text or '').strip()
+    for date_format in formats:
+        try:
+            return datetime.datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+class StatementImporter:
+    """
+    Streams bank or card statement CSVs into `expenses`. Each file is read row by row through a
+    pipeline of generators (read_statement -> expense_rows -> BulkExpenseLoader), so only the batch
+    being inserted is held in memory. Category, subcategory, payment-mode and user names are matched,
+    ignoring case, against the in-memory dimension tables (dimensions.py); rows that cannot be parsed or
+    matched are rejected with a reason instead of failing the import. Rows without a user get `default_user`.
+    Each expense's source_ref is the row's bank reference, or '<file name>:<line>' when it has none, so
+    importing a statement again adds no duplicates (see bulk_loader.expense_fingerprint).
+    """
+
+    def __init__(self, db_ops, columns=None, default_user=None, date_format=None, debits_negative=False,
+                 batch_size=BULK_BATCH_SIZE, transaction_rows=BULK_TRANSACTION_ROWS, on_duplicate='skip'):
+        self.db_ops = db_ops
+        self.columns = dict(DEFAULT_STATEMENT_COLUMNS, **(columns or {}))
+        self.date_formats = (date_format,) if date_format else STATEMENT_DATE_FORMATS
+        # Exports that write spending as negative amounts: those are the expenses, positive rows are credits
+        self.debits_negative = debits_negative
+        self.loader = BulkExpenseLoader(db_ops, batch_size=batch_size, transaction_rows=transaction_rows,
+                                        columns=IMPORT_COLUMNS, on_duplicate=on_duplicate)
+
+        tables = db_ops.dimensions.tables(db_ops)
+        self.category_ids = self._by_name(tables['category']['category_name'])
+        self.payment_mode_ids = self._by_name(tables['payment_mode']['payment_mode_name'])
+        self.user_ids = self._by_name(tables['user']['user_name'])
+        self.known_user_ids = set(self.user_ids.values())
+        subcategories = tables['subcategory']
+        self.subcategory_ids = {
+            (int(category_id), name.strip().lower()): int(subcategory_id)
+            for subcategory_id, category_id, name in zip(subcategories.index, subcategories['category_id'],
+                                                         subcategories['subcategory_name'])
+        }
+        # A subcategory name that exists under one category only also identifies the category
+        categories_by_subcategory = {}
+        for category_id, name in self.subcategory_ids:
+            categories_by_subcategory.setdefault(name, set()).add(category_id)
+        self.category_of_subcategory = {name: ids.pop() for name, ids in categories_by_subcategory.items()
+                                        if len(ids) == 1}
+
+        self.default_user_id = None
+        if default_user is not None:
+            self.default_user_id = self._user_id(str(default_user))
+            if self.default_user_id is None:
+                raise ValueError(f"Unknown user: {default_user}")
+
+    @staticmethod
+    def _by_name(names):
+        return {name.strip().lower(): int(dimension_id) for dimension_id, name in names.items()}
+
+    def _user_id(self, text):
+        if text.isdigit() and int(text) in self.known_user_ids:
+            return int(text)
+        return self.user_ids.get(text.lower())
+
+    def _field(self, record, field):
+        return (record.get(self.columns[field]) or '').strip()
+
+    def parse(self, record):
+        """One statement row -> (expense in IMPORT_COLUMNS order, less source_ref, None) or (None, reject reason)."""
+        expense_date = parse_date(self._field(record, 'date'), self.date_formats)
+        if expense_date is None:
+            return None, 'bad date'
+
+        amount = parse_amount(self._field(record, 'amount'))
+        if amount is None:
+            return None, 'bad amount'
+        if self.debits_negative:
+            amount = -amount
+        if amount <= 0:
+            return None, 'credit or zero amount'
+        if amount > MAX_STATEMENT_AMOUNT:
+            return None, 'amount too large'
+
+        category = self._field(record, 'category').lower()
+        subcategory = self._field(record, 'subcategory').lower()
+        category_id = self.category_ids.get(category) if category else self.category_of_subcategory.get(subcategory)
+        if category_id is None:
+            return None, 'unknown category'
+        subcategory_id = None
+        if subcategory:
+            subcategory_id = self.subcategory_ids.get((category_id, subcategory))
+            if subcategory_id is None:
+                return None, 'unknown subcategory'
+
+        payment_mode_id = self.payment_mode_ids.get(self._field(record, 'payment_mode').lower())
+        if payment_mode_id is None:
+            return None, 'unknown payment mode'
+
+        user = self._field(record, 'user')
+        user_id = self._user_id(user) if user else self.default_user_id
+        if user and user_id is None:
+            return None, 'unknown user'
+
+        return (user_id, category_id, subcategory_id, amount, expense_date, payment_mode_id), None
+
+    def expense_rows(self, records, rejected, source=''):
+        """Yield the expense of each valid (line number, record); call rejected(line, record, reason) for the rest."""
+        for line, record in records:
+            row, reason = self.parse(record)
+            if row is None:
+                rejected(line, record, reason)
+            else:
+                yield row + (self._field(record, 'reference') or f"{source}:{line}",)
+
+    def import_file(self, path, rejects_path=None, progress=None):
+        """
+        Import one statement CSV and return {'rows_read', 'rows_loaded', 'duplicates', 'rows_rejected',
+        'rejected_by_reason', 'seconds', 'rows_per_second' (rows read), 'batches', 'commits'}; 'duplicates'
+        are loaded rows that were already stored (see BulkExpenseLoader.load). Rejected rows are also written,
+        with their line number and reason, to `rejects_path` if given. `progress` is called with the running
+        totals after every commit.
+        """
+        reasons = Counter()
+        started = time.perf_counter()
+        rejects_file = open(rejects_path, 'w', newline='', encoding='utf-8') if rejects_path else None
+        rejects_writer = None
+
+        def rejected(line, record, reason):
+            nonlocal rejects_writer
+            reasons[reason] += 1
+            if rejects_file is not None:
+                if rejects_writer is None:
+                    rejects_writer = csv.DictWriter(rejects_file, ['line', 'reason'] + list(record),
+                                                    extrasaction='ignore')
+                    rejects_writer.writeheader()
+                rejects_writer.writerow(dict(record, line=line, reason=reason))
+
+        def report(load_stats):
+            if progress is not None:
+                progress({'rows_loaded': load_stats['rows'], 'rows_rejected': sum(reasons.values()),
+                          'rows_per_second': load_stats['rows_per_second']})
+
+        try:
+            rows = self.expense_rows(read_statement(path), rejected, os.path.basename(path))
+            load_stats = self.loader.load(rows, progress=report)
+        finally:
+            if rejects_file is not None:
+                rejects_file.close()
+
+        seconds = time.perf_counter() - started
+        rows_rejected = sum(reasons.values())
+        stats = {
+            'rows_read': load_stats['rows'] + rows_rejected,
+            'rows_loaded': load_stats['rows'],
+            'duplicates': load_stats['duplicates'],
+            'rows_rejected': rows_rejected,
+            'rejected_by_reason': dict(reasons),
+            'seconds': seconds,
+            'rows_per_second': (load_stats['rows'] + rows_rejected) / seconds if seconds else 0.0,
+            'batches': load_stats['batches'],
+            'commits': load_stats['commits'],
+        }
+        logger.info(f"Imported {path}: {stats['rows_loaded']} expenses loaded, {rows_rejected} rejected "
+                    f"({stats['rows_per_second']:.0f} rows/s)")
+        return stats
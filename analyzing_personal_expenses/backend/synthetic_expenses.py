@@ -0,0 +1,145 @@
+import datetime
+import numpy as np
+import pandas as pd
+from backend.database.bulk_loader import EXPENSE_LOAD_COLUMNS
+
+# Generated expense dates, inclusive
+DEFAULT_START_DATE = datetime.date(2020, 1, 1)
+DEFAULT_END_DATE = datetime.date(2025, 12, 31)
+
+# Rows yielded per chunk
+DEFAULT_GENERATOR_CHUNK_SIZE = 100000
+
+# Rows per set of NumPy draws. Block b is drawn from its own SeedSequence (the seed, spawn key b), so row i
+# is always row i % GENERATOR_BLOCK_SIZE of block i // GENERATOR_BLOCK_SIZE, whatever the chunk size
+GENERATOR_BLOCK_SIZE = 50000
+
+# Typical expense amount per category for generated data: (median, spread) of a log-normal distribution.
+# A spread of 0.5 puts most amounts within about 0.4x-2.7x of the median
+CATEGORY_AMOUNTS = {
+    'Food': (250, 0.6),
+    'Transportation': (300, 0.8),
+    'Bills': (1500, 0.5),
+    'Groceries': (800, 0.6),
+    'Subscriptions': (400, 0.4),
+    'Personal Spending': (1200, 0.8),
+    'Investments': (10000, 0.9),
+    'Stationary': (150, 0.6),
+    'Fruits & Vegetables': (200, 0.5),
+    'Home Essentials': (1500, 1.0),
+    'Sports & Fitness': (1200, 0.7),
+    'School Fees': (15000, 0.6),
+}
+
+# (median, spread) for categories missing from CATEGORY_AMOUNTS
+DEFAULT_AMOUNT = (300, 0.8)
+
+# Largest value a DECIMAL(10,2) amount_paid holds
+MAX_AMOUNT = 99999999.99
+
+# Columns null_rate applies to (the nullable ones in backend/database/schema.py)
+NULLABLE_COLUMNS = ('user_id', 'subcategory_id', 'amount_paid')
+
+
+class SyntheticExpenseGenerator:
+    """
+    Random expenses drawn with NumPy, a chunk at a time, for building benchmark-sized datasets.
+    Users, categories and payment modes are uniform over the ids in `lookups` (see
+    bulk_loader.load_expense_lookups); the subcategory is one of the category's own; amounts are
+    log-normal around a per-category median (CATEGORY_AMOUNTS); dates are uniform between `start`
+    and `end`. With `null_rate`, each of user_id, subcategory_id and amount_paid is independently
+    null with that probability. The same `seed` gives the same rows, whatever the chunk size; without
+    a seed every run differs. Each row's source_ref, 'synthetic:<seed>:<row number>', makes its
+    fingerprint unique, so loading the same seed again adds nothing (see bulk_loader).
+    """
+
+    def __init__(self, lookups, seed=None, null_rate=0.0, start=DEFAULT_START_DATE, end=DEFAULT_END_DATE):
+        if not (lookups['user_ids'] and lookups['category_ids'] and lookups['payment_mode_ids']):
+            raise ValueError("Generating expenses needs at least one user, category and payment mode")
+        if not 0 <= null_rate <= 1:
+            raise ValueError("null_rate must be between 0 and 1")
+        # An unseeded run draws its own seed, so its rows still get distinct, stable source references
+        self.seed = np.random.SeedSequence().entropy if seed is None else seed
+        self.source_prefix = f"synthetic:{'-'.join(str(part) for part in np.atleast_1d(self.seed))}:"
+        self.null_rate = null_rate
+        self.start = np.datetime64(start, 'D')
+        self.days = (end - start).days + 1
+
+        self.user_ids = np.asarray(lookups['user_ids'], dtype=np.int64)
+        self.category_ids = np.asarray(lookups['category_ids'], dtype=np.int64)
+        self.payment_mode_ids = np.asarray(lookups['payment_mode_ids'], dtype=np.int64)
+
+        # Subcategories of every category laid end to end: category i owns
+        # subcategory_ids[offsets[i]:offsets[i] + counts[i]]. A trailing 0 keeps the offset of a
+        # category without subcategories a valid index; those rows are nulled after the draw.
+        per_category = [lookups['subcategories'].get(int(c), []) for c in self.category_ids]
+        self.subcategory_counts = np.array([len(ids) for ids in per_category], dtype=np.int64)
+        self.subcategory_offsets = np.concatenate(([0], np.cumsum(self.subcategory_counts)[:-1]))
+        self.subcategory_ids = np.array([i for ids in per_category for i in ids] + [0], dtype=np.int64)
+
+        names = lookups.get('category_names', {})
+        profiles = [CATEGORY_AMOUNTS.get(names.get(int(c)), DEFAULT_AMOUNT) for c in self.category_ids]
+        self.amount_mu = np.log([median for median, _ in profiles])
+        self.amount_sigma = np.array([spread for _, spread in profiles])
+
+    def chunks(self, n, chunk_size=DEFAULT_GENERATOR_CHUNK_SIZE):
+        """Yield `n` expenses as DataFrames of up to `chunk_size` rows, columns in EXPENSE_LOAD_COLUMNS order."""
+        block, drawn = None, None
+        for offset in range(0, n, chunk_size):
+            end = min(offset + chunk_size, n)
+            parts = []
+            for b in range(offset // GENERATOR_BLOCK_SIZE, (end - 1) // GENERATOR_BLOCK_SIZE + 1):
+                if b != block:  # A block a chunk boundary splits is drawn once, for both chunks
+                    block, drawn = b, self._draw(b)
+                first = b * GENERATOR_BLOCK_SIZE
+                parts.append(drawn.iloc[max(offset - first, 0):end - first])
+            yield pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0].reset_index(drop=True)
+
+    def _draw(self, block):
+        rng = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(block,)))
+        size, offset = GENERATOR_BLOCK_SIZE, block * GENERATOR_BLOCK_SIZE
+        category = rng.integers(len(self.category_ids), size=size)
+
+        counts = self.subcategory_counts[category]
+        pick = self.subcategory_offsets[category] + (rng.random(size) * counts).astype(np.int64)
+        subcategory = pd.Series(self.subcategory_ids[pick], dtype='Int64').where(counts > 0)
+
+        amount = np.exp(rng.normal(self.amount_mu[category], self.amount_sigma[category]))
+        amount = np.clip(np.round(amount, 2), 1.0, MAX_AMOUNT)
+        dates = self.start + rng.integers(self.days, size=size).astype('timedelta64[D]')
+
+        frame = pd.DataFrame({
+            'user_id': pd.array(rng.choice(self.user_ids, size=size), dtype='Int64'),
+            'category_id': self.category_ids[category],
+            'subcategory_id': subcategory,
+            'amount_paid': amount,
+            'expense_date': dates,
+            'payment_mode_id': rng.choice(self.payment_mode_ids, size=size),
+        })
+        frame['creation_date'] = frame['expense_date']  # Backdated, as populate_expenses.py does
+        frame['source_ref'] = self.source_prefix + pd.Series(np.arange(offset, offset + size)).astype(str)
+
+        if self.null_rate:
+            for column in NULLABLE_COLUMNS:
+                frame[column] = frame[column].mask(rng.random(size) < self.null_rate)
+        return frame[list(EXPENSE_LOAD_COLUMNS)]
+
+
+def expense_rows(frame):
+    """The rows of a generated chunk as tuples of Python values (None for nulls), for BulkExpenseLoader.load()."""
+    columns = []
+    for column in frame.columns:
+        series = frame[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = series.dt.date
+        columns.append(series.astype(object).where(series.notna(), None).tolist())
+    return zip(*columns)
+
+
+def write_csv(chunks, path):
+    """Write generated chunks to one CSV file at `path` (header first, nulls empty); return the row count."""
+    rows = 0
+    for i, frame in enumerate(chunks):
+        frame.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        rows += len(frame)
+    return rows
@@ -1,4 +1,5 @@
 import pandas as pd
+from backend.fact_frame import filter_period, category_amount_totals
 
 def get_insights(df, selected_year=None, selected_month=None):
     """Get insights such as max and min spending categories."""
@@ -19,18 +20,9 @@ def get_insights(df, selected_year=None, selected_month=None):
             "min_amount": "No data available"
         }
     
-    # Create a copy of the DataFrame explicitly
-    df = df.copy()
-
-    # Ensure 'amount_paid' is numeric and drop NaNs
-    df['amount_paid'] = pd.to_numeric(df['amount_paid'], errors='coerce')
-    df = df.dropna(subset=['amount_paid'])
-
-    # Filter data for selected year and month (if provided)
-    if selected_year:
-        df = df[df['expense_year'] == int(selected_year)]
-    if selected_month:
-        df = df[df['expense_month'] == selected_month]
+    # Filter on the small-int year/month columns, then drop rows without an amount
+    df = filter_period(df, selected_year, selected_month)
+    df = df[pd.to_numeric(df['amount_paid'], errors='coerce').notna()]
 
     if df.empty:
         return {
@@ -41,8 +33,12 @@ def get_insights(df, selected_year=None, selected_month=None):
         }
 
     # Group by category and get the total amount for each category
-    grouped = df.groupby('category_name')['amount_paid'].sum()
+    grouped = category_amount_totals(df)
+    return get_insights_from_totals(grouped)
+
 
+def get_insights_from_totals(grouped):
+    """Get max and min spending categories from per-category totals (a Series indexed by category name)."""
     if grouped.empty:
         return {
             "max_category": "No data available",
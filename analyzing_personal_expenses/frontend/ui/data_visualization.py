@@ -8,6 +8,7 @@ from frontend.ui.plot_subcategory_expenses import PlotSubcategoryExpenses
 from frontend.ui.plot_data_insights import PlotDataInsights
 from backend.database.db_operations import DatabaseOperations
 from backend.data_cleaner import DataCleaner
+from backend.fact_frame import filter_period
 
 class DataVisualization:
     def __init__(self, user_id=None, df=None):
@@ -50,6 +51,14 @@ class DataVisualization:
         """Display yearly expenses chart."""
         self.plot_yearly.plot(df, selected_year=selected_year, chart_type=chart_type)
 
+    def display_monthly_totals(self, category_totals, selected_year=None, selected_month=None, chart_type="pie"):
+        """Display a monthly chart from pre-aggregated category totals."""
+        self.plot_monthly.plot_totals(category_totals, selected_year=selected_year, selected_month=selected_month, chart_type=chart_type)
+
+    def display_yearly_totals(self, category_totals, selected_year="2025", chart_type="pie"):
+        """Display a yearly chart from pre-aggregated category totals."""
+        self.plot_yearly.plot_totals(category_totals, selected_year=selected_year, chart_type=chart_type)
+
     def display_data_insights(self, df):
         """Display data insights."""
         self.plot_insights.display(df)
@@ -74,6 +83,41 @@ class DataVisualization:
 
         return filtered_df.groupby('category_name')['total_amount'].sum().nlargest(10).reset_index()
     
+    def get_category_totals(self, summary_df):
+        """Total amount per category (Series indexed by category name) from a cleaned expense summary."""
+        if summary_df.empty:
+            return pd.Series(dtype=float, name='total_amount')
+        return summary_df.groupby('category_name')['total_amount'].sum()
+
+    def get_subcategory_totals(self, summary_df, category=None):
+        """Total amount per subcategory from a cleaned expense summary, optionally for one category."""
+        if summary_df.empty:
+            return pd.DataFrame(columns=['subcategory_name', 'total_amount'])
+
+        if category and category != "All Categories":
+            category = category.strip().lower()
+            summary_df = summary_df[summary_df['category_name'].str.strip().str.lower() == category]
+
+        return summary_df.groupby('subcategory_name', as_index=False).agg(total_amount=('total_amount', 'sum'))
+
+    def get_payment_mode_totals(self, summary_df, category=None):
+        """Number of expenses per payment mode from an expense summary, optionally for one category."""
+        if summary_df.empty:
+            return pd.DataFrame(columns=['payment_mode_name', 'count'])
+
+        if category and category != "All Categories":
+            category = category.strip().lower()
+            summary_df = summary_df[summary_df['category_name'].str.strip().str.lower() == category]
+
+        payment_mode_count = (
+            summary_df.groupby('payment_mode_name', as_index=False)
+            .agg(count=('expense_count', 'sum'))
+            .sort_values(by='count', ascending=False)
+            .reset_index(drop=True)
+        )
+        payment_mode_count['payment_mode_name'] = payment_mode_count['payment_mode_name'].str.strip()
+        return payment_mode_count
+
     def get_user_expenses_by_subcategory(self, df, user_id=None, selected_year=None, selected_month=None, category=None):
         """
         Fetch subcategory-level expenses, aggregated by 'subcategory_name' with 'total_amount'.
@@ -87,21 +131,12 @@ class DataVisualization:
                 st.warning("'amount_paid' column is missing from the data.")
                 return pd.DataFrame()
 
-            # Normalize the 'total_amount'
-            df['total_amount'] = pd.to_numeric(df['amount_paid'], errors='coerce').fillna(0)
+            # Filter by year and month if provided (small-int columns, no month-name strings)
+            if selected_year and selected_month and 'expense_date' in df.columns:
+                df = filter_period(df, selected_year, selected_month)
 
-            # Filter by year and month if provided
-            if selected_year or selected_month:
-                if 'expense_date' in df.columns:
-                    df['expense_date'] = pd.to_datetime(df['expense_date'], errors='coerce')
-                    df['expense_year'] = df['expense_date'].dt.year
-                    df['expense_month'] = df['expense_date'].dt.strftime('%B')
-
-            if selected_year and selected_month:
-                df = df[
-                    (df['expense_year'] == int(selected_year)) &
-                    (df['expense_month'].str.lower() == selected_month.lower())
-                ]
+            # Normalize the 'total_amount' (float64, so float32 amounts do not lose precision in the sums)
+            df = df.assign(total_amount=pd.to_numeric(df['amount_paid'], errors='coerce').astype('float64').fillna(0))
 
             # Apply category filter only if a specific category is selected
             if category and category != "All Categories":
@@ -146,20 +181,12 @@ class DataVisualization:
     def get_payment_mode_count(self, df, selected_year=None, selected_month=None, category=None):
         """Fetch the count of different payment modes."""
         try:
-            # Clean the data
-            df['payment_mode_name'] = df['payment_mode_name'].str.strip()
-
-            # Filter by selected year and month if provided
-            if selected_year or selected_month:
-                df['expense_date'] = pd.to_datetime(df['expense_date'], errors='coerce')
-                df['expense_year'] = df['expense_date'].dt.year
-                df['expense_month'] = df['expense_date'].dt.strftime('%B')
-
+            # Filter by selected year and month if provided (small-int columns, no month-name strings)
             if selected_year and selected_month:
-                df = df[
-                    (df['expense_year'] == int(selected_year)) &
-                    (df['expense_month'].str.lower() == selected_month.lower())
-                ]
+                df = filter_period(df, selected_year, selected_month)
+
+            # Clean the data
+            df = df.assign(payment_mode_name=df['payment_mode_name'].str.strip())
 
             if category and category != "All Categories":
                 category = category.strip().lower()
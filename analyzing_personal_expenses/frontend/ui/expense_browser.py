@@ -0,0 +1,47 @@
+import streamlit as st
+from backend.database.db_operations import DEFAULT_PAGE_SIZE
+from frontend.ui.headings import Heading
+
+PAGE_SIZES = [25, 50, 100, 200]
+
+
+def display_expense_browser(db_ops, user_id=None, selected_year=None, selected_month=None):
+    """
+    Display the individual transactions for the sidebar filters, one page at a time.
+    Pages are fetched by keyset (see DatabaseOperations.fetch_expense_page); the keys of the pages
+    already visited are kept in session state so "Newer" can step back without an OFFSET.
+    """
+    heading = Heading("🧾 Transactions")
+    heading.display_centered()
+
+    default_size = DEFAULT_PAGE_SIZE if DEFAULT_PAGE_SIZE in PAGE_SIZES else PAGE_SIZES[1]
+    page_size = st.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(default_size),
+                             key="expense_page_size")
+
+    # Start from the newest page whenever the filters or the page size change
+    filters = (user_id, selected_year, selected_month, page_size)
+    if st.session_state.get('expense_browser_filters') != filters:
+        st.session_state['expense_browser_filters'] = filters
+        st.session_state['expense_page_keys'] = [None]  # Key to start each visited page after
+
+    page_keys = st.session_state['expense_page_keys']
+    page_df, next_key = db_ops.fetch_expense_page(user_id, selected_year, selected_month,
+                                                  after=page_keys[-1], page_size=page_size)
+
+    if page_df.empty:
+        st.info("No transactions for the selected filters.")
+        return
+
+    st.dataframe(page_df, hide_index=True, use_container_width=True)
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("◀ Newer", disabled=len(page_keys) == 1, key="expense_page_newer"):
+            page_keys.pop()
+            st.rerun()
+    with col2:
+        st.caption(f"Page {len(page_keys)}")
+    with col3:
+        if st.button("Older ▶", disabled=next_key is None, key="expense_page_older"):
+            page_keys.append(next_key)
+            st.rerun()
@@ -39,3 +39,12 @@ def save_as_csv(df):
     path = f"/tmp/expenses.csv"
     df.to_csv(path, index=False)
     return path
+
+def save_expense_facts_as_csv(db_ops, user_id=None, selected_year=None, selected_month=None,
+                              path="/tmp/expense_facts.csv"):
+    """Stream expense facts to CSV chunk by chunk, so large histories never sit in memory at once."""
+    rows = 0
+    for i, chunk in enumerate(db_ops.iter_expense_facts(user_id, selected_year, selected_month)):
+        chunk.to_csv(path, index=False, mode='w' if i == 0 else 'a', header=(i == 0))
+        rows += len(chunk)
+    return path, rows
@@ -5,6 +5,7 @@ from frontend.ui.pie_chart import plot_pie_chart
 from frontend.ui.line_chart import plot_line_chart
 from frontend.ui.donut_chart import plot_donut_chart
 from frontend.ui.scatter_chart import plot_scatter_chart
+from backend.fact_frame import filter_period, category_amount_totals
 
 class PlotMonthlyExpenses:
     def __init__(self):
@@ -21,40 +22,21 @@ class PlotMonthlyExpenses:
             st.error("Missing required columns: 'amount_paid' or 'expense_date'.")
             return None
 
-        # Convert 'amount_paid' to numeric, invalid values will become NaN
-        # Create a copy after filtering
-        df = df.copy()
-
-        # Convert 'amount_paid' to numeric, invalid values will become NaN
-        df.loc[:, 'amount_paid'] = pd.to_numeric(df['amount_paid'], errors='coerce')
-
-
-        # Drop rows with NaN in 'amount_paid' if necessary
-        df = df.dropna(subset=['amount_paid'])
-
-        # Convert 'expense_date' to datetime
-        df['expense_date'] = pd.to_datetime(df['expense_date'], errors='coerce')
-        
-        # Extract year and month
-        df['expense_year'] = df['expense_date'].dt.year
-        df['expense_month'] = df['expense_date'].dt.strftime('%B')
-
-        # Filter data for selected year and selected month
-        if selected_year is not None:
-            filtered_df = df[
-                (df['expense_year'] == int(selected_year)) & 
-                (df['expense_month'].str.lower() == selected_month.lower())
-            ]
-        else:
-            filtered_df = df[df['expense_month'].str.lower() == selected_month.lower()]
+        # Filter on the small-int year/month columns; no copy of the frame, no month-name strings
+        filtered_df = filter_period(df, selected_year, selected_month)
+        filtered_df = filtered_df[pd.to_numeric(filtered_df['amount_paid'], errors='coerce').notna()]
 
         if filtered_df.empty:
             st.warning(f"No valid data for the selected year: {selected_year} and month: {selected_month}")
             return None
         
         # Group by category and sum up the expenses
-        monthly_expenses = filtered_df.groupby('category_name')['amount_paid'].sum()
+        monthly_expenses = category_amount_totals(filtered_df)
+
+        return self.plot_totals(monthly_expenses, selected_year, selected_month, chart_type, chart_size)
 
+    def plot_totals(self, monthly_expenses, selected_year=None, selected_month="January", chart_type="pie", chart_size=(6, 4)):
+        """Plot pre-aggregated category totals (a Series indexed by category name) for a month."""
         if monthly_expenses.empty:
             st.warning(f"No grouped data available for the selected year: {selected_year} and month: {selected_month}")
             return None
@@ -52,7 +52,10 @@ class PlotYearlyExpenses:
             return None
 
         yearly_expenses = df.groupby('category_name')['amount_paid'].sum()
+        return self.plot_totals(yearly_expenses, selected_year, chart_type, chart_size)
 
+    def plot_totals(self, yearly_expenses, selected_year="2025", chart_type="pie", chart_size=(6, 4)):
+        """Plot pre-aggregated category totals (a Series indexed by category name) for a year."""
         if yearly_expenses.empty:
             st.warning("No data available for yearly expenses.")
             return None
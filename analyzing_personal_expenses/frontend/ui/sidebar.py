@@ -1,7 +1,10 @@
+import logging
 import streamlit as st
 from utils.static_expense_data import MONTHS, YEARS, CHARTTYPE
 from backend.database.db_operations import DatabaseOperations
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+
+logger = logging.getLogger(__name__)
 
 
 def display_sidebar(users: Dict[str, int]) -> Tuple[Optional[int], str, str, Optional[str], Optional[str], Optional[str]]:
@@ -9,6 +12,21 @@ def display_sidebar(users: Dict[str, int]) -> Tuple[Optional[int], str, str, Opt
     Display the sidebar with user filters and return selected values.
     Ensures a tuple is always returned with the expected values.
     """
+    user_id, visualization_type, chart_type, selected_month, selected_year, show_detailed_view = display_filters(users)
+
+    # Select category for detailed view (if detailed view is enabled)
+    detailed_view_category = None
+    if show_detailed_view:
+        detailed_view_category = select_category(user_id, selected_year, selected_month)
+
+    return user_id, visualization_type, chart_type, selected_month, selected_year, detailed_view_category
+
+
+def display_filters(users: Dict[str, int]) -> Tuple[Optional[int], str, str, Optional[str], Optional[str], bool]:
+    """
+    Display the sidebar filters without the category lookup, so the caller can run that query
+    alongside its own. The last value says whether the detailed view is enabled.
+    """
     st.sidebar.title("Choose Filters")
 
     # Select user
@@ -30,10 +48,10 @@ def display_sidebar(users: Dict[str, int]) -> Tuple[Optional[int], str, str, Opt
     # Select chart type (Pie, Bar, etc.)
     chart_type = select_chart_type()
 
-    # Select category for detailed view (if detailed view is enabled)
-    detailed_view_category = select_category(user_id, selected_year, selected_month)
+    # "More Detailed View" toggle
+    show_detailed_view = toggle_detailed_view()
 
-    return user_id, visualization_type, chart_type, selected_month, selected_year, detailed_view_category
+    return user_id, visualization_type, chart_type, selected_month, selected_year, show_detailed_view
 
 
 def select_user(users: Dict[str, int]) -> Optional[int]:
@@ -81,9 +99,9 @@ def select_chart_type() -> str:
 
 
 
-def select_category(user_id: Optional[int], selected_year: Optional[str], selected_month: Optional[str]) -> Optional[str]:
+def toggle_detailed_view() -> bool:
     """
-    Display category selection dropdown in the sidebar only after clicking 'More Detailed View'.
+    Display the 'More Detailed View' button and return whether the detailed view is enabled.
     """
     if 'show_detailed_view' not in st.session_state:
         st.session_state['show_detailed_view'] = False
@@ -91,32 +109,80 @@ def select_category(user_id: Optional[int], selected_year: Optional[str], select
     if st.sidebar.button("More Detailed View"):
         st.session_state['show_detailed_view'] = not st.session_state['show_detailed_view']
 
-    if st.session_state['show_detailed_view']:
-        db_ops = DatabaseOperations()
-        try:
-            # Fetch categories based on user_id, year, and month if applicable
-            categories_df = db_ops.fetch_user_categories(user_id, selected_year, selected_month)
-
-            # Debug: Show columns to verify structure
-           # st.sidebar.write("Category DataFrame Columns:", categories_df.columns.tolist())
-
-            if not categories_df.empty and 'category_name' in categories_df.columns:
-                categories = ["All Categories"] + categories_df['category_name'].tolist()
-            else:
-                #st.sidebar.warning("No valid categories found. Fetching all categories as fallback.")
-                categories_df = db_ops.fetch_all_categories()
-                if not categories_df.empty and 'category_name' in categories_df.columns:
-                    categories = ["All Categories"] + categories_df['category_name'].tolist()
-                else:
-                    categories = ["All Categories"]
-            
-            # Select category from the dropdown
-            category_name = st.sidebar.selectbox("Select Category", categories)
-            st.session_state['detailed_view_category'] = category_name
-            return category_name
-
-        except Exception as e:
-            st.sidebar.warning("No valid categories found")
-            return None
-
-    return None
+    return st.session_state['show_detailed_view']
+
+
+def toggle_transactions_view() -> bool:
+    """
+    Display the 'Show Transactions' checkbox and return whether the transaction list is shown.
+    """
+    return st.sidebar.checkbox("Show Transactions", value=False)
+
+
+def fetch_category_options(db_ops: DatabaseOperations, user_id: Optional[int], selected_year: Optional[str],
+                           selected_month: Optional[str]) -> Optional[List[str]]:
+    """
+    Fetch the category dropdown options. Makes no Streamlit calls, so it can run on a worker thread.
+    Returns None if the categories could not be loaded.
+    """
+    try:
+        # Fetch categories based on user_id, year, and month if applicable
+        categories_df = db_ops.fetch_user_categories(user_id, selected_year, selected_month)
+
+        if not categories_df.empty and 'category_name' in categories_df.columns:
+            return ["All Categories"] + categories_df['category_name'].tolist()
+
+        # Fall back to every category
+        return ["All Categories"] + db_ops.fetch_all_categories()
+
+    except Exception as e:
+        logger.error(f"Error fetching category options: {e}")
+        return None
+
+
+def select_category_option(categories: Optional[List[str]]) -> Optional[str]:
+    """
+    Display the category dropdown for the detailed view and return the selected category.
+    """
+    if categories is None:
+        st.sidebar.warning("No valid categories found")
+        return None
+
+    # Select category from the dropdown
+    category_name = st.sidebar.selectbox("Select Category", categories)
+    st.session_state['detailed_view_category'] = category_name
+    return category_name
+
+
+def select_category(user_id: Optional[int], selected_year: Optional[str], selected_month: Optional[str]) -> Optional[str]:
+    """
+    Fetch categories and display the category dropdown for the detailed view.
+    """
+    db_ops = DatabaseOperations()
+    return select_category_option(fetch_category_options(db_ops, user_id, selected_year, selected_month))
+
+
+def display_query_diagnostics(db_ops: DatabaseOperations) -> None:
+    """
+    Display the optional 'Query Diagnostics' panel: recent query timings per data-access method,
+    result cache and connection pool counters, and the memory held by this run's frames per stage.
+    """
+    if not st.sidebar.checkbox("Show Query Diagnostics", value=False):
+        return
+
+    with st.sidebar.expander("Query Diagnostics", expanded=True):
+        totals = db_ops.query_stats.totals()
+        st.caption(f"{totals['queries']} queries, {totals['slow_queries']} slow "
+                   f"(over {db_ops.query_stats.slow_ms:g} ms), {totals['errors']} failed")
+        st.dataframe(db_ops.query_summary(), hide_index=True)
+
+        cache = db_ops.cache_stats()
+        st.caption(f"Result cache: {cache['hit_ratio']:.0%} hits, {cache['entries']} entries, "
+                   f"{cache['bytes'] / 1024 / 1024:.1f} of {cache['max_bytes'] / 1024 / 1024:.0f} MB")
+        pool = db_ops.pool_stats()
+        st.caption(f"Connection pool: {pool['checkouts']} checkouts, {pool['waits']} waits, "
+                   f"{pool['connections_created']} connections opened")
+
+        memory = db_ops.memory_summary()
+        st.caption(f"Frames built this run: {db_ops.memory_report.total_bytes() / 1024 / 1024:.1f} MB")
+        st.dataframe(memory, hide_index=True)
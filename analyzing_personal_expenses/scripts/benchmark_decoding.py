@@ -0,0 +1,88 @@
+import argparse
+import datetime
+import sys
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from mysql.connector.constants import FieldType
+from mysql.connector.conversion import MySQLConverter
+
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.database.result_frames import frame_from_rows, frame_from_raw_rows
+
+# Cursor description of the expense fact columns, as the server sends them before and after the
+# SQL DOUBLE cast
+DECIMAL_FIELDS = [
+    ('expense_date', FieldType.DATE, None, None, None, None, 1, 0, 0),
+    ('category_id', FieldType.LONG, None, None, None, None, 1, 0, 0),
+    ('amount_paid', FieldType.NEWDECIMAL, None, None, None, None, 1, 0, 0),
+]
+DOUBLE_FIELDS = DECIMAL_FIELDS[:2] + [('amount_paid', FieldType.DOUBLE, None, None, None, None, 1, 0, 0)]
+
+
+def synthetic_wire_rows(row_count, seed=42):
+    """Result rows as the server sends them over the text protocol: one bytes value per cell."""
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, 3 * 365, row_count)
+    categories = rng.integers(1, 20, row_count)
+    cents = rng.integers(100, 500000, row_count)
+
+    start = datetime.date(2022, 1, 1)
+    return [
+        ((start + datetime.timedelta(days=int(d))).isoformat().encode(), str(c).encode(), f"{a / 100:.2f}".encode())
+        for d, c, a in zip(days, categories, cents)
+    ]
+
+
+def decode_with_decimals(rows):
+    """The previous path: the driver builds a Decimal and a date per cell, then a per-cell float()."""
+    converter = MySQLConverter()
+    decoded = [converter.row_to_python(row, DECIMAL_FIELDS) for row in rows]
+    df = pd.DataFrame(decoded, columns=[col[0] for col in DECIMAL_FIELDS])
+    df['amount_paid'] = df['amount_paid'].apply(lambda x: float(x) if x is not None else 0.0)
+    df['expense_date'] = pd.to_datetime(df['expense_date'])
+    return df
+
+
+def decode_with_double_cast(rows):
+    """SQL DOUBLE cast: the driver builds floats (cheap) and frame_from_rows converts columns in bulk."""
+    converter = MySQLConverter()
+    decoded = [converter.row_to_python(row, DOUBLE_FIELDS) for row in rows]
+    return frame_from_rows(decoded, DOUBLE_FIELDS)
+
+
+def decode_raw(rows):
+    """Raw cursor: no per-cell driver conversion; NumPy parses the bytes column-wise."""
+    return frame_from_raw_rows(rows, DOUBLE_FIELDS)
+
+
+def time_it(label, func, rows, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        df = func(rows)
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<45} {best * 1000:10.1f} ms   {dict(df.dtypes.astype(str))}")
+    return best
+
+
+def benchmark_decoding(row_count=1_000_000, repeats=3):
+    """Time driver decoding plus DataFrame building for each path; returns {label: seconds}."""
+    print(f"Decoding {row_count:,} rows (best of {repeats}):")
+    rows = synthetic_wire_rows(row_count)
+    return {
+        'decimal': time_it("Decimal objects + apply(float)", decode_with_decimals, rows, repeats),
+        'double_cast': time_it("SQL DOUBLE cast + frame_from_rows", decode_with_double_cast, rows, repeats),
+        'raw': time_it("raw cursor bytes + frame_from_raw_rows", decode_raw, rows, repeats),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark result-set decoding into DataFrames (no database needed).")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in the synthetic result set.")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per decoder (best is reported).")
+    args = parser.parse_args()
+    benchmark_decoding(args.rows, args.repeats)
@@ -0,0 +1,107 @@
+import argparse
+import statistics
+import sys
+import os
+import time
+
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.database.db_operations import DatabaseOperations, forget_schema_checks
+from backend.database.result_cache import ResultCache
+from backend.database.parallel_loader import deferred_indexes
+
+
+def dashboard_query_shapes(db_ops, user_id, selected_year):
+    """
+    The filtered queries of the dashboard, as (name, callable) pairs. A render (app/main.py) issues the
+    summary, read from the rollup when it exists and otherwise by scanning expenses (both are timed),
+    the category options and a page of transactions. The row-level fetches (expense facts, categories,
+    payment modes) follow; the page no longer issues them, but the migration 1 indexes serve them too.
+    """
+    use_rollup = (True, False) if db_ops.rollup_available() else (False,)
+    shapes = []
+    for scope, uid in (("all users", None), (f"user {user_id}", user_id)):
+        for period, month in (("year", None), ("month", "January")):
+            label = f"{scope}, {period}"
+            shapes.extend(
+                (f"summary, {'rollup' if rollup else 'scan'} ({label})",
+                 lambda uid=uid, month=month, rollup=rollup: db_ops.fetch_expense_summary(
+                     uid, selected_year, month, use_rollup=rollup))
+                for rollup in use_rollup)
+            shapes.extend([
+                (f"category options ({label})",
+                 lambda uid=uid, month=month: db_ops.fetch_user_categories(uid, selected_year, month)),
+                (f"transactions page ({label})",
+                 lambda uid=uid, month=month: db_ops.fetch_expense_page(uid, selected_year, month)),
+                (f"expense facts ({label})",
+                 lambda uid=uid, month=month: db_ops.fetch_expense_facts(uid, selected_year, month)),
+                (f"categories ({label})",
+                 lambda uid=uid, month=month: db_ops.fetch_categories(uid, selected_year, month)),
+                (f"payment modes ({label})",
+                 lambda uid=uid, month=month: db_ops.fetch_payment_mode_counts(uid, selected_year, month)),
+            ])
+    return shapes
+
+
+def benchmark_dashboard_queries(selected_year="2024", repeats=5):
+    """
+    Return {query name: median seconds} for the dashboard query shapes. Every run goes to the database:
+    the result cache is disabled and the Parquet snapshot ignored, and which optional tables exist (the
+    rollup, for one) is looked up afresh, so a run after migrating in the same process sees the new schema.
+    """
+    forget_schema_checks()
+    db_ops = DatabaseOperations()
+    db_ops.cache = ResultCache(max_bytes=0)  # Stores nothing, so every lookup misses
+    db_ops.snapshot_path = None
+    users = db_ops.fetch_users()
+    user_id = next(iter(users.values()), 1)
+
+    timings = {}
+    for name, run in dashboard_query_shapes(db_ops, user_id, selected_year):
+        run()  # Warm-up (connection, prepared statement, buffer pool)
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            run()
+            samples.append(time.perf_counter() - start)
+        timings[name] = statistics.median(samples)
+        print(f"  {name:<45} {timings[name] * 1000:10.1f} ms")
+    return timings
+
+
+def compare_indexes(selected_year="2024", repeats=5):
+    """
+    Time the dashboard queries without the indexes the migrations add to `expenses`, then with them
+    (dropped and rebuilt through parallel_loader.deferred_indexes), and return (before, after).
+    Works on either backend, so the index gains can be measured without migrating a MySQL database.
+    """
+    with deferred_indexes(DatabaseOperations()) as dropped:
+        print(f"Without {', '.join(dropped) or 'no indexes'}:")
+        before = benchmark_dashboard_queries(selected_year, repeats)
+    print("With the migration indexes:")
+    after = benchmark_dashboard_queries(selected_year, repeats)
+    return before, after
+
+
+def print_comparison(before, after):
+    """Print before/after medians side by side."""
+    print(f"\n{'query':<45} {'before':>10} {'after':>10} {'speedup':>8}")
+    for name, before_seconds in before.items():
+        after_seconds = after.get(name)
+        if after_seconds is None:
+            continue
+        speedup = before_seconds / after_seconds if after_seconds else float('inf')
+        print(f"{name:<45} {before_seconds * 1000:8.1f}ms {after_seconds * 1000:8.1f}ms {speedup:7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the dashboard's filtered queries.")
+    parser.add_argument("--year", default="2024", help="Year to filter on.")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per query (median is reported).")
+    parser.add_argument("--compare-indexes", action="store_true",
+                        help="Time the queries without, then with, the indexes the migrations add to expenses.")
+    args = parser.parse_args()
+    if args.compare_indexes:
+        print_comparison(*compare_indexes(args.year, args.repeats))
+    else:
+        benchmark_dashboard_queries(args.year, args.repeats)
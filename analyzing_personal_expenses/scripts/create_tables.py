@@ -1,7 +1,15 @@
+import argparse
 import mysql.connector
+import sys
 import os
 from dotenv import load_dotenv
 
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.database.schema import CREATE_TABLES_SQL
+from backend.database.partitions import enable_partitioning, PARTITION_SCHEMES
+from migrate import migrate
+
 # Load environment variables from .env to manage database credentials securely
 load_dotenv()
 
@@ -19,91 +27,33 @@ db_config = {
 def get_db_connection():
     return mysql.connector.connect(**db_config)
 
-# SQL script to create tables for the expense tracker application
-create_tables_sql = """
--- Drop Existing Tables (if any)
--- These tables are dropped to start fresh in case they already exist
-DROP TABLE IF EXISTS expenses;
-DROP TABLE IF EXISTS subcategories;
-DROP TABLE IF EXISTS categories;
-DROP TABLE IF EXISTS payment_modes;
-DROP TABLE IF EXISTS users;
-
-CREATE TABLE users (
-    user_id INT PRIMARY KEY AUTO_INCREMENT,   -- Unique identifier for each user
-    user_name VARCHAR(100) NOT NULL,          -- User's name
-    user_email VARCHAR(100) NOT NULL,         -- User's email
-    password VARCHAR(255) NOT NULL,           -- User's password (hashed)
-    role ENUM('admin', 'user') NOT NULL,      -- User's role (admin or user)
-    creation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP, -- Record creation timestamp
-    updation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP -- Record last update timestamp
-);
-
--- Categories Table: Stores categories for different expense types
-CREATE TABLE categories (
-    category_id INT AUTO_INCREMENT PRIMARY KEY,         -- Auto-incremented category ID
-    category_name VARCHAR(100) NOT NULL UNIQUE,          -- Category name (e.g., 'Food', 'Transport')
-    creation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,   -- Date of creation
-    updation_date TIMESTAMP DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP  -- Date of last update
-) AUTO_INCREMENT = 100;  -- Starts category IDs from 100
-
--- Subcategories Table: Stores subcategories for each category
-CREATE TABLE subcategories (
-    subcategory_id INT AUTO_INCREMENT PRIMARY KEY,       -- Auto-incremented subcategory ID
-    category_id INT NOT NULL,                            -- Foreign key referencing category_id
-    subcategory_name VARCHAR(100) NOT NULL,              -- Subcategory name
-    creation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,   -- Date of creation
-    updation_date TIMESTAMP DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP,  -- Date of last update
-    FOREIGN KEY (category_id) REFERENCES categories(category_id) ON DELETE CASCADE ON UPDATE CASCADE  -- Foreign key constraint for category_id
-) AUTO_INCREMENT = 1000;  -- Starts subcategory IDs from 1000
-
--- Payment Modes Table: Stores different payment methods used for expenses
-CREATE TABLE payment_modes (
-    payment_mode_id INT AUTO_INCREMENT PRIMARY KEY,      -- Auto-incremented payment mode ID
-    payment_mode_name VARCHAR(50) NOT NULL UNIQUE,       -- Payment method name (e.g., 'UPI', 'Credit Card')
-    creation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,   -- Date of creation
-    updation_date TIMESTAMP DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP  -- Date of last update
-);
-
--- Expenses Table: Stores records of individual expenses made by users
--- Amount_paid can be NULL to allow for blank/invalid data
--- User_id can be NULL to allow for expenses without a user
--- on DELETE SET NULL is used to set user_id to NULL when a user is deleted
--- Subcategory_id can be NULL to allow for expenses without a subcategory
--- Expenses Table: Stores records of individual expenses made by users
-CREATE TABLE expenses (
-    expense_id INT AUTO_INCREMENT PRIMARY KEY,           -- Auto-incremented expense ID
-    user_id INT NULL,                                     -- Can be NULL
-    category_id INT NOT NULL,                             -- Cannot be NULL
-    subcategory_id INT NULL,                              -- Can be NULL
-    amount_paid DECIMAL(10,2) NULL,                       -- Can be NULL
-    expense_date DATE NOT NULL,                           -- Cannot be NULL
-    payment_mode_id INT NOT NULL,                         -- Cannot be NULL
-    creation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,    -- Date of creation
-    updation_date TIMESTAMP DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP,  -- Date of last update
-    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE SET NULL ON UPDATE CASCADE,
-    FOREIGN KEY (category_id) REFERENCES categories(category_id) ON DELETE CASCADE ON UPDATE CASCADE,
-    FOREIGN KEY (subcategory_id) REFERENCES subcategories(subcategory_id) ON DELETE SET NULL ON UPDATE CASCADE,
-    FOREIGN KEY (payment_mode_id) REFERENCES payment_modes(payment_mode_id) ON DELETE CASCADE ON UPDATE CASCADE
-) AUTO_INCREMENT = 10000;
-"""
-
 
 # Function to create the tables in the database
 # This function will execute the SQL commands to create the necessary tables
-def create_tables():
+# With partition_by ('year' or 'month'), the migrations are applied and expenses is then RANGE-partitioned by
+# expense_date (backend/database/partitions.py)
+def create_tables(partition_by=None):
     conn = get_db_connection()  # Get a connection to the database
     cursor = conn.cursor()      # Create a cursor object to execute SQL commands
 
     try:
         # Execute each SQL command individually to avoid "Commands out of sync" error
-        for sql in create_tables_sql.split(';'):  # Split the SQL script by semicolons
+        for sql in CREATE_TABLES_SQL.split(';'):  # Split the SQL script by semicolons
             if sql.strip():  # Ensure the SQL command is not empty
                 cursor.execute(sql.strip())  # Execute the SQL command
-        
+
         # Commit the changes to the database
         conn.commit()
-        print("✅ Tables created successfully!")
+
+        if partition_by:
+            # Migrations add unique keys without expense_date, which a partitioned table rejects, so they
+            # run first; the table is still empty, so partitioning it afterwards is instant
+            migrate()
+            enable_partitioning(cursor, partition_by)
+            conn.commit()
+            print(f"✅ Tables created, migrated and partitioned by {partition_by}!")
+        else:
+            print("✅ Tables created successfully! Run scripts/migrate.py to add the indexes, rollup and triggers.")
     
     except mysql.connector.Error as err:  # Handle any errors that occur during the execution
         print(f"Error: {err}")  # Print the error message
@@ -116,4 +66,17 @@ def create_tables():
 # Main entry point of the script
 # This is where the table creation process is triggered
 if __name__ == "__main__":
-    create_tables()  # Call the function to create tables
+    parser = argparse.ArgumentParser(description="Drop and recreate the expense tracker tables.")
+    parser.add_argument("--partition-by", choices=PARTITION_SCHEMES, default=None,
+                        help="MySQL only: RANGE-partition expenses by the year or month of expense_date.")
+    args = parser.parse_args()
+
+    if os.getenv('DB_BACKEND', 'mysql').lower() == 'sqlite':
+        # Embedded backend: the same schema, translated for SQLite, in the file at DB_SQLITE_PATH
+        from backend.database.sqlite_backend import create_schema
+        if args.partition_by:
+            print("⚠️ SQLite has no table partitioning; creating an unpartitioned expenses table.")
+        create_schema(os.getenv('DB_SQLITE_PATH', 'expenses.sqlite3'))
+        print("✅ Tables created successfully!")
+    else:
+        create_tables(args.partition_by)  # Call the function to create tables
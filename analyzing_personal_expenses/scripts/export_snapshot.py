@@ -0,0 +1,30 @@
+import argparse
+import sys
+import os
+from dotenv import load_dotenv
+
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.database.db_operations import DatabaseOperations
+from backend.database.parquet_snapshot import write_snapshot
+
+# Load environment variables
+load_dotenv()
+
+
+def export_snapshot(path, year=None, chunk_size=None):
+    """Write (or refresh one year of) the partitioned Parquet snapshot of expenses."""
+    db_ops = DatabaseOperations()
+    db_ops.snapshot_path = None  # Always read from the database, never from the snapshot being replaced
+    rows = write_snapshot(db_ops, path, year, chunk_size)
+    print(f"✅ Snapshot written to {path} for {year or 'all years'}: {rows} expenses.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export expenses to a Parquet snapshot partitioned by year and month.")
+    parser.add_argument("--path", default=os.getenv('DB_SNAPSHOT_PATH', 'expense_snapshot'),
+                        help="Snapshot directory (default: DB_SNAPSHOT_PATH or ./expense_snapshot).")
+    parser.add_argument("--year", type=int, default=None, help="Only refresh this year (default: all years).")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Rows streamed from the database per batch.")
+    args = parser.parse_args()
+    export_snapshot(args.path, args.year, args.chunk_size)
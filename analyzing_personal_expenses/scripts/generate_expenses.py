@@ -0,0 +1,63 @@
+import argparse
+import itertools
+import sys
+import os
+import time
+from dotenv import load_dotenv
+
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.database.db_operations import DatabaseOperations
+from backend.database.bulk_loader import (BulkExpenseLoader, load_expense_lookups, BULK_BATCH_SIZE,
+                                          BULK_TRANSACTION_ROWS, LOAD_METHODS)
+from backend.synthetic_expenses import (SyntheticExpenseGenerator, expense_rows, write_csv,
+                                        DEFAULT_GENERATOR_CHUNK_SIZE)
+
+# Load environment variables
+load_dotenv()
+
+
+def generate_expenses(rows, seed=0, null_rate=0.0, chunk_size=DEFAULT_GENERATOR_CHUNK_SIZE, csv_path=None,
+                      batch_size=BULK_BATCH_SIZE, transaction_rows=BULK_TRANSACTION_ROWS, method='executemany'):
+    """
+    Generate `rows` random expenses over the users, categories and payment modes in the database,
+    and write them to `csv_path` or, without one, load them into `expenses` through the bulk loader.
+    """
+    db_ops = DatabaseOperations()
+    generator = SyntheticExpenseGenerator(load_expense_lookups(db_ops), seed=seed, null_rate=null_rate)
+    chunks = generator.chunks(rows, chunk_size)
+
+    if csv_path:
+        started = time.perf_counter()
+        written = write_csv(chunks, csv_path)
+        seconds = time.perf_counter() - started
+        print(f"✅ {written:,} expenses written to {csv_path} in {seconds:.2f}s "
+              f"({written / seconds if seconds else 0:,.0f} rows/s).")
+        return
+
+    def report(stats):
+        print(f"   {stats['rows']:,} / {rows:,} rows committed ({stats['rows_per_second']:,.0f} rows/s)")
+
+    loader = BulkExpenseLoader(db_ops, batch_size=batch_size, transaction_rows=transaction_rows, method=method)
+    stats = loader.load(itertools.chain.from_iterable(expense_rows(chunk) for chunk in chunks), progress=report)
+    already = f" ({stats['duplicates']:,} already present)" if stats['duplicates'] else ""
+    print(f"✅ {stats['rows']:,} generated expenses loaded{already} in {stats['seconds']:.2f}s: "
+          f"{stats['rows_per_second']:,.0f} rows/s, {stats['batches']} batches, {stats['commits']} commits.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a large, reproducible synthetic expense dataset.")
+    parser.add_argument("--rows", type=int, default=1000000, help="Number of expenses (default: 1,000,000).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed gives the same rows.")
+    parser.add_argument("--null-rate", type=float, default=0.0,
+                        help="Probability that user_id, subcategory_id and amount_paid are each null.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_GENERATOR_CHUNK_SIZE,
+                        help=f"Rows generated at a time (default: {DEFAULT_GENERATOR_CHUNK_SIZE}).")
+    parser.add_argument("--csv", default=None, help="Write to this CSV file instead of the database.")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE, help="Rows per INSERT / LOAD DATA file.")
+    parser.add_argument("--transaction-rows", type=int, default=BULK_TRANSACTION_ROWS, help="Rows per transaction.")
+    parser.add_argument("--method", choices=LOAD_METHODS, default='executemany',
+                        help="Batched INSERTs, or LOAD DATA LOCAL INFILE (needs local_infile=1 on the server).")
+    args = parser.parse_args()
+    generate_expenses(args.rows, args.seed, args.null_rate, args.chunk_size, args.csv,
+                      args.batch_size, args.transaction_rows, args.method)
@@ -0,0 +1,74 @@
+import argparse
+import sys
+import os
+from dotenv import load_dotenv
+
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.database.db_operations import DatabaseOperations
+from backend.database.bulk_loader import BULK_BATCH_SIZE, BULK_TRANSACTION_ROWS, DUPLICATE_MODES
+from backend.statement_import import StatementImporter, DEFAULT_STATEMENT_COLUMNS
+
+# Load environment variables
+load_dotenv()
+
+
+def import_statements(paths, user=None, columns=None, date_format=None, debits_negative=False, rejects_dir=None,
+                      batch_size=BULK_BATCH_SIZE, transaction_rows=BULK_TRANSACTION_ROWS, on_duplicate='skip'):
+    """Stream each statement CSV in `paths` into expenses and print what was loaded and rejected."""
+    importer = StatementImporter(DatabaseOperations(), columns=columns, default_user=user, date_format=date_format,
+                                 debits_negative=debits_negative, batch_size=batch_size,
+                                 transaction_rows=transaction_rows, on_duplicate=on_duplicate)
+    totals = {'rows_loaded': 0, 'rows_rejected': 0, 'seconds': 0.0}
+    for path in paths:
+        rejects_path = None
+        if rejects_dir:
+            os.makedirs(rejects_dir, exist_ok=True)
+            rejects_path = os.path.join(rejects_dir, os.path.splitext(os.path.basename(path))[0] + '.rejects.csv')
+
+        def report(progress):
+            print(f"   {progress['rows_loaded']:,} rows loaded, {progress['rows_rejected']:,} rejected "
+                  f"({progress['rows_per_second']:,.0f} rows/s)")
+
+        stats = importer.import_file(path, rejects_path, progress=report)
+        reasons = ", ".join(f"{count:,} {reason}" for reason, count in sorted(stats['rejected_by_reason'].items()))
+        already = f", {stats['duplicates']:,} already imported" if stats['duplicates'] is not None else ""
+        print(f"✅ {path}: {stats['rows_loaded']:,} expenses loaded{already}, {stats['rows_rejected']:,} rejected"
+              f"{f' ({reasons})' if reasons else ''} in {stats['seconds']:.2f}s, "
+              f"{stats['rows_per_second']:,.0f} rows/s.")
+        for key in totals:
+            totals[key] += stats[key]
+
+    if len(paths) > 1:
+        rows = totals['rows_loaded'] + totals['rows_rejected']
+        rate = rows / totals['seconds'] if totals['seconds'] else 0
+        print(f"✅ {len(paths)} files: {totals['rows_loaded']:,} expenses loaded, "
+              f"{totals['rows_rejected']:,} rejected, {rate:,.0f} rows/s.")
+
+
+def parse_column(text):
+    field, _, header = text.partition('=')
+    if field not in DEFAULT_STATEMENT_COLUMNS or not header:
+        raise argparse.ArgumentTypeError(
+            f"expected FIELD=Header with FIELD one of {', '.join(DEFAULT_STATEMENT_COLUMNS)}")
+    return field, header
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import bank or card statement CSV files into expenses.")
+    parser.add_argument("paths", nargs='+', help="Statement CSV files.")
+    parser.add_argument("--user", default=None, help="User name or id for rows without a user column.")
+    parser.add_argument("--column", type=parse_column, action='append', default=[],
+                        help="Header of a field in these files, e.g. --column date='Txn Date' "
+                             f"(defaults: {', '.join(f'{k}={v}' for k, v in DEFAULT_STATEMENT_COLUMNS.items())}).")
+    parser.add_argument("--date-format", default=None, help="strptime format of the dates, e.g. %%d/%%m/%%Y.")
+    parser.add_argument("--debits-negative", action="store_true",
+                        help="Spending is written as negative amounts; positive rows (credits) are skipped.")
+    parser.add_argument("--rejects-dir", default=None, help="Write each file's rejected rows, with reasons, here.")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE, help="Rows per INSERT.")
+    parser.add_argument("--transaction-rows", type=int, default=BULK_TRANSACTION_ROWS, help="Rows per transaction.")
+    parser.add_argument("--on-duplicate", choices=DUPLICATE_MODES, default='skip',
+                        help="For rows imported before: leave the stored expense, or update it.")
+    args = parser.parse_args()
+    import_statements(args.paths, args.user, dict(args.column), args.date_format, args.debits_negative,
+                      args.rejects_dir, args.batch_size, args.transaction_rows, args.on_duplicate)
@@ -0,0 +1,115 @@
+import argparse
+import mysql.connector
+import sys
+import os
+from dotenv import load_dotenv
+
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.database.schema import CREATE_SCHEMA_MIGRATIONS_SQL, MIGRATIONS
+
+# Load environment variables from .env to manage database credentials securely
+load_dotenv()
+
+# Database Configuration using environment variables
+db_config = {
+    'host': os.getenv('DB_HOST'),
+    'user': os.getenv('DB_USER'),
+    'password': os.getenv('DB_PASSWORD'),
+    'database': os.getenv('DB_NAME')
+}
+
+# MySQL errors raised when an index or column with the same name already exists
+ER_DUP_KEYNAME = 1061
+ER_DUP_FIELDNAME = 1060
+
+
+def get_db_connection():
+    return mysql.connector.connect(**db_config)
+
+
+def applied_versions(cursor):
+    """Return the set of migration versions already applied."""
+    cursor.execute(CREATE_SCHEMA_MIGRATIONS_SQL)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def apply_migration(cursor, migration):
+    """Run one migration's statements, tolerating indexes and columns that were already created by hand."""
+    for sql in migration['statements']:
+        try:
+            cursor.execute(sql)
+        except mysql.connector.Error as err:
+            if err.errno in (ER_DUP_KEYNAME, ER_DUP_FIELDNAME):
+                print(f"  Index or column already exists, skipping: {err.msg}")
+            else:
+                raise
+    cursor.execute(
+        "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+        (migration['version'], migration['description'])
+    )
+
+
+def migrate(target_version=None):
+    """Apply all pending migrations (up to `target_version` if given)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        done = applied_versions(cursor)
+        pending = [m for m in MIGRATIONS
+                   if m['version'] not in done and (target_version is None or m['version'] <= target_version)]
+
+        if not pending:
+            print("✅ Schema is up to date.")
+            return
+
+        for migration in pending:
+            print(f"🚀 Applying migration {migration['version']}: {migration['description']}")
+            apply_migration(cursor, migration)
+            conn.commit()
+        print(f"✅ Applied {len(pending)} migration(s).")
+
+    except mysql.connector.Error as err:
+        print(f"❌ Migration failed: {err}")
+        conn.rollback()
+        raise
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def show_status():
+    """Print applied and pending migrations."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        done = applied_versions(cursor)
+        for migration in MIGRATIONS:
+            state = "applied" if migration['version'] in done else "pending"
+            print(f"{migration['version']:>4}  {state:<8} {migration['description']}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations without dropping data.")
+    parser.add_argument("--status", action="store_true", help="List applied and pending migrations.")
+    parser.add_argument("--target", type=int, default=None, help="Only apply migrations up to this version.")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Time the dashboard queries before and after applying migrations.")
+    args = parser.parse_args()
+
+    if args.status:
+        show_status()
+    elif args.benchmark:
+        from benchmark_queries import benchmark_dashboard_queries, print_comparison
+        before = benchmark_dashboard_queries()
+        migrate(args.target)
+        after = benchmark_dashboard_queries()
+        print_comparison(before, after)
+    else:
+        migrate(args.target)
@@ -0,0 +1,96 @@
+import argparse
+import datetime
+import mysql.connector
+import sys
+import os
+from dotenv import load_dotenv
+
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.database.db_operations import DatabaseOperations
+from backend.database.partitions import (enable_partitioning, add_future_partitions, drop_partitions,
+                                         fetch_partitions, check_pruning, PARTITION_SCHEMES, PARTITIONS_AHEAD)
+
+# Load environment variables from .env to manage database credentials securely
+load_dotenv()
+
+# Database Configuration using environment variables
+db_config = {
+    'host': os.getenv('DB_HOST'),
+    'user': os.getenv('DB_USER'),
+    'password': os.getenv('DB_PASSWORD'),
+    'database': os.getenv('DB_NAME')
+}
+
+
+def get_db_connection():
+    return mysql.connector.connect(**db_config)
+
+
+def run(action, *args, **kwargs):
+    """Run one partition maintenance function on a cursor of its own; return what it returns."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        result = action(cursor, *args, **kwargs)
+        conn.commit()
+        return result
+    except mysql.connector.Error as err:
+        print(f"❌ Partition maintenance failed: {err}")
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def show_partitions():
+    """Print each partition of expenses with its upper bound and estimated row count."""
+    partitions = run(fetch_partitions)
+    if not partitions:
+        print("expenses is not partitioned (run with --enable).")
+    for name, bound, rows in partitions:
+        print(f"{name:<10} < {bound or 'MAXVALUE'!s:<12} ~{rows or 0:,} rows")
+
+
+def show_pruning(year, month=None):
+    """EXPLAIN the dashboard queries for one year or month and print the partitions each reads."""
+    db_ops = DatabaseOperations('mysql', db_config=db_config)
+    results = check_pruning(db_ops, year, month)
+    for result in results:
+        mark = "✅" if result['pruned'] else "❌"
+        print(f"{mark} {result['method']:<28} reads {', '.join(result['partitions']) or '-'} "
+              f"(expected {', '.join(result['expected'])})")
+    return all(result['pruned'] for result in results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the RANGE partitions of the expenses table by expense date.")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--enable", choices=PARTITION_SCHEMES,
+                        help="Partition an existing expenses table by year or month (copies the table once).")
+    action.add_argument("--add-future", action="store_true",
+                        help=f"Add partitions up to --ahead periods after today (default {PARTITIONS_AHEAD}).")
+    action.add_argument("--drop-before", type=datetime.date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="Remove the partitions whose dates all fall before this date.")
+    action.add_argument("--check", type=int, metavar="YEAR",
+                        help="Check that the dashboard queries for this year (or --month) read only its partitions.")
+    parser.add_argument("--ahead", type=int, default=PARTITIONS_AHEAD, help="Future periods to keep partitions for.")
+    parser.add_argument("--archive", action="store_true",
+                        help="With --drop-before: keep each partition's rows in an expenses_archive_<partition> table.")
+    parser.add_argument("--month", default=None, help="With --check: a month name or number.")
+    args = parser.parse_args()
+
+    if args.enable:
+        names = run(enable_partitioning, args.enable, args.ahead)
+        print(f"✅ expenses partitioned by {args.enable}: {names[0]} to {names[-1]} and a catch-all partition.")
+    elif args.add_future:
+        names = run(add_future_partitions, ahead=args.ahead)
+        print(f"✅ Added partitions: {', '.join(names)}." if names else "✅ Future partitions already exist.")
+    elif args.drop_before:
+        names = run(drop_partitions, args.drop_before, archive=args.archive)
+        print(f"✅ {'Archived' if args.archive else 'Dropped'} partitions: {', '.join(names) or 'none'}.")
+    elif args.check:
+        sys.exit(0 if show_pruning(args.check, args.month) else 1)
+    else:
+        show_partitions()
@@ -1,4 +1,6 @@
+import argparse
 import os
+import sys
 from dotenv import load_dotenv
 import mysql.connector
 from faker import Faker
@@ -6,6 +8,12 @@ from populate_expenses import populate_expenses
 from static_data import CATEGORIES, PAYMENT_MODES, CATEGORY_DESCRIPTIONS
 from populate_users import populate_users  # Moved populate_users here
 
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.database.db_operations import DatabaseOperations
+from backend.database.bulk_loader import BULK_BATCH_SIZE, BULK_TRANSACTION_ROWS
+from backend.database.parallel_loader import load_parallel, DEFAULT_LOAD_WORKERS, SPLIT_MODES
+
 # Load environment variables from .env
 load_dotenv()
 
@@ -67,13 +75,42 @@ def populate_payment_modes():
     cursor.close()
     conn.close()
 
-def main():
+def populate_expenses_parallel(n, workers, split='user', seed=None, batch_size=BULK_BATCH_SIZE,
+                               transaction_rows=BULK_TRANSACTION_ROWS, defer_indexes=False):
+    """Load `n` generated expenses with `workers` processes, each on its own connection."""
+    def report(progress):
+        print(f"   {progress['rows']:,} / {progress['total']:,} rows committed "
+              f"({progress['rows_per_second']:,.0f} rows/s, {progress['workers_done']}/{progress['workers']} workers done)")
+
+    stats = load_parallel(DatabaseOperations(), n, workers=workers, split=split, seed=seed, batch_size=batch_size,
+                          transaction_rows=transaction_rows, defer_indexes=defer_indexes, progress=report)
+    print(f"✅ {stats['rows']:,} expenses added by {stats['workers']} workers in {stats['seconds']:.2f}s: "
+          f"{stats['rows_per_second']:,.0f} rows/s.")
+
+def main(expenses=50, workers=1, split='user', seed=None, batch_size=BULK_BATCH_SIZE,
+         transaction_rows=BULK_TRANSACTION_ROWS, defer_indexes=False):
     print("🚀 Starting Database Population...")
     populate_users(get_db_connection)
     populate_categories_and_subcategories()
     populate_payment_modes()
-    populate_expenses(50)
+    if workers > 1 or defer_indexes:
+        populate_expenses_parallel(expenses, workers, split, seed, batch_size, transaction_rows, defer_indexes)
+    else:
+        populate_expenses(expenses, batch_size, transaction_rows, seed=seed)
     print("🎯 All tables populated successfully!")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Populate users, categories, payment modes and expenses.")
+    parser.add_argument("--expenses", type=int, default=50, help="Number of expenses to generate (default: 50).")
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"Loader processes, each with its own connection (this machine: {DEFAULT_LOAD_WORKERS}).")
+    parser.add_argument("--split", choices=SPLIT_MODES, default='user',
+                        help="Give each worker its own users, or its own date range.")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed, for a reproducible dataset.")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE, help="Rows per INSERT.")
+    parser.add_argument("--transaction-rows", type=int, default=BULK_TRANSACTION_ROWS, help="Rows per transaction.")
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="Drop the secondary expense indexes during the load and rebuild them after it.")
+    args = parser.parse_args()
+    main(args.expenses, args.workers, args.split, args.seed, args.batch_size, args.transaction_rows,
+         args.defer_indexes)
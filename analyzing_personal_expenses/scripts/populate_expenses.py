@@ -1,73 +1,50 @@
-import mysql.connector
-import random
-from faker import Faker
+import argparse
+import itertools
+import sys
 import os
 from dotenv import load_dotenv
-import datetime  # Import datetime module
+
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.database.db_operations import DatabaseOperations
+from backend.database.bulk_loader import (BulkExpenseLoader, load_expense_lookups, BULK_BATCH_SIZE,
+                                          BULK_TRANSACTION_ROWS, LOAD_METHODS)
+from backend.synthetic_expenses import SyntheticExpenseGenerator, expense_rows
 
 # Load environment variables
 load_dotenv()
 
-# Database Configuration
-db_config = {
-    'host': os.getenv('DB_HOST'),
-    'user': os.getenv('DB_USER'),
-    'password': os.getenv('DB_PASSWORD'),
-    'database': os.getenv('DB_NAME')
-}
-
-fake = Faker()
-
-def get_db_connection():
-    """Establish database connection."""
-    return mysql.connector.connect(**db_config)
 
 # Populate Expenses Table without NULL values
-def populate_expenses(n=50):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Fetch required data
-    cursor.execute("SELECT category_id FROM categories")
-    category_ids = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute("SELECT payment_mode_id FROM payment_modes")
-    payment_mode_ids = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute("SELECT user_id FROM users")
-    user_ids = [row[0] for row in cursor.fetchall()]
+def populate_expenses(n=50, batch_size=BULK_BATCH_SIZE, transaction_rows=BULK_TRANSACTION_ROWS,
+                      method='executemany', seed=None):
+    db_ops = DatabaseOperations()
+    lookups = load_expense_lookups(db_ops)
+    if not (lookups['user_ids'] and lookups['category_ids'] and lookups['payment_mode_ids']):
+        print("❌ Populate users, categories and payment modes before expenses.")
+        return
+    # Valid subcategories for each category come from the map loaded once
+    chunks = SyntheticExpenseGenerator(lookups, seed=seed).chunks(n)
+
+    def report(stats):
+        print(f"   {stats['rows']:,} rows committed ({stats['rows_per_second']:,.0f} rows/s)")
+
+    loader = BulkExpenseLoader(db_ops, batch_size=batch_size, transaction_rows=transaction_rows, method=method)
+    stats = loader.load(itertools.chain.from_iterable(expense_rows(chunk) for chunk in chunks), progress=report)
+    already = f" ({stats['duplicates']:,} already present)" if stats['duplicates'] else ""
+    print(f"✅ {stats['rows']:,} expenses (all fields populated) loaded{already} in {stats['seconds']:.2f}s: "
+          f"{stats['rows_per_second']:,.0f} rows/s, {stats['batches']} batches, {stats['commits']} commits.")
 
-    for i in range(n):
-        user_id = random.choice(user_ids)
-        category_id = random.choice(category_ids)
-        payment_mode_id = random.choice(payment_mode_ids)
-        
-        # Fetch valid subcategory_id for the selected category
-        cursor.execute("SELECT subcategory_id FROM subcategories WHERE category_id = %s", (category_id,))
-        subcategory_ids = [row[0] for row in cursor.fetchall()]
-        subcategory_id = random.choice(subcategory_ids) if subcategory_ids else None
-        
-        amount_paid = round(random.uniform(10.0, 500.0), 2)
-        
-        # Create random creation_date between 2020 and 2025
-        start_date = datetime.date(2020, 1, 1)  # Start date: January 1, 2020
-        end_date = datetime.date(2025, 12, 31)  # End date: December 31, 2025
-        creation_date = fake.date_between(start_date=start_date, end_date=end_date)
-        
-        try:
-            cursor.execute(
-                """INSERT INTO expenses 
-                (user_id, category_id, subcategory_id, amount_paid, expense_date, payment_mode_id, creation_date)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                (user_id, category_id, subcategory_id, amount_paid, creation_date, payment_mode_id, creation_date)
-            )
-        except mysql.connector.Error as err:
-            print(f"❌ Error inserting record {i+1}: {err}")
-    
-    conn.commit()
-    cursor.close()
-    conn.close()
-    print(f"✅ {n} expenses (all fields populated) added successfully!")
 
 if __name__ == "__main__":
-    populate_expenses(50)
+    parser = argparse.ArgumentParser(description="Add random expenses through the bulk loader.")
+    parser.add_argument("--rows", type=int, default=50, help="Number of expenses to add (default: 50).")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE,
+                        help=f"Rows per INSERT / LOAD DATA file (default: DB_BULK_BATCH_SIZE or {BULK_BATCH_SIZE}).")
+    parser.add_argument("--transaction-rows", type=int, default=BULK_TRANSACTION_ROWS,
+                        help=f"Rows per transaction (default: DB_BULK_TRANSACTION_ROWS or {BULK_TRANSACTION_ROWS}).")
+    parser.add_argument("--method", choices=LOAD_METHODS, default='executemany',
+                        help="Batched INSERTs, or LOAD DATA LOCAL INFILE (needs local_infile=1 on the server).")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed, for a reproducible set of expenses.")
+    args = parser.parse_args()
+    populate_expenses(args.rows, args.batch_size, args.transaction_rows, args.method, args.seed)
@@ -1,67 +1,36 @@
-import mysql.connector
-import random
-from faker import Faker
+import itertools
+import sys
 import os
 from dotenv import load_dotenv
 
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.database.db_operations import DatabaseOperations
+from backend.database.bulk_loader import BulkExpenseLoader, load_expense_lookups, EXPENSE_LOAD_COLUMNS
+from backend.synthetic_expenses import SyntheticExpenseGenerator, expense_rows
+
 # Load environment variables
 load_dotenv()
 
-# Database Configuration
-db_config = {
-    'host': os.getenv('DB_HOST'),
-    'user': os.getenv('DB_USER'),
-    'password': os.getenv('DB_PASSWORD'),
-    'database': os.getenv('DB_NAME')
-}
-
-fake = Faker()
+# Share of user_id, subcategory_id and amount_paid values left NULL
+BLANK_RATE = 0.3
 
-def get_db_connection():
-    """Establish database connection."""
-    return mysql.connector.connect(**db_config)
 
 # Populate Expenses Table with selective NULL values
 def populate_expenses_with_blanks(n=50):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Fetch required data
-    cursor.execute("SELECT category_id FROM categories")
-    category_ids = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute("SELECT payment_mode_id FROM payment_modes")
-    payment_mode_ids = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute("SELECT user_id FROM users")
-    user_ids = [row[0] for row in cursor.fetchall()]
+    db_ops = DatabaseOperations()
+    lookups = load_expense_lookups(db_ops)
+    if not (lookups['user_ids'] and lookups['category_ids'] and lookups['payment_mode_ids']):
+        print("❌ Populate users, categories and payment modes before expenses.")
+        return
+
+    # creation_date is left to its default (now)
+    columns = [column for column in EXPENSE_LOAD_COLUMNS if column != 'creation_date']
+    chunks = SyntheticExpenseGenerator(lookups, null_rate=BLANK_RATE).chunks(n)
+    stats = BulkExpenseLoader(db_ops, columns=columns).load(
+        itertools.chain.from_iterable(expense_rows(chunk[columns]) for chunk in chunks))
+    print(f"✅ {stats['rows']} expenses (with blanks in user_id, subcategory_id, and amount_paid) added successfully!")
 
-    for i in range(n):
-        # Randomize NULL values for specific fields
-        user_id = random.choice(user_ids) if random.random() > 0.3 else None
-        subcategory_id = random.choice([None, random.randint(1000, 1010)]) if random.random() > 0.3 else None
-        amount_paid = round(random.uniform(10.0, 500.0), 2) if random.random() > 0.3 else None
-        
-        # Ensure mandatory fields are always populated
-        category_id = random.choice(category_ids)
-        payment_mode_id = random.choice(payment_mode_ids)
-        # Use years fake date range 2020-2026
-        expense_date = fake.date_between(start_date='-5y', end_date='now')
-        
-        try:
-            cursor.execute(
-                """INSERT INTO expenses 
-                (user_id, category_id, subcategory_id, amount_paid, expense_date, payment_mode_id)
-                VALUES (%s, %s, %s, %s, %s, %s)""",
-                (user_id, category_id, subcategory_id, amount_paid, expense_date, payment_mode_id)
-            )
-        except mysql.connector.Error as err:
-            print(f"❌ Error inserting record {i+1}: {err}")
-    
-    conn.commit()
-    cursor.close()
-    conn.close()
-    print(f"✅ {n} expenses (with blanks in user_id, subcategory_id, and amount_paid) added successfully!")
 
 if __name__ == "__main__":
     populate_expenses_with_blanks(50)
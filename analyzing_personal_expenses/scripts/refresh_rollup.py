@@ -0,0 +1,69 @@
+import argparse
+import datetime
+import mysql.connector
+import sys
+import os
+from dotenv import load_dotenv
+
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.database.queries import REBUILD_EXPENSE_ROLLUP_QUERY, REBUILD_EXPENSE_ROLLUP_GROUP_BY
+
+# Load environment variables
+load_dotenv()
+
+# Database Configuration
+db_config = {
+    'host': os.getenv('DB_HOST'),
+    'user': os.getenv('DB_USER'),
+    'password': os.getenv('DB_PASSWORD'),
+    'database': os.getenv('DB_NAME')
+}
+
+
+def get_db_connection():
+    """Establish database connection."""
+    return mysql.connector.connect(**db_config)
+
+
+def refresh_rollup(year=None):
+    """
+    Recompute expense_monthly_rollup from expenses, for one year or for all history.
+    Triggers keep the rollup current for normal writes; this repairs it after changes that
+    bypass triggers (FK cascades, bulk loads with triggers disabled, manual fixes).
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        if year is None:
+            cursor.execute("DELETE FROM expense_monthly_rollup")
+            cursor.execute(REBUILD_EXPENSE_ROLLUP_QUERY + REBUILD_EXPENSE_ROLLUP_GROUP_BY)
+        else:
+            year = int(year)
+            cursor.execute("DELETE FROM expense_monthly_rollup WHERE expense_year = %s", (year,))
+            cursor.execute(
+                REBUILD_EXPENSE_ROLLUP_QUERY
+                + " AND e.expense_date >= %s AND e.expense_date < %s"
+                + REBUILD_EXPENSE_ROLLUP_GROUP_BY,
+                (datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1))
+            )
+        rows = cursor.rowcount
+        conn.commit()  # Delete and rebuild become visible together
+        print(f"✅ Rollup refreshed for {year or 'all years'}: {rows} buckets.")
+
+    except mysql.connector.Error as err:
+        print(f"❌ Error refreshing rollup: {err}")
+        conn.rollback()
+        raise
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the monthly expense rollup table from expenses.")
+    parser.add_argument("--year", type=int, default=None, help="Only rebuild this year (default: all years).")
+    args = parser.parse_args()
+    refresh_rollup(args.year)
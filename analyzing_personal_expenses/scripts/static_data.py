@@ -28,4 +28,4 @@ CATEGORY_DESCRIPTIONS = {
     'School Fees': ['Tuition Fees', 'Books & Stationary', 'School Fees', 'Trips']
 }
 
-CHART_TYPES= {'Bar', 'Pie','Donut','Line', 'Scatter'}
\ No newline at end of file
+CHART_TYPES= {'Bar', 'Pie','Donut','Line', 'Scatter'}
@@ -0,0 +1,44 @@
+import argparse
+import sys
+import os
+import time
+from dotenv import load_dotenv
+
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.database.db_operations import DatabaseOperations
+from backend.database.delta_sync import LocalExpenseCopy, prune_change_log, SYNC_RETENTION_DAYS
+
+# Load environment variables
+load_dotenv()
+
+
+def sync_local_copy(path, full=False, every=None):
+    """Refresh the local SQLite copy at `path` once, or every `every` seconds until interrupted."""
+    local_copy = LocalExpenseCopy(DatabaseOperations(), path)
+    while True:
+        stats = local_copy.refresh(full=full)
+        kind = 'Full copy' if stats['full'] else 'Delta sync'
+        print(f"✅ {kind} of {path}: {stats['expenses_pulled']} expenses pulled, "
+              f"{stats['expenses_deleted']} deleted, {stats['dimension_rows_deleted']} dimension rows removed.")
+        if not every:
+            return
+        full = False
+        time.sleep(every)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep a local SQLite copy of the expense tables in sync.")
+    parser.add_argument("--path", default=os.getenv('DB_LOCAL_COPY_PATH', 'expenses_local.sqlite3'),
+                        help="Local copy (default: DB_LOCAL_COPY_PATH or ./expenses_local.sqlite3).")
+    parser.add_argument("--full", action="store_true", help="Copy everything instead of only the changes.")
+    parser.add_argument("--every", type=float, default=None, help="Keep syncing every this many seconds.")
+    parser.add_argument("--prune", action="store_true",
+                        help=f"Delete change-log entries older than {SYNC_RETENTION_DAYS:g} days and exit.")
+    args = parser.parse_args()
+
+    if args.prune:
+        removed = prune_change_log(DatabaseOperations())
+        print(f"✅ Pruned {removed} change-log entries.")
+    else:
+        sync_local_copy(args.path, args.full, args.every)
@@ -0,0 +1,142 @@
+import datetime
+import decimal
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import mysql.connector
+from backend.database import sqlite_backend
+from backend.database.bulk_loader import BulkExpenseLoader, expense_fingerprint, load_expense_lookups
+from backend.database.db_operations import DatabaseOperations
+from backend.synthetic_expenses import SyntheticExpenseGenerator, expense_rows
+from tests.test_sqlite_backend import create_sample_database
+
+
+class TestBulkExpenseLoader(unittest.TestCase):
+    """Batched expense loading on the SQLite backend."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'expenses.sqlite3')
+        create_sample_database(self.path)
+        os.environ['DB_SQLITE_PATH'] = self.path
+        self.db_ops = DatabaseOperations(backend='sqlite')
+
+    def tearDown(self):
+        self.db_ops.pool.close_all()
+        os.environ.pop('DB_SQLITE_PATH', None)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def count(self, query):
+        conn = sqlite_backend.connect(self.path)
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            value = cursor.fetchone()[0]
+        conn.close()
+        return value
+
+    def test_loads_in_batches_and_transactions(self):
+        lookups = load_expense_lookups(self.db_ops)
+        self.assertEqual(lookups['subcategories'], {100: [1000], 101: [1001]})
+
+        commits = []
+        loader = BulkExpenseLoader(self.db_ops, batch_size=300, transaction_rows=1000)
+        chunks = SyntheticExpenseGenerator(lookups, seed=1).chunks(2500, chunk_size=700)
+        stats = loader.load((row for chunk in chunks for row in expense_rows(chunk)), progress=commits.append)
+
+        self.assertEqual((stats['rows'], stats['batches'], stats['commits']), (2500, 9, 3))
+        self.assertEqual([c['rows'] for c in commits], [1200, 2400, 2500])
+        self.assertGreater(stats['rows_per_second'], 0)
+        self.assertEqual(self.count("SELECT COUNT(*) FROM expenses"), 2505)
+        # Every generated subcategory belongs to its expense's category
+        self.assertEqual(self.count("SELECT COUNT(*) FROM expenses e JOIN subcategories s "
+                                    "ON e.subcategory_id = s.subcategory_id WHERE s.category_id <> e.category_id"), 0)
+
+    def test_failed_batch_rolls_back_the_open_transaction(self):
+        rows = [(1, 100, 1000, 5.0, '2024-02-01', 1, '2024-02-01', f"test:{i}") for i in range(6)]
+        bad = (1, 999, None, 5.0, '2024-02-01', 1, '2024-02-01', 'test:bad')  # Unknown category
+        loader = BulkExpenseLoader(self.db_ops, batch_size=2, transaction_rows=4)
+        with self.assertRaises(Exception):
+            loader.load(rows + [bad])
+        # The first four rows were committed; the two after them went with the failed batch
+        self.assertEqual(self.count("SELECT COUNT(*) FROM expenses"), 9)
+
+        with self.assertRaises(ValueError):
+            BulkExpenseLoader(self.db_ops, method='infile')
+        with self.assertRaisesRegex(ValueError, 'executemany'):
+            BulkExpenseLoader(self.db_ops, method='infile', on_duplicate='update')
+
+    def test_reloading_the_same_rows_adds_nothing(self):
+        lookups = load_expense_lookups(self.db_ops)
+        rows = [row for chunk in SyntheticExpenseGenerator(lookups, seed=4).chunks(1000, chunk_size=300)
+                for row in expense_rows(chunk)]
+        first = BulkExpenseLoader(self.db_ops, batch_size=250).load(rows)
+        self.assertEqual((first['rows'], first['duplicates']), (1000, 0))
+
+        # The same rows again, plus an identical copy of one within a batch and a new one
+        later = rows[:10] + [rows[0]] + [rows[10][:7] + ('another source',)]
+        again = BulkExpenseLoader(self.db_ops, batch_size=5).load(later)
+        self.assertEqual((again['rows'], again['duplicates']), (12, 11))
+        self.assertEqual(self.count("SELECT COUNT(*) FROM expenses"), 5 + 1001)
+        self.assertEqual(self.count("SELECT COUNT(DISTINCT fingerprint) FROM expenses"), 1001)
+
+        # 'update' overwrites the columns outside the fingerprint
+        updated = [rows[0][:6] + (datetime.date(2030, 1, 1), rows[0][7])]
+        stats = BulkExpenseLoader(self.db_ops, on_duplicate='update').load(updated)
+        self.assertIsNone(stats['duplicates'])
+        self.assertEqual(self.count("SELECT COUNT(*) FROM expenses WHERE creation_date = '2030-01-01'"), 1)
+        self.assertEqual(self.count("SELECT COUNT(*) FROM expenses"), 5 + 1001)
+
+    def test_deferred_change_tracking_records_each_commit(self):
+        self.assertFalse(BulkExpenseLoader(self.db_ops, defer_change_tracking=True).defer_change_tracking)
+
+        # SQLite triggers cannot be suspended; dropping them stands in for a MySQL connection that did
+        conn = sqlite_backend.connect(self.path)
+        with conn.cursor() as cursor:
+            for event in ('insert', 'update', 'delete'):
+                cursor.execute(f"DROP TRIGGER trg_expenses_version_{event}")
+                cursor.execute(f"DROP TRIGGER trg_expenses_changelog_{event}")
+        conn.commit()
+        conn.close()
+        version = self.count("SELECT version FROM data_versions WHERE table_name = 'expenses'")
+        logged = self.count("SELECT COUNT(*) FROM expense_changes")
+
+        lookups = load_expense_lookups(self.db_ops)
+        rows = [row for chunk in SyntheticExpenseGenerator(lookups, seed=5).chunks(600) for row in expense_rows(chunk)]
+        with mock.patch.object(BulkExpenseLoader, '_change_tracking_deferrable', return_value=True):
+            loader = BulkExpenseLoader(self.db_ops, batch_size=100, transaction_rows=200, defer_change_tracking=True)
+        stats = loader.load(rows)
+
+        self.assertEqual(stats['commits'], 3)
+        self.assertEqual(self.count("SELECT version FROM data_versions WHERE table_name = 'expenses'"), version + 3)
+        self.assertEqual(self.count("SELECT COUNT(*) FROM expense_changes"), logged + 600)
+        self.assertEqual(self.count("SELECT COUNT(*) FROM expenses WHERE fingerprint IS NOT NULL AND expense_id "
+                                    "NOT IN (SELECT expense_id FROM expense_changes)"), 0)
+
+    def test_infile_warnings_other_than_duplicates_raise(self):
+        cursor = mock.MagicMock()
+        duplicate = ('Warning', 1062, "Duplicate entry 'ab12' for key 'expenses.uq_expenses_fingerprint'")
+        cursor.fetchone.return_value = (2,)
+        cursor.fetchall.return_value = [duplicate, duplicate]
+        BulkExpenseLoader._check_warnings(cursor)
+
+        cursor.fetchall.return_value = [duplicate, ('Warning', 1452, 'Cannot add or update a child row')]
+        with self.assertRaisesRegex(mysql.connector.Error, 'child row'):
+            BulkExpenseLoader._check_warnings(cursor)
+
+        # Warnings past max_error_count cannot be checked, so they count against the batch
+        cursor.fetchone.return_value = (3,)
+        cursor.fetchall.return_value = [duplicate, duplicate]
+        with self.assertRaisesRegex(mysql.connector.Error, 'max_error_count'):
+            BulkExpenseLoader._check_warnings(cursor)
+
+    def test_fingerprint_normalises_values(self):
+        self.assertEqual(expense_fingerprint(1, datetime.date(2024, 1, 2), 12.5, 100, None, 2, 'x'),
+                         expense_fingerprint(1, '2024-01-02', decimal.Decimal('12.50'), 100, None, 2, 'x'))
+        self.assertNotEqual(expense_fingerprint(1, '2024-01-02', 12.5, 100, None, 2, 'x'),
+                            expense_fingerprint(1, '2024-01-02', 12.5, 100, None, 2, 'y'))
+
+
+if __name__ == '__main__':
+    unittest.main()
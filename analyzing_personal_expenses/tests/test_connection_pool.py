@@ -0,0 +1,77 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from backend.database.connection_pool import ConnectionPool, PoolTimeoutError
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        # Each call to the factory yields a fresh mock connection
+        self.factory = MagicMock(side_effect=lambda: MagicMock(in_transaction=False))
+        self.pool = ConnectionPool(self.factory, size=2, timeout=0.05, health_check_interval=0)
+
+    def test_connections_are_reused_after_close(self):
+        with self.pool.get_connection():
+            pass
+        with self.pool.get_connection():
+            pass
+
+        stats = self.pool.stats()
+        self.assertEqual(stats['checkouts'], 2)
+        self.assertEqual(stats['connections_created'], 1)
+        self.assertEqual(stats['idle_connections'], 1)
+
+    def test_checkout_times_out_when_exhausted(self):
+        first = self.pool.get_connection()
+        second = self.pool.get_connection()
+
+        with self.assertRaises(PoolTimeoutError):
+            self.pool.get_connection()
+
+        first.close()
+        second.close()
+        stats = self.pool.stats()
+        self.assertEqual(stats['waits'], 1)
+        self.assertEqual(stats['timeouts'], 1)
+
+    def test_dead_connection_is_replaced(self):
+        conn = self.pool.get_connection()
+        conn.is_connected.return_value = False
+        conn.close()
+
+        with self.pool.get_connection():
+            pass
+
+        stats = self.pool.stats()
+        self.assertEqual(stats['connections_discarded'], 1)
+        self.assertEqual(stats['connections_created'], 2)
+
+    def test_discard_wakes_a_waiting_checkout(self):
+        pool = ConnectionPool(self.factory, size=1, timeout=5, health_check_interval=60)
+        conn = pool.get_connection()
+        checked_out = []
+        waiter = threading.Thread(target=lambda: checked_out.append(pool.get_connection()))
+        waiter.start()
+        time.sleep(0.05)
+
+        started = time.monotonic()
+        conn.discard()  # Frees the slot without returning a connection to the idle queue
+        waiter.join(timeout=5)
+        self.assertEqual(len(checked_out), 1)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(pool.stats()['connections_created'], 2)
+        checked_out[0].close()
+
+    def test_open_transaction_is_rolled_back_on_release(self):
+        conn = self.pool.get_connection()
+        raw = conn._raw
+        raw.in_transaction = True
+        conn.close()
+
+        raw.rollback.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
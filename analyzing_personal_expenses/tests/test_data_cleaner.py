@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+import pandas as pd
+from backend.data_cleaner import DataCleaner, clean_expense_summary
+from backend.fact_frame import compact_fact_frame
+
+
+class TestCleanExpenseSummary(unittest.TestCase):
+
+    def setUp(self):
+        # Row-level expenses with missing subcategories and amounts, like populate_expenses_with_blanks.py
+        rng = np.random.default_rng(7)
+        n = 400
+        categories = {100: 'Bills', 101: 'Food', 102: 'Travel'}
+        subcategories = {100: ['Water', 'Power'], 101: ['Dinner', 'Snacks', 'Cafe'], 102: ['Taxi']}
+        category_ids = rng.choice(list(categories), n)
+        rows = []
+        for category_id in category_ids:
+            subcategory = rng.choice(subcategories[category_id]) if rng.random() > 0.3 else None
+            amount = round(float(rng.uniform(10, 500)), 2) if rng.random() > 0.3 else None
+            rows.append((category_id, categories[category_id], subcategory, amount, rng.choice(['Cash', 'UPI'])))
+        self.rows_df = pd.DataFrame(
+            rows, columns=['category_id', 'category_name', 'subcategory_name', 'amount_paid', 'payment_mode_name']
+        )
+
+    def test_matches_row_level_cleaning(self):
+        # Row-level path: DataCleaner on individual expenses
+        df = self.rows_df[['category_name', 'subcategory_name', 'amount_paid']].assign(expense_date='2024-01-01')
+        categories_df = self.rows_df[['category_id', 'category_name']].drop_duplicates()
+        subcategories_df = pd.DataFrame({'subcategory_id': range(6),
+                                         'subcategory_name': ['Water', 'Power', 'Dinner', 'Snacks', 'Cafe', 'Taxi']})
+        cleaned_df = DataCleaner(df, categories_df, subcategories_df).clean_data()
+        expected = cleaned_df.groupby(['category_name', 'subcategory_name'])['amount_paid'].agg(['sum', 'count'])
+
+        # Aggregate path: the same rows summarized as the database would return them
+        summary_df = self.rows_df.groupby(
+            ['category_id', 'category_name', 'subcategory_name', 'payment_mode_name'], dropna=False, as_index=False
+        ).agg(expense_count=('amount_paid', 'size'), amount_count=('amount_paid', 'count'),
+              total_amount=('amount_paid', 'sum'), min_amount=('amount_paid', 'min'),
+              max_amount=('amount_paid', 'max'))
+        actual = clean_expense_summary(summary_df).set_index(['category_name', 'subcategory_name'])
+
+        self.assertEqual(sorted(actual.index), sorted(expected.index))
+        for key, row in expected.iterrows():
+            self.assertAlmostEqual(actual.loc[key, 'total_amount'], row['sum'], places=6)
+            self.assertEqual(actual.loc[key, 'expense_count'], row['count'])
+
+    def test_compact_fact_frame_cleans_the_same(self):
+        df = self.rows_df[['category_name', 'subcategory_name', 'amount_paid']].assign(expense_date='2024-01-01')
+        categories_df = self.rows_df[['category_id', 'category_name']].drop_duplicates()
+        subcategories_df = pd.DataFrame({'subcategory_id': range(6),
+                                         'subcategory_name': ['Water', 'Power', 'Dinner', 'Snacks', 'Cafe', 'Taxi']})
+        totals = [
+            DataCleaner(frame, categories_df, subcategories_df).clean_data()
+            .groupby(['category_name', 'subcategory_name'], observed=True)['amount_paid'].sum().astype('float64')
+            for frame in (df, compact_fact_frame(df))
+        ]
+        pd.testing.assert_series_equal(totals[1], totals[0], check_index_type=False, check_categorical=False,
+                                       rtol=1e-6)
+
+    def test_empty_summary(self):
+        self.assertTrue(clean_expense_summary(pd.DataFrame()).empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,11 @@
+import threading
 import unittest
 from unittest.mock import MagicMock
-import re
+from mysql.connector.constants import FieldType
 from backend.database.db_operations import DatabaseOperations  # Replace with your actual import path
-
-# Helper function to normalize SQL queries by trimming spaces
-def normalize_sql_query(query):
-    # Remove leading/trailing spaces and reduce multiple spaces to a single space
-    return re.sub(r'\s+', ' ', query.strip())
+from backend.database.result_cache import ResultCache
+from backend.database.query_stats import QueryStats
+from backend.database.dimensions import DimensionRegistry
 
 class TestDatabaseOperations(unittest.TestCase):
 
@@ -20,29 +19,92 @@ class TestDatabaseOperations(unittest.TestCase):
         self.mock_cursor = MagicMock()
         self.db_ops.get_db_connection.return_value = self.mock_conn
         self.mock_conn.cursor.return_value = self.mock_cursor
+        self.mock_conn.__enter__.return_value = self.mock_conn  # `with self.get_db_connection() as conn`
+        self.db_ops.cache = ResultCache()  # Results from other tests must not leak in
+        self.db_ops.query_stats = QueryStats()
+        self.db_ops.dimensions = DimensionRegistry()
     
-    def test_fetch_user_expenses_with_user_id(self):
-        user_id = 1  # Example user ID
-        # Sample SQL query expected and actual values
-        expected_query = """
-            SELECT e.expense_date, c.category_name, e.amount_paid
-            FROM expenses e
-            JOIN categories c ON e.category_id = c.category_id
-            WHERE e.user_id = %s
-        """
-        
-        # Simulate the database query execution
-        self.db_ops.fetch_user_expenses(user_id)
-        
-        # Get the actual query executed by the mock cursor
-        actual_query = self.mock_cursor.execute.call_args[0][0]
-        
-        # Normalize both the expected and actual queries by trimming spaces
-        normalized_expected_query = normalize_sql_query(expected_query)
-        normalized_actual_query = normalize_sql_query(actual_query)
-        
-        # Compare the normalized queries
-        self.assertEqual(normalized_expected_query, normalized_actual_query)
+    def test_generate_expense_query_binds_filters(self):
+        self.db_ops.generate_expense_query(user_id=2, selected_year="2024", selected_month="March")
+
+        prepared_cursor = self.mock_conn.prepared_cursor.return_value
+        actual_query, params = prepared_cursor.execute.call_args[0]
+
+        # Date filters are sargable ranges with bound values, never YEAR()/MONTH() or inlined literals
+        self.assertNotIn("YEAR(", actual_query)
+        self.assertIn("e.expense_date >= %s AND e.expense_date < %s", actual_query)
+        self.assertIn("e.user_id = %s", actual_query)
+        self.assertEqual(params[2], 2)
+
+    def test_iter_query_chunks_streams_typed_batches(self):
+        self.mock_cursor.description = [('expense_date', FieldType.DATE), ('amount_paid', FieldType.NEWDECIMAL)]
+        # Raw cursor rows: the server's text encoding as bytes
+        self.mock_cursor.fetchmany.side_effect = [
+            [(b'2024-01-01', b'10.50'), (b'2024-01-02', None)],
+            [(b'2024-01-03', b'3.25')],
+            [],
+        ]
+
+        chunks = list(self.db_ops.iter_query_chunks("SELECT ...", chunk_size=2))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        self.assertEqual(str(chunks[0]['amount_paid'].dtype), 'float64')
+        self.assertTrue(str(chunks[0]['expense_date'].dtype).startswith('datetime64'))
+        self.assertEqual(chunks[1]['amount_paid'].tolist(), [3.25])
+        self.mock_conn.cursor.assert_called_with(raw=True)
+        self.mock_cursor.fetchmany.assert_called_with(2)
+        self.mock_conn.close.assert_called_once()
+
+    def test_abandoned_stream_discards_connection(self):
+        self.mock_cursor.description = [('amount_paid', FieldType.NEWDECIMAL)]
+        self.mock_cursor.fetchmany.return_value = [(b'1.00',)]
+
+        chunks = self.db_ops.iter_query_chunks("SELECT ...", chunk_size=1)
+        next(chunks)
+        chunks.close()
+
+        self.mock_conn.discard.assert_called_once()
+        self.mock_conn.close.assert_not_called()
+
+    def test_run_concurrently_overlaps_independent_queries(self):
+        # Both calls must be in flight at once to get past the barrier
+        barrier = threading.Barrier(2, timeout=5)
+
+        def query(name):
+            barrier.wait()
+            return name
+
+        results = self.db_ops.run_concurrently({
+            'summary': lambda: query('summary'),
+            'categories': lambda: query('categories'),
+        })
+
+        self.assertEqual(results, {'summary': 'summary', 'categories': 'categories'})
+
+    def test_repeated_query_is_served_from_cache(self):
+        self.mock_cursor.__enter__.return_value = self.mock_cursor
+        self.mock_conn.prepared_cursor.return_value = self.mock_cursor
+        self.mock_cursor.fetchall.return_value = [(100, 'Food')]
+        self.mock_cursor.description = [('category_id', FieldType.LONG), ('category_name', FieldType.VAR_STRING)]
+        self.db_ops.data_version = MagicMock(side_effect=[(('expenses', 1),), (('expenses', 1),), (('expenses', 2),)])
+
+        first = self.db_ops.fetch_categories()
+        second = self.db_ops.fetch_categories()
+
+        self.assertEqual(first['category_name'].tolist(), ['Food'])
+        self.assertTrue(second.equals(first))
+        self.db_ops.get_db_connection.assert_called_once()
+        self.assertEqual(self.db_ops.cache_stats()['hits'], 1)
+
+        # A new data version invalidates the entry
+        self.db_ops.fetch_categories()
+        self.assertEqual(self.db_ops.get_db_connection.call_count, 2)
+        self.assertEqual(self.db_ops.cache_stats()['invalidations'], 1)
+
+        # Each call is timed against the method that issued it, cache hits included
+        summary = self.db_ops.query_summary().set_index('method')
+        self.assertEqual(summary.loc['fetch_categories', 'calls'], 3)
+        self.assertEqual(summary.loc['fetch_categories', 'cache_hits'], 1)
 
     # Add more test methods if needed
 
@@ -0,0 +1,133 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+from backend.database import sqlite_backend
+from backend.database.bulk_loader import BulkExpenseLoader
+from backend.database.db_operations import DatabaseOperations
+from backend.database.delta_sync import LocalExpenseCopy
+from tests.test_sqlite_backend import create_sample_database
+
+
+def table_rows(path, query):
+    conn = sqlite_backend.connect(path)
+    cursor = conn.cursor()
+    cursor.execute(query)
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+class TestLocalExpenseCopy(unittest.TestCase):
+    """Syncs a local SQLite copy from a SQLite source database with the change-log triggers."""
+
+    EXPENSES = "SELECT expense_id, user_id, category_id, subcategory_id, amount_paid, expense_date FROM expenses " \
+               "ORDER BY expense_id"
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.source_path = os.path.join(self.tmpdir, 'source.sqlite3')
+        self.local_path = os.path.join(self.tmpdir, 'local.sqlite3')
+        create_sample_database(self.source_path)
+        # Age the sample rows' change-log entries past the sync overlap window
+        conn = sqlite_backend.connect(self.source_path)
+        conn.cursor().execute("UPDATE expense_changes SET changed_at = '2000-01-01 00:00:00'")
+        conn.commit()
+        conn.close()
+
+        os.environ['DB_SQLITE_PATH'] = self.source_path
+        self.source_ops = DatabaseOperations(backend='sqlite')
+        self.local_copy = LocalExpenseCopy(self.source_ops, self.local_path)
+
+    def tearDown(self):
+        self.source_ops.pool.close_all()
+        os.environ.pop('DB_SQLITE_PATH', None)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def write_source(self, *statements):
+        conn = self.source_ops.get_db_connection()
+        with conn.cursor() as cursor:
+            for query, params in statements:
+                cursor.execute(query, params)
+        conn.commit()
+        conn.close()
+
+    def assertCopyMatchesSource(self):
+        self.assertEqual(table_rows(self.local_path, self.EXPENSES), table_rows(self.source_path, self.EXPENSES))
+
+    def test_first_refresh_copies_everything(self):
+        stats = self.local_copy.refresh()
+        self.assertTrue(stats['full'])
+        self.assertEqual(stats['expenses_pulled'], 5)
+        self.assertCopyMatchesSource()
+        self.assertEqual(table_rows(self.local_path, "SELECT user_name, password FROM users ORDER BY user_id"),
+                         [('Asha', ''), ('Ravi', '')])
+
+    def test_refresh_pulls_only_changed_rows(self):
+        self.local_copy.refresh()
+        self.write_source(
+            ("INSERT INTO expenses (user_id, category_id, amount_paid, expense_date, payment_mode_id) "
+             "VALUES (%s, %s, %s, %s, %s)", (2, 100, 3.0, datetime.date(2024, 3, 1), 1)),
+            ("UPDATE expenses SET amount_paid = %s WHERE expense_id = %s", (99.0, 10000)),
+            ("DELETE FROM expenses WHERE expense_id = %s", (10001,)),
+        )
+
+        stats = self.local_copy.refresh()
+        self.assertFalse(stats['full'])
+        self.assertEqual(stats['expenses_pulled'], 2)
+        self.assertEqual(stats['expenses_deleted'], 1)
+        self.assertCopyMatchesSource()
+
+        # Nothing changed: no rows pulled, and the copy's data version is left alone
+        before = table_rows(self.local_path, "SELECT table_name, version FROM data_versions ORDER BY table_name")
+        self.local_copy.refresh()
+        after = table_rows(self.local_path, "SELECT table_name, version FROM data_versions ORDER BY table_name")
+        self.assertEqual(before, after)
+
+    def test_fingerprints_are_copied(self):
+        BulkExpenseLoader(self.source_ops).load(
+            [(1, 100, 1000, 12.5, datetime.date(2024, 4, 1), 2, datetime.datetime(2024, 4, 1), 'bank:1')])
+        self.local_copy.refresh()
+        fingerprints = "SELECT expense_id, source_ref, fingerprint FROM expenses WHERE fingerprint IS NOT NULL"
+        self.assertEqual(len(table_rows(self.local_path, fingerprints)), 1)
+        self.assertEqual(table_rows(self.local_path, fingerprints), table_rows(self.source_path, fingerprints))
+
+    def test_copy_gets_the_widened_fingerprint_index(self):
+        self.local_copy.refresh()
+        conn = sqlite_backend.connect(self.local_path)
+        conn.cursor().execute("DROP INDEX uq_expenses_fingerprint")
+        conn.cursor().execute("CREATE UNIQUE INDEX uq_expenses_fingerprint ON expenses (fingerprint)")
+        conn.commit()
+        conn.close()
+
+        self.local_copy.refresh()
+        self.assertEqual(table_rows(self.local_path, "SELECT name FROM pragma_index_info('uq_expenses_fingerprint')"),
+                         [('fingerprint',), ('expense_date',)])
+
+    def test_deleted_category_cascades_in_the_copy(self):
+        self.local_copy.refresh()
+        self.write_source(
+            ("UPDATE payment_modes SET payment_mode_name = %s WHERE payment_mode_id = %s", ('Card', 2)),
+            ("DELETE FROM categories WHERE category_id = %s", (101,)),
+        )
+
+        stats = self.local_copy.refresh()
+        self.assertEqual(stats['dimension_rows_deleted'], 1)  # Its subcategory and expense go by cascade
+        self.assertCopyMatchesSource()
+        self.assertEqual(table_rows(self.local_path, "SELECT payment_mode_name FROM payment_modes ORDER BY 1"),
+                         [('Card',), ('Cash',)])
+
+    def test_stale_copy_does_a_full_resync(self):
+        self.local_copy.refresh()
+        conn = sqlite_backend.connect(self.local_path)
+        conn.cursor().execute("UPDATE sync_state SET value = '2000-01-01 00:00:00' WHERE name = 'since'")
+        conn.commit()
+        conn.close()
+
+        self.assertTrue(self.local_copy.refresh()['full'])
+        self.assertCopyMatchesSource()
+
+
+if __name__ == '__main__':
+    unittest.main()
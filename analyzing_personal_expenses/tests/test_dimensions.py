@@ -0,0 +1,110 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from backend.database import sqlite_backend
+from backend.database.db_operations import DatabaseOperations
+from tests.test_sqlite_backend import create_sample_database
+
+# The summary as computed before, with the dimension names joined in SQL
+JOINED_SUMMARY_QUERY = """
+SELECT c.category_id, c.category_name, s.subcategory_id, s.subcategory_name,
+       COUNT(*) AS expense_count, CAST(SUM(e.amount_paid) AS DOUBLE) AS total_amount
+FROM expenses e
+JOIN categories c ON e.category_id = c.category_id
+LEFT JOIN subcategories s ON e.subcategory_id = s.subcategory_id AND s.category_id = c.category_id
+GROUP BY c.category_id, c.category_name, s.subcategory_id, s.subcategory_name
+"""
+
+
+class TestDimensionRegistry(unittest.TestCase):
+    """Fact queries return ids; names come from the per-process dimension registry."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'expenses.sqlite3')
+        create_sample_database(self.path)
+
+        # A Flights subcategory filed under Food: the joins treated it as no subcategory
+        conn = sqlite_backend.connect(self.path)
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO expenses (user_id, category_id, subcategory_id, amount_paid, expense_date, "
+                           "payment_mode_id) VALUES (%s, %s, %s, %s, %s, %s)",
+                           (2, 100, 1001, 3.0, datetime.date(2024, 1, 9), 2))
+        conn.commit()
+        conn.close()
+
+        os.environ['DB_SQLITE_PATH'] = self.path
+        self.db_ops = DatabaseOperations(backend='sqlite')
+
+    def tearDown(self):
+        self.db_ops.pool.close_all()
+        os.environ.pop('DB_SQLITE_PATH', None)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_dimensions_load_once_and_reload_on_change(self):
+        self.assertEqual(self.db_ops.fetch_users(), {'Asha': 1, 'Ravi': 2})
+        self.db_ops.fetch_all_categories()
+        self.db_ops.fetch_expense_facts(selected_year='2024')
+        self.db_ops.fetch_expense_summary(selected_year='2024')
+        self.assertEqual(self.db_ops.dimensions.loads, 1)
+
+        conn = self.db_ops.get_db_connection()
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO users (user_name, user_email, password, role) VALUES ('Meera', 'm@x', 'x', 'user')")
+            cursor.execute("INSERT INTO categories (category_name) VALUES ('Health')")
+        conn.commit()
+        conn.close()
+
+        # A new instance probes the data version now rather than after DB_VERSION_CHECK_INTERVAL
+        db_ops = DatabaseOperations(backend='sqlite')
+        self.assertIs(db_ops.dimensions, self.db_ops.dimensions)
+        self.assertEqual(db_ops.fetch_users()['Meera'], 3)
+        self.assertIn('Health', db_ops.fetch_all_categories())
+        self.assertEqual(db_ops.dimensions.loads, 2)
+
+    def test_facts_carry_names_of_their_ids(self):
+        facts = self.db_ops.fetch_expense_facts(user_id=2)
+        self.assertEqual(facts.columns.tolist(), ['expense_date', 'user_id', 'category_id', 'category_name',
+                                                  'subcategory_id', 'subcategory_name', 'payment_mode_id',
+                                                  'payment_mode_name', 'amount_paid', 'expense_year',
+                                                  'expense_month'])
+        # Ordered by category name, mismatched subcategory nulled and sorted first
+        self.assertEqual(facts['category_name'].tolist(), ['Food', 'Travel'])
+        self.assertTrue(pd.isna(facts.loc[0, 'subcategory_id']) and pd.isna(facts.loc[0, 'subcategory_name']))
+        self.assertEqual(facts.loc[1, 'subcategory_name'], 'Flights')
+        self.assertEqual(facts['payment_mode_name'].tolist(), ['UPI', 'UPI'])
+
+        # Every fact frame shares the registry's categories, so frames combine without object columns
+        combined = pd.concat([facts, self.db_ops.fetch_expense_facts(user_id=1)], ignore_index=True)
+        self.assertEqual(str(combined['category_name'].dtype), 'category')
+        stages = self.db_ops.memory_summary().set_index('stage')
+        self.assertEqual(stages.loc['facts: compact', 'rows'], 3)  # The latest fetch, for user 1
+        self.assertIn('facts: ids from database', stages.index)
+
+        streamed = pd.concat(self.db_ops.iter_expense_facts(user_id=2), ignore_index=True)
+        self.assertEqual(sorted(streamed['subcategory_name'].fillna('')), ['', 'Flights'])
+
+        page, _ = self.db_ops.fetch_expense_page(user_id=2)
+        self.assertEqual(page['user_name'].unique().tolist(), ['Ravi'])
+
+    def test_summary_matches_the_sql_joins(self):
+        expected = self.db_ops.execute_query(JOINED_SUMMARY_QUERY, use_cache=False)
+        summary = self.db_ops.fetch_expense_summary(group_by=('category', 'subcategory'), use_rollup=False)
+
+        columns = ['category_name', 'subcategory_name', 'expense_count', 'total_amount']
+        sort = ['category_name', 'subcategory_name']
+        pd.testing.assert_frame_equal(
+            summary[columns].sort_values(sort, ignore_index=True),
+            expected[columns].sort_values(sort, ignore_index=True), check_dtype=False)
+
+        by_subcategory = self.db_ops.fetch_expense_summary(group_by=('subcategory',), use_rollup=False)
+        self.assertEqual(by_subcategory.columns[:2].tolist(), ['subcategory_id', 'subcategory_name'])
+        counts = dict(zip(by_subcategory['subcategory_name'].fillna('none'), by_subcategory['expense_count']))
+        self.assertEqual(counts, {'Groceries': 2, 'Flights': 2, 'none': 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
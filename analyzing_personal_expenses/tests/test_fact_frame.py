@@ -0,0 +1,89 @@
+import unittest
+import datetime
+import numpy as np
+import pandas as pd
+from backend.fact_frame import (expense_frame, derive_categories, derive_subcategories, derive_payment_modes,
+                                compact_fact_frame, filter_period, category_amount_totals, MemoryReport)
+from backend.database.result_cache import frame_nbytes
+
+
+class TestFactFrame(unittest.TestCase):
+
+    def setUp(self):
+        self.facts_df = pd.DataFrame([
+            (datetime.date(2024, 1, 5), 1, 101, 'Food', 1001, 'Dinner', 3, 'Cash', 25.0),
+            (datetime.date(2024, 1, 9), 2, 101, 'Food', None, None, 1, 'UPI', 12.5),
+            (datetime.date(2024, 2, 1), 1, 100, 'Bills', 1000, 'Water Bills', 3, 'Cash', None),
+        ], columns=['expense_date', 'user_id', 'category_id', 'category_name', 'subcategory_id',
+                    'subcategory_name', 'payment_mode_id', 'payment_mode_name', 'amount_paid'])
+
+    def test_expense_frame_keeps_expense_columns(self):
+        df = expense_frame(self.facts_df)
+        self.assertEqual(df.columns.tolist(), ['expense_date', 'category_name', 'subcategory_name', 'amount_paid'])
+        self.assertEqual(len(df), 3)
+
+    def test_derive_categories_is_distinct_and_sorted(self):
+        categories_df = derive_categories(self.facts_df)
+        self.assertEqual(categories_df['category_name'].tolist(), ['Bills', 'Food'])
+        self.assertEqual(categories_df['category_id'].tolist(), [100, 101])
+
+    def test_derive_subcategories_drops_missing(self):
+        subcategories_df = derive_subcategories(self.facts_df)
+        self.assertEqual(subcategories_df['subcategory_name'].tolist(), ['Dinner', 'Water Bills'])
+        self.assertEqual(subcategories_df['subcategory_id'].tolist(), [1001, 1000])
+
+    def test_derive_payment_modes_shape(self):
+        payment_mode_df = derive_payment_modes(self.facts_df)
+        self.assertEqual(payment_mode_df.columns.tolist(),
+                         ['expense_date', 'category_name', 'payment_mode_name', 'payment_count'])
+        self.assertEqual(len(payment_mode_df), 3)
+
+
+    def test_compact_fact_frame_dtypes(self):
+        facts_df = self.facts_df.assign(expense_date=pd.to_datetime(self.facts_df['expense_date']))
+        dtype = pd.CategoricalDtype(['Bills', 'Food', 'Travel'])
+        df = compact_fact_frame(facts_df, {'category_name': dtype})
+
+        self.assertIs(df['category_name'].dtype, dtype)
+        self.assertIsInstance(df['payment_mode_name'].dtype, pd.CategoricalDtype)
+        self.assertEqual(str(df['subcategory_id'].dtype), 'Int32')
+        self.assertEqual(str(df['amount_paid'].dtype), 'float32')
+        self.assertEqual(df['expense_month'].tolist(), [1, 1, 2])
+        self.assertEqual(str(df['expense_month'].dtype), 'int8')
+
+        # The derived frames and period filters work on the compact frame as on the plain one
+        self.assertEqual(derive_subcategories(df)['subcategory_id'].tolist(), [1001, 1000])
+        self.assertEqual(len(filter_period(df, '2024', 'January')), 2)
+        self.assertEqual(len(filter_period(facts_df, 2024, 2)), 1)
+        self.assertEqual(category_amount_totals(df).to_dict(), {'Bills': 0.0, 'Food': 37.5})
+
+    def test_compact_fact_frame_is_several_times_smaller(self):
+        rng = np.random.default_rng(3)
+        n = 20000
+        categories = np.array([f"Category {i}" for i in range(30)], dtype=object)
+        facts_df = pd.DataFrame({
+            'expense_date': pd.to_datetime('2022-01-01') + pd.to_timedelta(rng.integers(0, 1000, n), unit='D'),
+            'category_id': rng.integers(100, 130, n),
+            'category_name': categories[rng.integers(0, 30, n)],
+            'subcategory_id': rng.integers(1000, 1100, n).astype(float),
+            'subcategory_name': np.array([f"Subcategory {i}" for i in range(100)], dtype=object)[rng.integers(0, 100, n)],
+            'payment_mode_id': rng.integers(1, 6, n),
+            'payment_mode_name': np.array(['Cash', 'UPI', 'Card', 'Wallet', 'Bank'], dtype=object)[rng.integers(0, 5, n)],
+            'amount_paid': rng.uniform(1, 500, n).round(2),
+        })
+        report = MemoryReport()
+        report.record('plain', facts_df)
+        report.record('compact', compact_fact_frame(facts_df))
+
+        sizes = report.summary().set_index('stage')['bytes']
+        self.assertGreater(sizes['plain'] / sizes['compact'], 2.5)
+        self.assertEqual(report.total_bytes(), sizes.sum())
+        self.assertEqual(sizes['plain'], frame_nbytes(facts_df))
+
+        # Series, such as the dashboard's category totals, are recorded as one column
+        report.record('totals', category_amount_totals(facts_df))
+        self.assertEqual(report.summary().set_index('stage').loc['totals', ['rows', 'columns']].tolist(), [30, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
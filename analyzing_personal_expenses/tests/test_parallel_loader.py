@@ -0,0 +1,107 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+from backend.database import sqlite_backend
+from backend.database.db_operations import DatabaseOperations
+from backend.database.parallel_loader import expense_secondary_indexes, load_parallel, split_work
+from tests.test_sqlite_backend import create_sample_database
+
+LOOKUPS = {'user_ids': [1, 2, 3, 4, 5], 'category_ids': [100], 'payment_mode_ids': [1],
+           'subcategories': {100: [1000]}, 'category_names': {100: 'Food'}}
+
+
+class TestSplitWork(unittest.TestCase):
+
+    def test_parts_cover_the_rows_without_overlap(self):
+        by_user = split_work(LOOKUPS, 1001, workers=2, split='user', seed=3)
+        self.assertEqual([part['lookups']['user_ids'] for part in by_user], [[1, 3, 5], [2, 4]])
+        self.assertEqual([part['rows'] for part in by_user], [600, 401])
+        self.assertEqual([part['seed'] for part in by_user], [[3, 0], [3, 1]])
+        self.assertEqual(len(split_work(LOOKUPS, 10, workers=8)), 5)  # No more workers than users
+
+        start, end = datetime.date(2024, 1, 1), datetime.date(2024, 12, 31)
+        by_date = split_work(LOOKUPS, 366, workers=3, split='date', start=start, end=end)
+        self.assertEqual(by_date[0]['start'], start)
+        self.assertEqual(by_date[-1]['end'], end)
+        for first, second in zip(by_date, by_date[1:]):
+            self.assertEqual(second['start'] - first['end'], datetime.timedelta(days=1))
+        self.assertEqual(sum(part['rows'] for part in by_date), 366)
+        self.assertTrue(all(part['lookups']['user_ids'] == LOOKUPS['user_ids'] for part in by_date))
+
+
+class TestParallelLoad(unittest.TestCase):
+    """Worker processes loading into one SQLite database."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'expenses.sqlite3')
+        create_sample_database(self.path)
+        os.environ['DB_SQLITE_PATH'] = self.path
+        self.db_ops = DatabaseOperations(backend='sqlite')
+
+    def tearDown(self):
+        self.db_ops.pool.close_all()
+        os.environ.pop('DB_SQLITE_PATH', None)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def query(self, sql):
+        conn = sqlite_backend.connect(self.path)
+        with conn.cursor() as cursor:
+            cursor.execute(sql)
+            rows = cursor.fetchall()
+        conn.close()
+        return rows
+
+    def test_workers_load_their_parts_and_indexes_are_rebuilt(self):
+        updates = []
+        stats = load_parallel(self.db_ops, 3000, workers=2, seed=1, batch_size=200, transaction_rows=500,
+                              defer_indexes=True, progress=updates.append)
+
+        self.assertEqual((stats['rows'], stats['workers']), (3000, 2))
+        self.assertEqual(sorted(part['rows'] for part in stats['parts']), [1500, 1500])
+        self.assertEqual((updates[-1]['rows'], updates[-1]['workers_done']), (3000, 2))
+        self.assertEqual(self.query("SELECT COUNT(*) FROM expenses")[0][0], 3005)
+
+        indexes = {row[0] for row in self.query("SELECT name FROM sqlite_master WHERE tbl_name = 'expenses'")}
+        self.assertTrue({name for name, _, _ in expense_secondary_indexes()} <= indexes)
+
+
+@unittest.skipUnless(os.getenv('DB_LOAD_TESTS_MYSQL') == '1' and (os.cpu_count() or 1) >= 4,
+                     "set DB_LOAD_TESTS_MYSQL=1 (and use 4+ cores) to time loads into the MySQL database in .env; "
+                     "the loaded expenses are deleted afterwards")
+class TestMySQLParallelLoadScaling(unittest.TestCase):
+    """Workers must not queue on shared rows: four load clearly faster than one."""
+
+    ROWS = 200000
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db_ops = DatabaseOperations(backend='mysql')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db_ops.pool.close_all()
+
+    def timed_load(self, workers):
+        with self.db_ops.get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT COALESCE(MAX(expense_id), 0) FROM expenses")
+                before = cursor.fetchone()[0]
+        try:
+            return load_parallel(self.db_ops, self.ROWS, workers=workers, seed=workers)['rows_per_second']
+        finally:
+            with self.db_ops.get_db_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("DELETE FROM expenses WHERE expense_id > %s", (before,))
+                conn.commit()
+
+    def test_throughput_rises_with_workers(self):
+        one, four = self.timed_load(1), self.timed_load(4)
+        print(f"\n1 worker: {one:,.0f} rows/s, 4 workers: {four:,.0f} rows/s ({four / one:.1f}x)")
+        self.assertGreater(four, 1.5 * one)
+
+
+if __name__ == '__main__':
+    unittest.main()
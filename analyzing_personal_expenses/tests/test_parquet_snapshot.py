@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import unittest
+from backend.database.db_operations import DatabaseOperations
+from backend.fact_frame import compact_fact_frame
+from tests.test_sqlite_backend import create_sample_database
+
+try:
+    from backend.database import parquet_snapshot
+except ImportError:  # pyarrow is optional
+    parquet_snapshot = None
+
+
+@unittest.skipIf(parquet_snapshot is None, "pyarrow is not installed")
+class TestParquetSnapshot(unittest.TestCase):
+    """Exports the SQLite sample database to a snapshot and checks it answers like the SQL queries."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        db_path = os.path.join(cls.tmpdir, 'expenses.sqlite3')
+        create_sample_database(db_path)
+        os.environ['DB_SQLITE_PATH'] = db_path
+        cls.db_ops = DatabaseOperations(backend='sqlite')
+        cls.db_ops.snapshot_path = None
+
+        cls.snapshot_path = os.path.join(cls.tmpdir, 'snapshot')
+        cls.rows = parquet_snapshot.write_snapshot(cls.db_ops, cls.snapshot_path, chunk_size=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db_ops.pool.close_all()
+        os.environ.pop('DB_SQLITE_PATH', None)
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+
+    def test_partitioned_by_year_and_month(self):
+        self.assertEqual(self.rows, 5)
+        self.assertEqual(sorted(os.listdir(self.snapshot_path)), ['expense_year=2023', 'expense_year=2024'])
+        self.assertEqual(sorted(os.listdir(os.path.join(self.snapshot_path, 'expense_year=2024'))),
+                         ['expense_month=1', 'expense_month=2'])
+
+    def test_facts_match_database(self):
+        expected = self.db_ops.fetch_expense_facts(user_id=1, selected_year='2024', selected_month='January')
+        actual = compact_fact_frame(parquet_snapshot.fetch_snapshot_facts(self.snapshot_path, 1, '2024', 'January'))
+
+        self.assertEqual(list(actual.columns), list(expected.columns))
+        self.assertEqual(str(actual['category_name'].dtype), 'category')
+        self.assertEqual(actual['category_name'].astype(str).tolist(), expected['category_name'].tolist())
+        self.assertEqual(actual['amount_paid'].fillna(-1).tolist(), expected['amount_paid'].fillna(-1).tolist())
+
+    def test_summary_matches_database(self):
+        expected = self.db_ops.fetch_category_summary(selected_year='2024')
+        snapshot_ops = DatabaseOperations(backend='sqlite')
+        snapshot_ops.snapshot_path = self.snapshot_path
+        actual = snapshot_ops.fetch_category_summary(selected_year='2024')
+
+        key = lambda df: df.assign(category_name=df['category_name'].astype(str)).sort_values('category_id')
+        for column in ('category_name', 'expense_count', 'amount_count', 'total_amount', 'max_amount'):
+            self.assertEqual(key(actual)[column].tolist(), key(expected)[column].tolist())
+
+    def test_year_refresh_replaces_only_that_year(self):
+        path = os.path.join(self.tmpdir, 'refresh')
+        shutil.copytree(self.snapshot_path, path)
+        parquet_snapshot.write_snapshot(self.db_ops, path, selected_year=2023)
+
+        self.assertEqual(len(parquet_snapshot.fetch_snapshot_facts(path)), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+from backend.database.db_operations import DatabaseOperations
+from backend.database.partitions import (period_partitions, partition_definitions, expected_partitions, horizon,
+                                         enable_partitioning, add_future_partitions, drop_partitions,
+                                         dashboard_queries, REFERENCE_CHECKS)
+from tests.test_sqlite_backend import create_sample_database
+
+YEARLY = [('p2023', datetime.date(2024, 1, 1), 10), ('p2024', datetime.date(2025, 1, 1), 20),
+          ('pmax', None, 0)]
+
+
+class PartitionCursor:
+    """Stands in for a MySQL cursor: answers the partition and table lookups, records everything else."""
+
+    def __init__(self, partitions, tables=(), indexes=None):
+        self.partitions = [(name, 'MAXVALUE' if bound is None else f"'{bound}'", rows)
+                           for name, bound, rows in partitions]
+        self.tables = set(tables)
+        self.indexes = indexes or {}
+        self.statements = []
+        self.result = []
+
+    def execute(self, sql, params=None):
+        if 'information_schema.partitions' in sql:
+            self.result = self.partitions
+        elif 'information_schema.tables' in sql:
+            self.result = [(int(params[0] in self.tables),)]
+        elif 'information_schema.statistics' in sql:
+            self.result = [(column,) for column in self.indexes.get(params[1], ())]
+        elif 'information_schema.table_constraints' in sql:
+            self.result = []
+        elif 'MIN(expense_date)' in sql:
+            self.result = [(datetime.date(2024, 3, 1), datetime.date(2024, 9, 1))]
+        else:
+            self.statements.append(' '.join(sql.split()))
+
+    def fetchall(self):
+        return self.result
+
+    def fetchone(self):
+        return self.result[0]
+
+
+class TestPartitionPlanning(unittest.TestCase):
+
+    def test_periods_and_definitions(self):
+        months = period_partitions(datetime.date(2024, 11, 15), datetime.date(2025, 1, 1), 'month')
+        self.assertEqual(months, [('p202411', datetime.date(2024, 12, 1)), ('p202412', datetime.date(2025, 1, 1)),
+                                  ('p202501', datetime.date(2025, 2, 1))])
+        self.assertEqual(partition_definitions(months[:1]),
+                         "(PARTITION p202411 VALUES LESS THAN ('2024-12-01'), "
+                         "PARTITION pmax VALUES LESS THAN (MAXVALUE))")
+        self.assertEqual(horizon('year', 2, today=datetime.date(2026, 10, 18)), datetime.date(2028, 1, 1))
+        with self.assertRaises(ValueError):
+            period_partitions(datetime.date(2024, 1, 1), datetime.date(2024, 1, 1), 'week')
+
+    def test_expected_partitions(self):
+        self.assertEqual(expected_partitions(YEARLY, datetime.date(2024, 3, 1), datetime.date(2024, 4, 1)),
+                         ['p2024'])
+        # The first partition also holds every earlier date, the last every later one
+        self.assertEqual(expected_partitions(YEARLY, datetime.date(2019, 1, 1), datetime.date(2020, 1, 1)),
+                         ['p2023'])
+        self.assertEqual(expected_partitions(YEARLY, datetime.date(2030, 1, 1), datetime.date(2031, 1, 1)),
+                         ['pmax'])
+
+    def test_enable_widens_a_fingerprint_index_without_the_date(self):
+        cursor = PartitionCursor([], indexes={'uq_expenses_fingerprint': ['fingerprint']})
+        self.assertEqual(enable_partitioning(cursor, 'year', ahead=0)[0], 'p2024')
+        alters = [sql for sql in cursor.statements if sql.startswith('ALTER TABLE expenses')]
+        self.assertEqual(alters[0], "ALTER TABLE expenses DROP INDEX uq_expenses_fingerprint, "
+                                    "ADD UNIQUE INDEX uq_expenses_fingerprint (fingerprint, expense_date)")
+        self.assertIn('PARTITION BY RANGE COLUMNS(expense_date)', alters[1])
+
+        # Writes to expenses are still checked against the tables the foreign keys referenced
+        checks = [sql for sql in cursor.statements if sql.startswith('CREATE TRIGGER trg_expenses_check_references')]
+        self.assertEqual([sql.split()[3:5] for sql in checks], [['BEFORE', 'INSERT'], ['BEFORE', 'UPDATE']])
+        for column, table in REFERENCE_CHECKS:
+            self.assertIn(f"NOT EXISTS (SELECT 1 FROM {table} WHERE {column} = NEW.{column} FOR SHARE)", checks[0])
+        self.assertIn("NOT NEW.user_id <=> OLD.user_id", checks[1])
+        self.assertLess(cursor.statements.index(checks[-1]), cursor.statements.index(alters[1]))
+
+        # After migration 8 the index already fits
+        cursor = PartitionCursor([], indexes={'uq_expenses_fingerprint': ['fingerprint', 'expense_date']})
+        enable_partitioning(cursor, 'year', ahead=0)
+        self.assertFalse(any('uq_expenses_fingerprint' in sql for sql in cursor.statements))
+
+    def test_future_partitions_split_off_the_catch_all(self):
+        cursor = PartitionCursor(YEARLY)
+        self.assertEqual(add_future_partitions(cursor, through=datetime.date(2026, 6, 1)), ['p2025', 'p2026'])
+        self.assertEqual(cursor.statements, [
+            "ALTER TABLE expenses REORGANIZE PARTITION pmax INTO (PARTITION p2025 VALUES LESS THAN ('2026-01-01'), "
+            "PARTITION p2026 VALUES LESS THAN ('2027-01-01'), PARTITION pmax VALUES LESS THAN (MAXVALUE))"])
+        self.assertEqual(add_future_partitions(PartitionCursor(YEARLY), through=datetime.date(2024, 6, 1)), [])
+
+    def test_dropped_history_leaves_rollup_and_change_log_consistent(self):
+        cursor = PartitionCursor(YEARLY, tables=('expense_changes', 'expense_monthly_rollup'))
+        self.assertEqual(drop_partitions(cursor, datetime.date(2024, 6, 1), archive=True), ['p2023'])
+        self.assertEqual(cursor.statements, [
+            "INSERT INTO expense_changes (expense_id) SELECT expense_id FROM expenses PARTITION (p2023)",
+            "CREATE TABLE expenses_archive_p2023 LIKE expenses",
+            "ALTER TABLE expenses_archive_p2023 REMOVE PARTITIONING",
+            "ALTER TABLE expenses EXCHANGE PARTITION p2023 WITH TABLE expenses_archive_p2023",
+            "ALTER TABLE expenses DROP PARTITION p2023",
+            "DELETE FROM expense_monthly_rollup WHERE expense_year < %s OR (expense_year = %s AND expense_month < %s)",
+        ])
+
+
+class TestDashboardQueries(unittest.TestCase):
+    """Every expense query DatabaseOperations builds for a year or month bounds expense_date, so it can prune."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'expenses.sqlite3')
+        create_sample_database(self.path)
+        os.environ['DB_SQLITE_PATH'] = self.path
+        self.db_ops = DatabaseOperations(backend='sqlite')
+
+    def tearDown(self):
+        self.db_ops.pool.close_all()
+        os.environ.pop('DB_SQLITE_PATH', None)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_queries_carry_the_date_range(self):
+        for month, start, end in ((None, datetime.date(2024, 1, 1), datetime.date(2025, 1, 1)),
+                                  ('March', datetime.date(2024, 3, 1), datetime.date(2024, 4, 1))):
+            queries = dashboard_queries(self.db_ops, 1, '2024', month, category_id=100)
+            self.assertEqual(len({method for method, _, _ in queries}), 7)
+            for method, query, params in queries:
+                with self.subTest(method=method, month=month):
+                    self.assertIn("e.expense_date >= %s AND e.expense_date < %s", query)
+                    self.assertIn(start, params)
+                    self.assertIn(end, params)
+
+
+if __name__ == '__main__':
+    unittest.main()
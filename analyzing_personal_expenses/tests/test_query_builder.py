@@ -0,0 +1,45 @@
+import unittest
+import datetime
+from backend.database.query_builder import parse_month, date_range, build_expense_filters, build_keyset_filter
+
+
+class TestQueryBuilder(unittest.TestCase):
+
+    def test_parse_month_accepts_names_and_numbers(self):
+        self.assertEqual(parse_month("March"), 3)
+        self.assertEqual(parse_month("march"), 3)
+        self.assertEqual(parse_month(12), 12)
+        self.assertEqual(parse_month("7"), 7)
+        self.assertIsNone(parse_month(None))
+        self.assertIsNone(parse_month("Smarch"))
+        self.assertIsNone(parse_month(13))
+
+    def test_date_range_is_half_open(self):
+        self.assertEqual(date_range("2024"), (datetime.date(2024, 1, 1), datetime.date(2025, 1, 1)))
+        self.assertEqual(date_range(2024, "February"), (datetime.date(2024, 2, 1), datetime.date(2024, 3, 1)))
+        self.assertEqual(date_range(2024, "December"), (datetime.date(2024, 12, 1), datetime.date(2025, 1, 1)))
+        self.assertIsNone(date_range(None, "May"))
+
+    def test_filters_use_bound_parameters(self):
+        where_sql, params = build_expense_filters(user_id=3, selected_year="2024", selected_month="May", category_id=101)
+        self.assertEqual(
+            where_sql,
+            " AND e.expense_date >= %s AND e.expense_date < %s AND e.user_id = %s AND e.category_id = %s"
+        )
+        self.assertEqual(params, (datetime.date(2024, 5, 1), datetime.date(2024, 6, 1), 3, 101))
+
+    def test_all_users_adds_no_user_filter(self):
+        for user_id in (None, 'ALL Users', 'All Users'):
+            where_sql, params = build_expense_filters(user_id=user_id)
+            self.assertEqual(where_sql, "")
+            self.assertEqual(params, ())
+
+    def test_keyset_filter_continues_after_the_last_key(self):
+        self.assertEqual(build_keyset_filter(None), ("", ()))
+        where_sql, params = build_keyset_filter((datetime.date(2024, 1, 5), 10003))
+        self.assertEqual(where_sql, " AND e.expense_date <= %s"
+                                    " AND (e.expense_date < %s OR (e.expense_date = %s AND e.expense_id < %s))")
+        self.assertEqual(params, (datetime.date(2024, 1, 5),) * 3 + (10003,))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,259 @@
+import datetime
+import os
+import random
+import re
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from backend.database import sqlite_backend
+from backend.database.db_operations import DatabaseOperations
+
+# Generated dataset: large enough that a lost index shows up as a scan of many more rows than returned
+PLAN_DATASET_ROWS = 20000
+PLAN_DATASET_START = datetime.date(2022, 1, 1)
+PLAN_DATASET_DAYS = 3 * 365
+
+# Query shapes the dashboard runs, with representative filters. For each: the index `expenses` must be
+# read through, whether the result order must come from that index (no sort step), and for row-level
+# queries the most work allowed per returned row. Aggregates return a few groups from many rows and
+# are only checked for their index.
+DEEP_KEY = (datetime.date(2022, 2, 1), 10000 + PLAN_DATASET_ROWS // 2)
+QUERY_SHAPES = {
+    'facts_all_users_year': {
+        'call': lambda ops: ops.fetch_expense_facts(selected_year='2024'),
+        'index': 'idx_expenses_date', 'row_level': True,
+    },
+    'facts_user_month': {
+        'call': lambda ops: ops.fetch_expense_facts(3, '2024', 'March'),
+        'index': 'idx_expenses_user_date', 'row_level': True,
+    },
+    'export_stream_user_year': {
+        'call': lambda ops: list(ops.iter_expense_facts(3, '2023')),
+        'index': 'idx_expenses_user_date', 'row_level': True,
+    },
+    'summary_all_users_year': {
+        'call': lambda ops: ops.fetch_expense_summary(selected_year='2024', use_rollup=False),
+        'index': 'idx_expenses_date',
+    },
+    'summary_user_month_category': {
+        'call': lambda ops: ops.fetch_expense_summary(3, '2024', 'March', category_id=101, use_rollup=False),
+        'index': 'idx_expenses_user_date',
+    },
+    'monthly_summary_user_year': {
+        'call': lambda ops: ops.fetch_monthly_summary(3, '2024'),
+        'index': 'idx_expenses_user_date',
+    },
+    'categories_user_year': {
+        'call': lambda ops: ops.fetch_categories(3, '2024'),
+        'index': 'idx_expenses_user_date',
+    },
+    'sidebar_categories_user_month': {
+        'call': lambda ops: ops.fetch_user_categories(3, '2024', 'May'),
+        'index': 'idx_expenses_user_date',
+    },
+    'subcategories_all_users_category': {
+        'call': lambda ops: ops.fetch_subcategories(selected_year='2024', category_id=101),
+        'index': 'idx_expenses_date',
+    },
+    'payment_modes_user_year': {
+        'call': lambda ops: ops.fetch_payment_mode_counts(3, '2024'),
+        'index': 'idx_expenses_user_date',
+    },
+    'first_page_all_users': {
+        'call': lambda ops: ops.fetch_expense_page(),
+        'index': 'idx_expenses_date_id', 'ordered_by_index': True, 'row_level': True,
+    },
+    'deep_page_all_users_year': {
+        'call': lambda ops: ops.fetch_expense_page(selected_year='2022', after=DEEP_KEY),
+        'index': 'idx_expenses_date_id', 'ordered_by_index': True, 'row_level': True,
+    },
+    'deep_page_user': {
+        'call': lambda ops: ops.fetch_expense_page(3, after=DEEP_KEY),
+        'index': 'idx_expenses_user_date_id', 'ordered_by_index': True, 'row_level': True,
+    },
+}
+
+# SQLite does not report rows examined; its virtual-machine instruction count is the measure of work.
+# An index range read with the joins takes about 30-40 instructions per returned row.
+MAX_SQLITE_STEPS_PER_ROW = 100
+
+# MySQL: rows read from `expenses` (EXPLAIN ANALYZE) per row returned
+MAX_MYSQL_EXAMINED_RATIO = 3
+
+
+def create_plan_dataset(path, rows=PLAN_DATASET_ROWS, seed=7):
+    """Create the schema at `path` with 20 users, 10 categories, 40 subcategories and `rows` expenses."""
+    sqlite_backend.create_schema(path)
+    rng = random.Random(seed)
+
+    conn = sqlite_backend.connect(path)
+    cursor = conn.cursor()
+    cursor.executemany("INSERT INTO users (user_name, user_email, password, role) VALUES (%s, %s, 'x', 'user')",
+                       [(f"user{i}", f"user{i}@example.com") for i in range(1, 21)])
+    cursor.executemany("INSERT INTO categories (category_name) VALUES (%s)", [(f"category{i}",) for i in range(10)])
+    cursor.executemany("INSERT INTO subcategories (category_id, subcategory_name) VALUES (%s, %s)",
+                       [(100 + i % 10, f"subcategory{i}") for i in range(40)])
+    cursor.executemany("INSERT INTO payment_modes (payment_mode_name) VALUES (%s)", [(f"mode{i}",) for i in range(5)])
+
+    expenses = []
+    for _ in range(rows):
+        category = rng.randrange(10)
+        expenses.append((
+            rng.randint(1, 20),
+            100 + category,
+            1000 + category + 10 * rng.randrange(4),
+            round(rng.uniform(1, 500), 2),
+            PLAN_DATASET_START + datetime.timedelta(days=rng.randrange(PLAN_DATASET_DAYS)),
+            rng.randint(1, 5),
+        ))
+    cursor.executemany(
+        "INSERT INTO expenses (user_id, category_id, subcategory_id, amount_paid, expense_date, payment_mode_id) "
+        "VALUES (%s, %s, %s, %s, %s, %s)", expenses)
+    cursor.execute("ANALYZE")  # Planner statistics, as on a populated database
+    conn.commit()
+    conn.close()
+
+
+def capture_queries(db_ops, call):
+    """Run `call(db_ops)` without touching the database and return the (query, params) it would execute."""
+    captured = []
+
+    def record(query, params=None, *args, **kwargs):
+        captured.append((query, params))
+        return pd.DataFrame()
+
+    def record_stream(query, params=None, *args, **kwargs):
+        yield record(query, params)
+
+    db_ops.execute_query = record
+    db_ops.iter_query_chunks = record_stream
+    try:
+        call(db_ops)
+    finally:
+        del db_ops.execute_query, db_ops.iter_query_chunks
+    return captured
+
+
+class QueryPlanAssertions:
+    """
+    Checks shared by the SQLite and MySQL plan tests. Subclasses provide explain(), returning the
+    index `expenses` is read through, the access ('search', 'index_scan' or 'table_scan') and whether
+    rows are sorted after reading, and check_work(), bounding the work per returned row.
+    """
+
+    def check_shape(self, name, shape):
+        queries = capture_queries(self.db_ops, shape['call'])
+        self.assertEqual(len(queries), 1, f"{name}: expected one query, got {len(queries)}")
+        query, params = queries[0]
+
+        index, access, sorted_after = self.explain(query, params)
+        self.assertNotEqual(access, 'table_scan', f"{name}: full scan of expenses")
+        if access == 'index_scan':
+            # Walking a whole index is only fine in index order, stopping at the page's LIMIT
+            self.assertTrue(shape.get('ordered_by_index'), f"{name}: full scan of index {index}")
+        self.assertEqual(index, shape['index'], f"{name}: expenses read through {index}")
+        if shape.get('ordered_by_index'):
+            self.assertFalse(sorted_after, f"{name}: rows are sorted after reading instead of in index order")
+        if shape.get('row_level'):
+            self.check_work(name, query, params)
+
+    def test_query_shapes_use_their_indexes(self):
+        for name, shape in QUERY_SHAPES.items():
+            with self.subTest(shape=name):
+                self.check_shape(name, shape)
+
+
+class TestSQLiteQueryPlans(QueryPlanAssertions, unittest.TestCase):
+    """EXPLAIN QUERY PLAN for every dashboard query shape, on a generated SQLite dataset."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        path = os.path.join(cls.tmpdir, 'plans.sqlite3')
+        create_plan_dataset(path)
+
+        os.environ['DB_SQLITE_PATH'] = path
+        cls.db_ops = DatabaseOperations(backend='sqlite')
+        cls.conn = sqlite_backend.connect(path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+        cls.db_ops.pool.close_all()
+        os.environ.pop('DB_SQLITE_PATH', None)
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+
+    def explain(self, query, params):
+        cursor = self.conn.cursor()
+        cursor.execute("EXPLAIN QUERY PLAN " + query, params)
+        details = [row[3] for row in cursor.fetchall()]
+        cursor.close()
+
+        # e.g. "SEARCH e USING COVERING INDEX idx_expenses_date (expense_date>? AND expense_date<?)"
+        index, access = None, None
+        for detail in details:
+            match = re.match(r'(SEARCH|SCAN) e\b(?: USING (?:COVERING )?INDEX (\w+))?', detail)
+            if match:
+                kind, index = match.groups()
+                access = 'search' if kind == 'SEARCH' else 'index_scan' if index else 'table_scan'
+        sorted_after = any(detail.startswith('USE TEMP B-TREE FOR ORDER BY') for detail in details)
+        return index, access, sorted_after
+
+    def check_work(self, name, query, params):
+        steps = 0
+
+        def count_step():
+            nonlocal steps
+            steps += 1
+            return 0
+
+        raw = self.conn._connection
+        raw.set_progress_handler(count_step, 1)
+        try:
+            rows = raw.execute(query.replace('%s', '?'), params).fetchall()
+        finally:
+            raw.set_progress_handler(None, 1)
+        self.assertGreater(len(rows), 0, f"{name}: representative filters should return rows")
+        self.assertLessEqual(steps / len(rows), MAX_SQLITE_STEPS_PER_ROW,
+                             f"{name}: {steps} instructions for {len(rows)} rows")
+
+
+@unittest.skipUnless(os.getenv('DB_PLAN_TESTS_MYSQL') == '1',
+                     "set DB_PLAN_TESTS_MYSQL=1 to check plans against the populated MySQL database in .env")
+class TestMySQLQueryPlans(QueryPlanAssertions, unittest.TestCase):
+    """EXPLAIN / EXPLAIN ANALYZE (MySQL 8.0.18+) for every query shape, on the populated database. Read-only."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db_ops = DatabaseOperations(backend='mysql')
+
+    def explain(self, query, params):
+        with self.db_ops.get_db_connection() as conn:
+            with conn.cursor(dictionary=True) as cursor:
+                cursor.execute("EXPLAIN " + query, params)
+                rows = cursor.fetchall()
+        expense_rows = [row for row in rows if row['table'] == 'e']
+        index = expense_rows[0]['key'] if expense_rows else None
+        access_type = expense_rows[0]['type'] if expense_rows else None
+        access = 'table_scan' if access_type == 'ALL' else 'index_scan' if access_type == 'index' else 'search'
+        sorted_after = any('Using filesort' in (row['Extra'] or '') for row in rows)
+        return index, access, sorted_after
+
+    def check_work(self, name, query, params):
+        with self.db_ops.get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                returned = len(cursor.fetchall())
+                cursor.execute("EXPLAIN ANALYZE " + query, params)
+                tree = cursor.fetchone()[0]
+        # e.g. "-> Index range scan on e using idx_expenses_date_id ... (actual time=0.04..0.3 rows=51 loops=1)"
+        examined = sum(int(rows) * int(loops) for rows, loops in re.findall(
+            r'on e\b[^\n]*\(actual time=[\d.]+\.\.[\d.]+ rows=(\d+) loops=(\d+)\)', tree))
+        self.assertGreater(returned, 0, f"{name}: representative filters should return rows")
+        self.assertLessEqual(examined, MAX_MYSQL_EXAMINED_RATIO * returned,
+                             f"{name}: {examined} expenses rows examined for {returned} returned")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from backend.database.query_stats import QueryStats
+
+
+class FakeOperations:
+    """Stands in for DatabaseOperations: fetch_* methods that go through an execute_query helper."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def execute_query(self, query, rows):
+        with self.stats.timer(query) as timer:
+            timer.first_row()
+            timer.done(rows, nbytes=8 * rows)
+
+    def fetch_expense_summary(self):
+        self.execute_query("SELECT  1", 3)
+
+    def fetch_users(self):
+        self.execute_query("SELECT user_id FROM users", 2)
+
+
+class TestQueryStats(unittest.TestCase):
+
+    def test_queries_are_attributed_to_the_calling_method(self):
+        stats = QueryStats(slow_ms=1000)
+        operations = FakeOperations(stats)
+        operations.fetch_expense_summary()
+        operations.fetch_expense_summary()
+        operations.fetch_users()
+
+        summary = stats.summary().set_index('method')
+        self.assertEqual(summary.loc['fetch_expense_summary', 'calls'], 2)
+        self.assertEqual(summary.loc['fetch_expense_summary', 'rows'], 6)
+        self.assertEqual(summary.loc['fetch_users', 'bytes'], 16)
+        self.assertEqual(stats.totals(), {'queries': 3, 'slow_queries': 0, 'errors': 0})
+
+    def test_slow_and_failed_queries_are_logged(self):
+        stats = QueryStats(slow_ms=100)
+        with self.assertLogs('slow_queries', level='WARNING') as logs:
+            stats.record('fetch_expense_facts', "SELECT *\n  FROM expenses", wall_ms=250.0, first_row_ms=200.0, rows=10)
+        self.assertIn("fetch_expense_facts: 250.0 ms (first row 200.0 ms), 10 rows", logs.output[0])
+        self.assertIn("SELECT * FROM expenses", logs.output[0])
+
+        # Cache hits are never slow; exceptions inside a timer count as errors
+        stats.record('fetch_users', "SELECT 1", wall_ms=500.0, cached=True)
+        with self.assertRaises(RuntimeError):
+            with stats.timer("SELECT 2", method='fetch_categories'):
+                raise RuntimeError("lost connection")
+
+        self.assertEqual(stats.totals(), {'queries': 3, 'slow_queries': 1, 'errors': 1})
+        summary = stats.summary().set_index('method')
+        self.assertEqual(summary.loc['fetch_users', 'cache_hits'], 1)
+        self.assertEqual(summary.loc['fetch_categories', 'errors'], 1)
+
+    def test_abandoned_stream_is_not_an_error(self):
+        stats = QueryStats()
+
+        def stream():
+            with stats.timer("SELECT * FROM expenses", method='iter_expense_facts') as timer:
+                for _ in range(3):
+                    timer.done(1)
+                    yield
+
+        chunks = stream()
+        next(chunks)
+        chunks.close()
+        self.assertEqual(stats.totals()['errors'], 0)
+        self.assertEqual(stats.summary()['rows'].tolist(), [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
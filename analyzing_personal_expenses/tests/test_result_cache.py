@@ -0,0 +1,61 @@
+import unittest
+import pandas as pd
+from backend.database.result_cache import ResultCache, frame_nbytes
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.frame = pd.DataFrame({'amount_paid': [1.0, 2.0, 3.0]})
+        self.size = frame_nbytes(self.frame)
+
+    def test_lru_eviction_is_bounded_by_memory(self):
+        cache = ResultCache(max_bytes=2 * self.size, ttl=60, clock=self.clock)
+        cache.put('a', self.frame)
+        cache.put('b', self.frame)
+        cache.get('a')              # 'b' is now least recently used
+        cache.put('c', self.frame)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        stats = cache.stats()
+        self.assertEqual(stats['evictions'], 1)
+        self.assertLessEqual(stats['bytes'], 2 * self.size)
+
+    def test_entries_expire_after_ttl(self):
+        cache = ResultCache(max_bytes=10 * self.size, ttl=30, clock=self.clock)
+        cache.put('a', self.frame)
+        cache.put('short', self.frame, ttl=5)
+
+        self.clock.now = 10
+        self.assertIsNone(cache.get('short'))
+        self.assertIsNotNone(cache.get('a'))
+        self.clock.now = 31
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['expirations'], 2)
+
+    def test_returned_frames_are_copies(self):
+        cache = ResultCache(max_bytes=10 * self.size, clock=self.clock)
+        cache.put('a', self.frame)
+        returned = cache.get('a')
+        returned['amount_paid'] = 0.0
+
+        self.assertEqual(cache.get('a')['amount_paid'].tolist(), [1.0, 2.0, 3.0])
+
+    def test_keys_ignore_query_formatting(self):
+        self.assertEqual(ResultCache.make_key('db', "SELECT *\n  FROM expenses WHERE id = %s", [1]),
+                         ResultCache.make_key('db', "SELECT * FROM expenses WHERE id = %s", (1,)))
+
+
+if __name__ == '__main__':
+    unittest.main()
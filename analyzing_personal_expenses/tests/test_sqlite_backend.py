@@ -0,0 +1,208 @@
+import datetime
+import decimal
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from backend.database import sqlite_backend
+from backend.database.db_operations import DatabaseOperations
+from backend.database.schema import MIGRATIONS
+
+# (user_id, category_id, subcategory_id, amount_paid, expense_date, payment_mode_id)
+SAMPLE_EXPENSES = [
+    (1, 100, 1000, 10.50, datetime.date(2024, 1, 5), 1),
+    (1, 100, None, 4.50, datetime.date(2024, 1, 20), 2),
+    (1, 101, 1001, None, datetime.date(2024, 1, 31), 1),
+    (2, 101, 1001, 20.00, datetime.date(2024, 2, 1), 2),
+    (None, 100, 1000, 7.25, datetime.date(2023, 12, 31), 1),
+]
+
+
+def create_sample_database(path):
+    """Create the schema at `path` and load a few users, categories and SAMPLE_EXPENSES."""
+    sqlite_backend.create_schema(path)
+
+    conn = sqlite_backend.connect(path)
+    cursor = conn.cursor()
+    cursor.executemany("INSERT INTO users (user_name, user_email, password, role) VALUES (%s, %s, %s, %s)",
+                       [('Asha', 'asha@example.com', 'x', 'user'), ('Ravi', 'ravi@example.com', 'x', 'admin')])
+    cursor.executemany("INSERT INTO categories (category_name) VALUES (%s)", [('Food',), ('Travel',)])
+    cursor.executemany("INSERT INTO subcategories (category_id, subcategory_name) VALUES (%s, %s)",
+                       [(100, 'Groceries'), (101, 'Flights')])
+    cursor.executemany("INSERT INTO payment_modes (payment_mode_name) VALUES (%s)", [('Cash',), ('UPI',)])
+    cursor.executemany(
+        "INSERT INTO expenses (user_id, category_id, subcategory_id, amount_paid, expense_date, payment_mode_id) "
+        "VALUES (%s, %s, %s, %s, %s, %s)", SAMPLE_EXPENSES)
+    conn.commit()
+    conn.close()
+
+
+class TestSQLiteBackend(unittest.TestCase):
+    """Runs DatabaseOperations end to end against an embedded SQLite database with the MySQL schema."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        path = os.path.join(cls.tmpdir, 'expenses.sqlite3')
+        create_sample_database(path)
+
+        os.environ['DB_SQLITE_PATH'] = path
+        cls.db_ops = DatabaseOperations(backend='sqlite')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db_ops.pool.close_all()
+        os.environ.pop('DB_SQLITE_PATH', None)
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+
+    def test_schema_keeps_mysql_id_offsets(self):
+        self.assertEqual(self.db_ops.fetch_users(), {'Asha': 1, 'Ravi': 2})
+        self.assertEqual(sorted(self.db_ops.fetch_all_categories()), ['Food', 'Travel'])
+        self.assertEqual(self.db_ops.fetch_categories()['category_id'].tolist(), [100, 101])
+
+    def test_filtered_fetches(self):
+        page, next_key = self.db_ops.fetch_expense_page(1)
+        self.assertEqual((len(page), next_key), (3, None))
+        self.assertIn('transactions page', self.db_ops.memory_summary()['stage'].tolist())
+
+        categories = self.db_ops.fetch_user_categories(1, '2024', 'January')
+        self.assertEqual(categories['category_name'].tolist(), ['Food', 'Travel'])
+
+        facts = self.db_ops.fetch_expense_facts(selected_year='2024', selected_month='January')
+        self.assertEqual(len(facts), 3)
+        self.assertEqual(str(facts['amount_paid'].dtype), 'float32')
+        self.assertEqual(str(facts['category_name'].dtype), 'category')
+        self.assertTrue(str(facts['expense_date'].dtype).startswith('datetime64'))
+
+        subcategories = self.db_ops.fetch_subcategories(selected_year='2024', category_id=101)
+        self.assertEqual(subcategories['subcategory_name'].tolist(), ['Flights'])
+
+        payment_modes = self.db_ops.fetch_payment_mode_counts(user_id=2, selected_year='2024')
+        self.assertEqual(payment_modes['payment_mode_name'].tolist(), ['UPI'])
+
+        self.assertEqual(len(self.db_ops.generate_expense_query(selected_year='2023')), 1)
+
+    def test_streamed_chunks_match_full_result(self):
+        chunks = list(self.db_ops.iter_expense_facts(selected_year='2024', chunk_size=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2])
+        self.assertEqual(str(chunks[0]['amount_paid'].dtype), 'float64')
+
+    def test_summary_aggregates_in_sql(self):
+        self.assertFalse(self.db_ops.rollup_available())
+
+        summary = self.db_ops.fetch_category_summary(selected_year='2024')
+        totals = dict(zip(summary['category_name'], summary['total_amount']))
+        self.assertEqual(totals, {'Food': 15.0, 'Travel': 20.0})
+        self.assertEqual(summary['expense_count'].sum(), 4)
+        self.assertEqual(summary['amount_count'].sum(), 3)
+
+        monthly = self.db_ops.fetch_monthly_summary(selected_year='2024').sort_values('expense_month')
+        self.assertEqual(monthly['expense_month'].tolist(), [1, 2])
+
+    def test_expense_pages_follow_the_keyset(self):
+        ids, after, pages = [], None, 0
+        while True:
+            page, after = self.db_ops.fetch_expense_page(after=after, page_size=2)
+            ids.extend(page['expense_id'].tolist())
+            pages += 1
+            if after is None:
+                break
+        # Newest first, across page boundaries, ending with the 2023 expense
+        self.assertEqual(ids, [10003, 10002, 10001, 10000, 10004])
+        self.assertEqual(pages, 3)
+
+        page, after = self.db_ops.fetch_expense_page(user_id=1, selected_year='2024', selected_month='January')
+        self.assertEqual(page['expense_id'].tolist(), [10002, 10001, 10000])
+        self.assertEqual(page['user_name'].unique().tolist(), ['Asha'])
+        self.assertIsNone(after)
+
+    def test_data_version_changes_on_writes(self):
+        self.assertTrue(self.db_ops.table_exists('data_versions'))
+        before = DatabaseOperations(backend='sqlite').data_version()
+
+        conn = self.db_ops.get_db_connection()
+        with conn.cursor() as cursor:
+            cursor.execute("UPDATE payment_modes SET payment_mode_name = %s WHERE payment_mode_id = %s", ('Cash', 1))
+        conn.commit()
+        conn.close()
+
+        after = DatabaseOperations(backend='sqlite').data_version()
+        self.assertNotEqual(before, after)
+        self.assertEqual(dict(after)['payment_modes'], dict(before)['payment_modes'] + 1)
+        self.assertEqual(dict(after)['expenses'], dict(before)['expenses'])
+
+    def test_concurrent_queries_use_separate_connections(self):
+        results = self.db_ops.execute_queries({
+            'users': "SELECT user_id FROM users",
+            'food': ("SELECT COUNT(*) AS n FROM expenses WHERE category_id = %s", (100,)),
+        })
+        self.assertEqual(len(results['users']), 2)
+        self.assertEqual(results['food']['n'].tolist(), [3])
+
+
+class TestSchemaTranslation(unittest.TestCase):
+    """The SQLite schema is generated from schema.py, so every migration must translate."""
+
+    def test_every_migration_has_a_sqlite_counterpart(self):
+        for migration in MIGRATIONS:
+            with self.subTest(version=migration['version']):
+                statements = sqlite_backend.migration_statements(migration)
+                if migration['version'] in sqlite_backend.SQLITE_SKIPPED_MIGRATIONS:
+                    self.assertEqual(statements, [])
+                else:
+                    self.assertTrue(statements)
+
+    def test_indexes_match_mysql(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'expenses.sqlite3')
+            sqlite_backend.create_schema(path)
+            conn = sqlite_backend.connect(path)
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT name FROM pragma_index_info('uq_expenses_fingerprint')")
+                fingerprint_columns = [row[0] for row in cursor.fetchall()]
+                cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_expenses_%'")
+                indexes = {row[0] for row in cursor.fetchall()}
+            conn.close()
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+        self.assertEqual(fingerprint_columns, ['fingerprint', 'expense_date'])
+        self.assertEqual(indexes, {'idx_expenses_user_date', 'idx_expenses_date', 'idx_expenses_date_id',
+                                   'idx_expenses_user_date_id'})
+
+    def test_untranslatable_statements_are_rejected(self):
+        with self.assertRaises(ValueError):
+            sqlite_backend.translate_statement("ALTER TABLE expenses ADD FULLTEXT INDEX ft_ref (source_ref)")
+
+    def test_import_leaves_sqlite3_defaults_alone(self):
+        self.assertNotIn((decimal.Decimal, sqlite3.PrepareProtocol), sqlite3.adapters)
+        self.assertNotIn('DECIMAL', sqlite3.converters)
+
+
+class TestRecreateSchema(unittest.TestCase):
+
+    def test_migration_tables_start_over_with_the_base_tables(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'expenses.sqlite3')
+            create_sample_database(path)
+            sqlite_backend.create_schema(path)
+
+            conn = sqlite_backend.connect(path)
+            with conn.cursor() as cursor:
+                counts = {}
+                for table in ('expenses', 'expense_changes'):
+                    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                    counts[table] = cursor.fetchone()[0]
+                cursor.execute("SELECT MAX(version) FROM data_versions")
+                counts['data_versions'] = cursor.fetchone()[0]
+            conn.close()
+            # No change-log entries or version bumps left over from the dropped expenses
+            self.assertEqual(counts, {'expenses': 0, 'expense_changes': 0, 'data_versions': 0})
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import csv
+import datetime
+import decimal
+import os
+import shutil
+import tempfile
+import unittest
+from backend.database import sqlite_backend
+from backend.database.db_operations import DatabaseOperations
+from backend.statement_import import StatementImporter, parse_amount, parse_date
+from tests.test_sqlite_backend import create_sample_database
+
+STATEMENT = [
+    ['Txn Date', 'Amount', 'Category', 'Subcategory', 'Payment Mode', 'User'],
+    ['05/03/2024', '₹1,250.50', 'food', 'Groceries', 'UPI', ''],         # Default user
+    ['2024-03-06', '(80.00)', 'Travel', '', 'cash', 'Ravi'],             # Parenthesised negative
+    ['07/03/2024', '300', '', 'Flights', 'Cash', '2'],                   # Category from the subcategory
+    ['31/02/2024', '10', 'Food', '', 'UPI', ''],                         # No such date
+    ['08/03/2024', 'n/a', 'Food', '', 'UPI', ''],
+    ['09/03/2024', '25', 'Rent', '', 'UPI', ''],
+    ['10/03/2024', '25', 'Food', 'Flights', 'UPI', ''],                  # Subcategory of another category
+    ['11/03/2024', '25', 'Food', '', 'Cheque', ''],
+    ['12/03/2024', '25', 'Food', '', 'UPI', 'Meera'],
+    ['13/03/2024', '500', 'Food', '', 'UPI', ''],                        # A refund when debits are negative
+]
+
+
+class TestStatementImport(unittest.TestCase):
+    """Statement CSVs streamed into the SQLite backend."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'expenses.sqlite3')
+        create_sample_database(self.path)
+        os.environ['DB_SQLITE_PATH'] = self.path
+        self.db_ops = DatabaseOperations(backend='sqlite')
+
+        self.statement = os.path.join(self.tmpdir, 'statement.csv')
+        with open(self.statement, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(STATEMENT)
+
+    def tearDown(self):
+        self.db_ops.pool.close_all()
+        os.environ.pop('DB_SQLITE_PATH', None)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def imported(self):
+        conn = sqlite_backend.connect(self.path)
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT user_id, category_id, subcategory_id, amount_paid, expense_date, payment_mode_id "
+                           "FROM expenses WHERE expense_id > 10004 ORDER BY expense_id")
+            rows = cursor.fetchall()
+        conn.close()
+        return rows
+
+    def test_parsers(self):
+        self.assertEqual(parse_amount('₹1,234.505'), decimal.Decimal('1234.51'))
+        self.assertEqual(parse_amount('(12)'), decimal.Decimal('-12.00'))
+        self.assertIsNone(parse_amount(''))
+        self.assertIsNone(parse_amount('NaN'))
+        self.assertEqual(parse_date('05/03/2024'), datetime.date(2024, 3, 5))
+        self.assertEqual(parse_date('5 Mar 2024'), datetime.date(2024, 3, 5))
+        self.assertIsNone(parse_date('2024/13/01'))
+
+    def test_valid_rows_loaded_and_the_rest_rejected_with_reasons(self):
+        importer = StatementImporter(self.db_ops, columns={'date': 'Txn Date'}, default_user='Asha', batch_size=2)
+        rejects = os.path.join(self.tmpdir, 'rejects.csv')
+        stats = importer.import_file(self.statement, rejects_path=rejects)
+
+        self.assertEqual((stats['rows_read'], stats['rows_loaded'], stats['rows_rejected']), (10, 3, 7))
+        self.assertEqual(stats['rejected_by_reason'], {
+            'credit or zero amount': 1, 'bad date': 1, 'bad amount': 1, 'unknown category': 1,
+            'unknown subcategory': 1, 'unknown payment mode': 1, 'unknown user': 1,
+        })
+        self.assertEqual(self.imported(), [
+            (1, 100, 1000, 1250.5, datetime.date(2024, 3, 5), 2),
+            (2, 101, 1001, 300.0, datetime.date(2024, 3, 7), 1),
+            (1, 100, None, 500.0, datetime.date(2024, 3, 13), 2),
+        ])
+
+        with open(rejects, newline='', encoding='utf-8') as f:
+            rejected = list(csv.DictReader(f))
+        self.assertEqual([row['line'] for row in rejected], ['3', '5', '6', '7', '8', '9', '10'])
+        self.assertEqual(rejected[0]['reason'], 'credit or zero amount')
+        self.assertEqual(rejected[0]['Amount'], '(80.00)')
+
+        # Importing the statement again stores nothing new
+        again = importer.import_file(self.statement)
+        self.assertEqual((again['rows_loaded'], again['duplicates']), (3, 3))
+        self.assertEqual(len(self.imported()), 3)
+
+    def test_debits_negative(self):
+        importer = StatementImporter(self.db_ops, columns={'date': 'Txn Date'}, default_user=1, debits_negative=True)
+        stats = importer.import_file(self.statement)
+        self.assertEqual(stats['rows_loaded'], 1)
+        self.assertEqual(self.imported(), [(2, 101, None, 80.0, datetime.date(2024, 3, 6), 1)])
+
+        with self.assertRaises(ValueError):
+            StatementImporter(self.db_ops, default_user='Nobody')
+
+
+if __name__ == '__main__':
+    unittest.main()
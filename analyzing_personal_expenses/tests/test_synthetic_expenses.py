@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from backend.database.bulk_loader import EXPENSE_LOAD_COLUMNS
+from backend.synthetic_expenses import SyntheticExpenseGenerator, expense_rows, write_csv
+
+LOOKUPS = {
+    'user_ids': [1, 2, 3],
+    'category_ids': [100, 101, 102],
+    'payment_mode_ids': [1, 2],
+    'subcategories': {100: [1000, 1002], 101: [1001], 102: []},
+    'category_names': {100: 'Food', 101: 'School Fees', 102: 'Uncatalogued'},
+}
+
+
+class TestSyntheticExpenseGenerator(unittest.TestCase):
+
+    def generate(self, n, chunk_size=1000, **kwargs):
+        return pd.concat(SyntheticExpenseGenerator(LOOKUPS, **kwargs).chunks(n, chunk_size), ignore_index=True)
+
+    def test_reproducible_valid_rows(self):
+        expenses = self.generate(5000, seed=42)
+        pd.testing.assert_frame_equal(expenses, self.generate(5000, seed=42))
+        self.assertFalse(expenses.equals(self.generate(5000, seed=43)))
+        # Rows depend on the seed and row number only, not on how they are chunked or how many are drawn
+        longer = self.generate(60000, 100000, seed=42)
+        pd.testing.assert_frame_equal(longer.head(5000), expenses)
+        for chunk_size in (333, 7000):
+            pd.testing.assert_frame_equal(self.generate(60000, chunk_size, seed=42), longer)
+        self.assertEqual(expenses.columns.tolist(), list(EXPENSE_LOAD_COLUMNS))
+
+        self.assertTrue(expenses['user_id'].isin(LOOKUPS['user_ids']).all())
+        self.assertTrue(expenses['payment_mode_id'].isin(LOOKUPS['payment_mode_ids']).all())
+        for category_id, subcategories in LOOKUPS['subcategories'].items():
+            drawn = expenses.loc[expenses['category_id'] == category_id, 'subcategory_id']
+            self.assertEqual(set(drawn.dropna()), set(subcategories))
+            self.assertEqual(drawn.isna().all(), not subcategories)
+
+        self.assertEqual(expenses['expense_date'].min().year, 2020)
+        self.assertEqual(expenses['expense_date'].max().year, 2025)
+        # Amounts follow each category's typical size
+        medians = expenses.groupby('category_id')['amount_paid'].median()
+        self.assertLess(medians[100], medians[102])
+        self.assertGreater(medians[101], 10 * medians[102])
+
+    def test_null_rate_and_output_formats(self):
+        expenses = self.generate(20000, seed=5, null_rate=0.2)
+        for column in ('user_id', 'amount_paid'):
+            self.assertAlmostEqual(expenses[column].isna().mean(), 0.2, delta=0.02)
+        self.assertFalse(expenses[['category_id', 'payment_mode_id', 'expense_date']].isna().any().any())
+
+        row = next(iter(expense_rows(expenses[expenses['amount_paid'].isna()].head(1))))
+        self.assertIsNone(row[3])
+        self.assertEqual(type(row[4]).__name__, 'date')
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'expenses.csv')
+            chunks = SyntheticExpenseGenerator(LOOKUPS, seed=5, null_rate=0.2).chunks(20000, 1000)
+            self.assertEqual(write_csv(chunks, path), 20000)
+            from_csv = pd.read_csv(path)
+            self.assertEqual(len(from_csv), 20000)
+            self.assertEqual(from_csv['amount_paid'].isna().sum(), expenses['amount_paid'].isna().sum())
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()